@@ -0,0 +1,137 @@
+"""Synthetic corpus of real-world-like pages used by the benchmarks.
+
+Pages are generated from a fixed seed, so every run measures the same input.
+Each generator mimics markup produced by a common kind of site: component
+frameworks with deep wrapper chains, text-heavy articles, product listings,
+data tables and documentation sidebars.
+"""
+
+import random
+from typing import Callable
+
+WORDS = (
+    "the quick brown fox jumps over lazy dog price delivery order account "
+    "settings profile search results product review rating shipping cart "
+    "checkout news article update report company team support contact about "
+    "privacy terms help center guide install configure example reference api"
+).split()
+
+
+def _text(rng: random.Random, min_words: int = 2, max_words: int = 8) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words)))
+
+
+def _wrap(rng: random.Random, inner: str, max_depth: int = 4) -> str:
+    """Wrap markup in a chain of attribute-less wrappers, like component frameworks do."""
+    for _ in range(rng.randint(0, max_depth)):
+        inner = f"<div>{inner}</div>"
+    return inner
+
+
+def _nav(rng: random.Random, links: int) -> str:
+    items = "".join(
+        f'<li class="nav-item"><a class="nav-link" href="/{rng.choice(WORDS)}/{i}">'
+        f"{_text(rng, 1, 2)}</a></li>"
+        for i in range(links)
+    )
+    return f'<nav class="navbar"><ul class="nav-list">{items}</ul></nav>'
+
+
+def _head() -> str:
+    return (
+        "<head><meta charset='utf-8'><title>Page</title>"
+        "<link rel='stylesheet' href='/static/app.css'>"
+        "<script src='/static/app.js'></script></head>"
+    )
+
+
+def spa_dashboard(rng: random.Random, scale: int = 1) -> str:
+    cards = []
+    for i in range(20 * scale):
+        body = _wrap(rng, f'<span class="metric-value">{rng.randint(1, 9999)}</span>')
+        label = _wrap(rng, f"<p>{_text(rng)}</p>")
+        cards.append(
+            f'<div class="card" data-testid="card-{i}">'
+            f"<div><div><h3>{_text(rng, 1, 3)}</h3></div></div>{body}{label}</div>"
+        )
+    grid = _wrap(rng, f'<div class="grid">{"".join(cards)}</div>')
+    return (
+        f"<html>{_head()}<body><div id='root'><div><div>{_nav(rng, 8)}</div>"
+        f"<main>{grid}</main></div></div></body></html>"
+    )
+
+
+def news_article(rng: random.Random, scale: int = 1) -> str:
+    paragraphs = []
+    for _ in range(30 * scale):
+        paragraphs.append(
+            f"<p>{_text(rng)} <b>{_text(rng, 1, 3)}</b> {_text(rng)} "
+            f"<a href='/tag/{rng.choice(WORDS)}'>{_text(rng, 1, 2)}</a> "
+            f"<em>{_text(rng, 1, 3)}</em> <span>{_text(rng)}</span>.</p>"
+        )
+    article = f'<article class="post"><h1>{_text(rng)}</h1>{"".join(paragraphs)}</article>'
+    return (
+        f"<html>{_head()}<body>{_nav(rng, 12)}<div><div><main>{article}</main></div></div>"
+        f"<footer><div><p><small>{_text(rng)}</small></p></div></footer></body></html>"
+    )
+
+
+def product_listing(rng: random.Random, scale: int = 1) -> str:
+    stars = '<i class="star"></i>' * 5
+    products = "".join(
+        f'<li class="product"><div><a class="product-link" href="/p/{i}">'
+        f'<img src="https://cdn.example.com/img/{i}.jpg" alt="{_text(rng, 1, 3)}">'
+        f'<span class="price">${rng.randint(5, 500)}.99</span></a></div>'
+        f'<div class="rating">{stars}</div>'
+        f'<button class="add-to-cart" type="button">Add to cart</button></li>'
+        for i in range(60 * scale)
+    )
+    pages = "".join(f'<li><a href="/products?page={i}">{i}</a></li>' for i in range(1, 11))
+    return (
+        f"<html>{_head()}<body>{_nav(rng, 10)}<div><div>"
+        f'<ul class="products">{products}</ul></div></div>'
+        f'<ul class="pagination">{pages}</ul></body></html>'
+    )
+
+
+def data_table(rng: random.Random, scale: int = 1) -> str:
+    rows = "".join(
+        "<tr>"
+        + "".join(f"<td><div><span>{_text(rng, 1, 2)}</span></div></td>" for _ in range(5))
+        + "</tr>"
+        for _ in range(50 * scale)
+    )
+    header = "<tr>" + "".join(f"<th>{rng.choice(WORDS)}</th>" for _ in range(5)) + "</tr>"
+    return (
+        f"<html>{_head()}<body><div><div><table class='report'>"
+        f"<thead>{header}</thead><tbody>{rows}</tbody></table></div></div></body></html>"
+    )
+
+
+def docs_page(rng: random.Random, scale: int = 1) -> str:
+    sections = []
+    for i in range(10 * scale):
+        links = "".join(
+            f'<li><a href="/docs/{i}/{j}">{_text(rng, 1, 3)}</a></li>' for j in range(6)
+        )
+        sections.append(f"<li><span>{_text(rng, 1, 2)}</span><ul>{links}</ul></li>")
+    sidebar = f'<aside class="sidebar"><ul>{"".join(sections)}</ul></aside>'
+    content = "".join(f"<h2>{_text(rng)}</h2><p>{_text(rng, 10, 30)}</p>" for _ in range(15))
+    return (
+        f"<html>{_head()}<body>{_nav(rng, 6)}<div class='layout'>{sidebar}"
+        f"<div><div><main>{content}</main></div></div></div></body></html>"
+    )
+
+
+PAGES: dict[str, Callable[[random.Random, int], str]] = {
+    "spa_dashboard": spa_dashboard,
+    "news_article": news_article,
+    "product_listing": product_listing,
+    "data_table": data_table,
+    "docs_page": docs_page,
+}
+
+
+def load_corpus(scale: int = 1, seed: int = 42) -> dict[str, str]:
+    """Generate every page of the corpus."""
+    return {name: generate(random.Random(seed), scale) for name, generate in PAGES.items()}
@@ -0,0 +1,9 @@
+"""Node-count and output-length reduction of merging inline tags into text.
+
+Run with: python -m benchmarks.inline_text_merge
+"""
+
+from benchmarks.utils import print_reduction_table
+
+if __name__ == "__main__":
+    print_reduction_table("merged", merge_inline_text=True)
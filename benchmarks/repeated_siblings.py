@@ -0,0 +1,12 @@
+"""Output-length reduction of repeated-sibling multiplication in both modes.
+
+Run with: python -m benchmarks.repeated_siblings
+"""
+
+from benchmarks.utils import print_reduction_table
+
+if __name__ == "__main__":
+    print("Lossless multiplication\n")
+    print_reduction_table("lossless", multiply_repeated_siblings="lossless")
+    print("\nShape-only multiplication\n")
+    print_reduction_table("shape", multiply_repeated_siblings="shape")
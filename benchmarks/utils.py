@@ -0,0 +1,29 @@
+from typing import Any
+
+from benchmarks.corpus import load_corpus
+from emmetify.config import EmmetifierConfig, HtmlConfig
+from emmetify.converters.html_converter import HtmlConverter
+from emmetify.optimizers.html_optimizer import HtmlOptimizer
+from emmetify.parsers.html_parser import HtmlParser
+
+
+def measure(html: str, **html_options: Any) -> tuple[int, int]:
+    """Return node count and output length of html converted with given html options."""
+    config = EmmetifierConfig(html=HtmlConfig(skip_tags=True, **html_options))
+    node_pool = HtmlOptimizer(config).optimize(HtmlParser(config).parse(html))
+    result = HtmlConverter(config).convert(node_pool).result
+    return node_pool.get_nodes_count(), len(result)
+
+
+def print_reduction_table(label: str, **html_options: Any) -> None:
+    """Print node count and output length reductions of html options over the corpus."""
+    header = f"{'page':<18}{'nodes':>8}{label:>12}{'saved':>8}{'chars':>9}{label:>12}{'saved':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, html in load_corpus().items():
+        nodes, chars = measure(html)
+        optimized_nodes, optimized_chars = measure(html, **html_options)
+        print(
+            f"{name:<18}{nodes:>8}{optimized_nodes:>12}{1 - optimized_nodes / nodes:>8.1%}"
+            f"{chars:>9}{optimized_chars:>12}{1 - optimized_chars / chars:>8.1%}"
+        )
@@ -0,0 +1,107 @@
+"""Load test of the /api/v1/html endpoint with growing number of conversion workers.
+
+For every worker count the web server is started with uvicorn in a subprocess, and
+clients post the pages of the corpus, two per worker, so all workers stay busy.
+Throughput should grow with the number of workers up to the number of cores.
+Requires the web server dependencies (web/server/requirements.txt).
+
+Run with: python -m benchmarks.web_convert
+"""
+
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+from benchmarks.corpus import load_corpus
+
+ROOT_DIR = Path(__file__).parents[1]
+SERVER_DIR = ROOT_DIR / "web" / "server"
+REQUESTS_PER_LEVEL = 200
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_web_server(workers: int) -> tuple[subprocess.Popen, str]:
+    port = _free_port()
+    env = {
+        **os.environ,
+        "EMMETIFY_CONVERT_WORKERS": str(workers),
+        "PYTHONPATH": os.pathsep.join([str(ROOT_DIR), os.environ.get("PYTHONPATH", "")]),
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level=warning"],
+        cwd=SERVER_DIR,
+        env=env,
+    )
+    server_url = f"http://127.0.0.1:{port}"
+    while True:
+        try:
+            httpx.get(server_url)
+            return process, server_url
+        except httpx.TransportError:
+            time.sleep(0.05)
+
+
+async def run_level(server_url: str, pages: list[str], concurrency: int) -> tuple:
+    """Post pages with given number of concurrent clients, return requests/s, latencies
+    and count of requests turned away as busy."""
+    latencies: list[float] = []
+    rejected = 0
+    queue = list(pages)
+
+    async def client(http: httpx.AsyncClient) -> None:
+        nonlocal rejected
+        while queue:
+            html = queue.pop()
+            start = time.perf_counter()
+            response = await http.post(f"{server_url}/api/v1/html", json={"html": html})
+            if response.status_code == 503:
+                rejected += 1
+                continue
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(timeout=60, limits=limits) as http:
+        start = time.perf_counter()
+        await asyncio.gather(*(client(http) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return len(latencies) / elapsed, latencies, rejected
+
+
+def main() -> None:
+    corpus = list(load_corpus().values())
+    pages = corpus * (REQUESTS_PER_LEVEL // len(corpus))
+    cores = os.cpu_count() or 1
+    worker_counts = [n for n in (1, 2, 4, 8, 16) if n < cores] + [cores]
+
+    print(f"{cores} cores")
+    header = f"{'workers':>8}{'clients':>9}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'503s':>7}"
+    print(header)
+    print("-" * len(header))
+    for workers in worker_counts:
+        process, server_url = start_web_server(workers)
+        try:
+            concurrency = 2 * workers
+            rate, latencies, rejected = asyncio.run(run_level(server_url, pages, concurrency))
+        finally:
+            process.terminate()
+            process.wait()
+        p50 = statistics.median(latencies) * 1000
+        p95 = statistics.quantiles(latencies, n=20)[-1] * 1000
+        print(f"{workers:>8}{concurrency:>9}{rate:>10.1f}{p50:>10.1f}{p95:>10.1f}{rejected:>7}")
+
+
+if __name__ == "__main__":
+    main()
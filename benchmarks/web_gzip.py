@@ -0,0 +1,78 @@
+"""End-to-end latency of /api/v1/html on large pages, with and without gzip.
+
+The web server runs with uvicorn in a subprocess on a local port. Product listings of
+1 to 10 MB are posted plain, and gzipped with compressed responses accepted. Latency
+includes compressing the request on the client. Over a loopback connection bandwidth
+is nearly free, so the gain shows on slower networks, see the bytes columns.
+Requires the web server dependencies (web/server/requirements.txt).
+
+Run with: python -m benchmarks.web_gzip
+"""
+
+import gzip
+import json
+import random
+import statistics
+import time
+
+import httpx
+
+from benchmarks.corpus import product_listing
+from benchmarks.web_convert import start_web_server
+
+PAGE_SIZES_MB = [1, 2, 5, 10]
+REQUESTS_PER_SIZE = 3
+# Same level as the server compresses responses with
+COMPRESS_LEVEL = 6
+
+
+def make_page(size: int) -> str:
+    """Product listing page of about the given size in bytes."""
+    sample = product_listing(random.Random(42))
+    return product_listing(random.Random(42), scale=max(1, round(size / len(sample))))
+
+
+def post_page(http: httpx.Client, server_url: str, html: str, compress: bool) -> tuple:
+    """Post page, return latency, request bytes and response bytes sent over the connection."""
+    start = time.perf_counter()
+    body = json.dumps({"html": html}).encode()
+    headers = {"Content-Type": "application/json", "Accept-Encoding": "identity"}
+    if compress:
+        body = gzip.compress(body, COMPRESS_LEVEL)
+        headers.update({"Content-Encoding": "gzip", "Accept-Encoding": "gzip"})
+    response = http.post(f"{server_url}/api/v1/html", content=body, headers=headers)
+    response.raise_for_status()
+    return time.perf_counter() - start, len(body), response.num_bytes_downloaded
+
+
+def main() -> None:
+    process, server_url = start_web_server(workers=1)
+    try:
+        header = (
+            f"{'page MB':>8}{'gzip':>6}{'p50 ms':>10}{'min ms':>10}"
+            f"{'request KB':>12}{'response KB':>13}"
+        )
+        print(header)
+        print("-" * len(header))
+        with httpx.Client(timeout=300) as http:
+            for size_mb in PAGE_SIZES_MB:
+                html = make_page(size_mb * 1024 * 1024)
+                for compress in (False, True):
+                    runs = [
+                        post_page(http, server_url, html, compress)
+                        for _ in range(REQUESTS_PER_SIZE)
+                    ]
+                    latencies = [latency * 1000 for latency, _, _ in runs]
+                    _, request_bytes, response_bytes = runs[-1]
+                    print(
+                        f"{len(html) / 1024 / 1024:>8.1f}{'yes' if compress else 'no':>6}"
+                        f"{statistics.median(latencies):>10.0f}{min(latencies):>10.0f}"
+                        f"{request_bytes / 1024:>12.0f}{response_bytes / 1024:>13.0f}"
+                    )
+    finally:
+        process.terminate()
+        process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Load test of the /api/v1/url endpoint of the web server.
+
+Pages of the corpus are served by a local stand-in upstream server, the web server
+runs with uvicorn on a local port, and clients post urls at growing concurrency.
+Requires the web server dependencies (web/server/requirements.txt).
+
+Run with: python -m benchmarks.web_url
+"""
+
+import asyncio
+import socket
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+import httpx
+import uvicorn
+
+from benchmarks.corpus import load_corpus
+from tests.web.upstream import UpstreamServer
+
+SERVER_DIR = Path(__file__).parents[1] / "web" / "server"
+CONCURRENCY_LEVELS = [1, 8, 32]
+REQUESTS_PER_LEVEL = 200
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_web_server() -> tuple[uvicorn.Server, str]:
+    sys.path.insert(0, str(SERVER_DIR))
+    port = _free_port()
+    config = uvicorn.Config("main:app", host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, f"http://127.0.0.1:{port}"
+
+
+async def run_level(server_url: str, urls: list[str], concurrency: int) -> tuple[float, list]:
+    """Post urls with given number of concurrent clients, return requests/s and latencies."""
+    latencies: list[float] = []
+    queue = list(urls)
+
+    async def client(http: httpx.AsyncClient) -> None:
+        while queue:
+            url = queue.pop()
+            start = time.perf_counter()
+            response = await http.post(f"{server_url}/api/v1/url", json={"url": url})
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(timeout=60, limits=limits) as http:
+        start = time.perf_counter()
+        await asyncio.gather(*(client(http) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return len(urls) / elapsed, latencies
+
+
+def main() -> None:
+    pages = {f"/{name}": html for name, html in load_corpus().items()}
+    with UpstreamServer(pages) as upstream:
+        server, server_url = start_web_server()
+        urls = [f"{upstream.url}{path}" for path in pages] * (REQUESTS_PER_LEVEL // len(pages))
+
+        header = f"{'clients':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'upstream conns':>16}"
+        print(header)
+        print("-" * len(header))
+        for concurrency in CONCURRENCY_LEVELS:
+            connections_before = upstream.connections_count
+            rate, latencies = asyncio.run(run_level(server_url, urls, concurrency))
+            p50 = statistics.median(latencies) * 1000
+            p95 = statistics.quantiles(latencies, n=20)[-1] * 1000
+            connections = upstream.connections_count - connections_before
+            print(f"{concurrency:>8}{rate:>10.1f}{p50:>10.1f}{p95:>10.1f}{connections:>16}")
+
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+"""Node-count and output-length reduction of the wrapper-collapse pass.
+
+Run with: python -m benchmarks.wrapper_collapse
+"""
+
+from benchmarks.utils import print_reduction_table
+
+if __name__ == "__main__":
+    print_reduction_table("collapsed", collapse_wrappers=True)
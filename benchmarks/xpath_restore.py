@@ -0,0 +1,70 @@
+"""Restores per second of XPaths with simplified classes, links and images.
+
+Parsed XPaths are cached, so restores of unique XPaths are measured with
+the cache cleared before every restore.
+
+Run with: python -m benchmarks.xpath_restore
+"""
+
+import timeit
+
+from emmetify.converters.html_converter import HtmlConverterMaps
+from emmetify.utils.xpath import (
+    XPathAttributeRestorer,
+    XPathRestorer,
+    parse_xpath,
+    restore_xpath_from_converter_maps,
+)
+
+XPATHS = [
+    "//div[@class='a']//a[@href='b']",
+    "//ul[contains(@class,'c')]/li[2]/a[starts-with(@href,'d')]",
+    "//div[@id='main']//img[@src='e']",
+    "//section[normalize-space(@class)='f']//p[contains(text(),'Titan')]",
+    "//nav//a[@href='g' or @href='h']",
+]
+MAPS = HtmlConverterMaps(
+    classes={"a": "card", "c": "menu", "f": "content"},
+    links={"b": "/home", "d": "https://example.com/", "g": "/about", "h": "/contact"},
+    images={"e": "https://example.com/titan.png"},
+)
+
+
+def restore_per_attribute(xpath: str) -> str:
+    """Restore each attribute in its own pass over the XPath."""
+    restorer = XPathAttributeRestorer()
+    xpath = restorer.restore_attribute(xpath, None, "class", MAPS.classes)
+    xpath = restorer.restore_attribute(xpath, "a", "href", MAPS.links)
+    return restorer.restore_attribute(xpath, "img", "src", MAPS.images)
+
+
+def restore_unique(xpath: str) -> str:
+    """Restore the XPath as if it was never parsed before."""
+    parse_xpath.cache_clear()
+    return restore_xpath_from_converter_maps(xpath, MAPS)
+
+
+def restores_per_second(restore, number: int = 2000) -> float:
+    seconds = min(
+        timeit.repeat(lambda: [restore(xpath) for xpath in XPATHS], number=number, repeat=3)
+    )
+    return number * len(XPATHS) / seconds
+
+
+if __name__ == "__main__":
+    unique = restores_per_second(restore_unique)
+    per_attribute = restores_per_second(restore_per_attribute)
+    combined = restores_per_second(lambda xpath: restore_xpath_from_converter_maps(xpath, MAPS))
+    print(f"{'unique xpaths':<24}{unique:>12,.0f} restores/s")
+    print(f"{'per-attribute passes':<24}{per_attribute:>12,.0f} restores/s")
+    print(f"{'combined pass':<24}{combined:>12,.0f} restores/s")
+
+    # Distinct XPaths of a crawl batch, restored with maps prepared once
+    batch = [f"{xpath}[{index}]" for index in range(200) for xpath in XPATHS]
+    restorer = XPathRestorer(MAPS)
+    seconds = min(
+        timeit.repeat(
+            lambda: (parse_xpath.cache_clear(), restorer.restore_many(batch)), number=1, repeat=3
+        )
+    )
+    print(f"{'batch restore_many':<24}{len(batch) / seconds:>12,.0f} restores/s")
@@ -10,30 +10,32 @@ def emmetify_html(content, format="html", **options):
     return emmetifier.emmetify(content)
 
 
-def emmetify_compact_html(content):
+# Config of emmetify_compact_html, simplified tags and attributes
+COMPACT_HTML_CONFIG = {
+    "html": {
+        "skip_tags": True,
+        "prioritize_attributes": True,
+        "simplify_classes": True,
+        "simplify_images": True,
+        # LLM agents works better when they know the relative links
+        # otherwise they will start looping on redirects
+        "simplify_relative_links": False,
+        "simplify_absolute_links": True,
+    }
+}
+
+
+def emmetify_compact_html(content, tokenizer=None):
     """Convenience function for quick HTML conversion with simplified tags and attributes"""
-    emmetifier = Emmetifier(
-        format="html",
-        config={
-            "html": {
-                "skip_tags": True,
-                "prioritize_attributes": True,
-                "simplify_classes": True,
-                "simplify_images": True,
-                # LLM agents works better when they know the relative links
-                # otherwise they will start looping on redirects
-                "simplify_relative_links": False,
-                "simplify_absolute_links": True,
-            }
-        },
-    )
-    return emmetifier.emmetify(content)
+    emmetifier = Emmetifier(format="html", config=COMPACT_HTML_CONFIG)
+    return emmetifier.emmetify(content, tokenizer=tokenizer)
 
 
 __all__ = [
     "Emmetifier",
     "emmetify_html",
     "emmetify_compact_html",
+    "COMPACT_HTML_CONFIG",
     *config_all,
 ]
 
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import BaseModel, Field
 
 
@@ -54,6 +56,28 @@ class HtmlConfig(BaseModel):
     skip_tags: bool = False
     skip_empty_attributes: bool = False
     prioritize_attributes: bool = False
+    collapse_wrappers: bool = False
+    merge_inline_text: bool = False
+
+    # Output options
+    elide_implicit_tags: bool = False
+    minimal_grouping: bool = False
+    # Emit runs of repeated siblings with Emmet multiplication (`*N`):
+    # "lossless" only merges siblings which expand back to the same html,
+    # "shape" also merges structurally identical siblings, keeping the first one
+    multiply_repeated_siblings: Literal["off", "lossless", "shape"] = "off"
+    # Mark elements with compact references (`#r1`, or their unique id) mapped to their
+    # absolute XPath and CSS path in the result: "interactive" marks interactive tags,
+    # "leaves" also marks elements without element children, "all" marks every element
+    node_references: Literal["off", "interactive", "leaves", "all"] = "off"
+
+    # Instrumentation options
+    # Attribute output characters (and tokens) to tag names, attributes and text
+    report_costs: bool = False
+    # Record which node produced every span of the output, with node source positions
+    source_map: bool = False
+    # Measure seconds spent in every stage: parse, build, optimize and convert
+    report_timings: bool = False
 
     # Tags to skip during conversion
     tags_to_skip: set[str] = Field(
@@ -70,6 +94,40 @@ class HtmlConfig(BaseModel):
         },
         description="Tags to skip during conversion",
     )
+    # Wrapper tags to collapse when they have no attributes and a single element child
+    wrapper_tags_to_collapse: set[str] = Field(
+        default={
+            "div",
+            "span",
+        },
+        description="Attribute-less single-child wrapper tags to collapse",
+    )
+    # Inline formatting tags to merge into surrounding text when they have no attributes
+    inline_tags_to_merge: set[str] = Field(
+        default={
+            "b",
+            "i",
+            "em",
+            "strong",
+            "span",
+            "small",
+        },
+        description="Attribute-less inline tags to flatten into surrounding text",
+    )
+    # Tags referenced in "interactive" and "leaves" node references modes
+    interactive_tags: set[str] = Field(
+        default={
+            "a",
+            "button",
+            "input",
+            "select",
+            "option",
+            "textarea",
+            "label",
+            "summary",
+        },
+        description="Interactive tags to mark with node references",
+    )
     attributes_priority: HtmlAttributesPriority = Field(
         default_factory=HtmlAttributesPriority,
         description="Attribute priority configuration",
@@ -1,12 +1,312 @@
-from dataclasses import dataclass
-from typing import Union
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Callable, Literal, Union
 
 from emmetify.config.base_config import EmmetifierConfig
 from emmetify.config.html_config import HtmlAttributesPriority
 from emmetify.converters.base_converter import BaseConverter
 from emmetify.nodes.html_nodes import HtmlNode, HtmlNodePool
+from emmetify.tokenizers import Tokenizer
+from emmetify.types import IntOrNoneType, StrOrNoneType
+from emmetify.utils.paths import get_css_path
 from emmetify.utils.tokens import SingleTokenNames
 
+# Tag names Emmet resolves for elements without a name, keyed by parent tag name
+# (mirrors Emmet's implicit tag rules, everything else resolves to div or span)
+EMMET_IMPLICIT_CHILD_TAGS = {
+    "p": "span",
+    "ul": "li",
+    "ol": "li",
+    "table": "tr",
+    "tr": "td",
+    "tbody": "tr",
+    "thead": "tr",
+    "tfoot": "tr",
+    "colgroup": "col",
+    "select": "option",
+    "optgroup": "option",
+    "audio": "source",
+    "video": "source",
+    "object": "param",
+    "map": "area",
+}
+
+# Parent tags for which Emmet resolves implicit children to span instead of div
+EMMET_INLINE_TAGS = {
+    "a",
+    "abbr",
+    "acronym",
+    "applet",
+    "b",
+    "basefont",
+    "bdo",
+    "big",
+    "br",
+    "button",
+    "cite",
+    "code",
+    "del",
+    "dfn",
+    "em",
+    "font",
+    "i",
+    "iframe",
+    "img",
+    "input",
+    "ins",
+    "kbd",
+    "label",
+    "map",
+    "object",
+    "q",
+    "s",
+    "samp",
+    "select",
+    "small",
+    "span",
+    "strike",
+    "strong",
+    "sub",
+    "sup",
+    "textarea",
+    "tt",
+    "u",
+    "var",
+}
+
+
+def get_implicit_tag(parent_tag: StrOrNoneType) -> str:
+    """Get tag name Emmet resolves for an element without a name inside given parent."""
+    parent_tag = (parent_tag or "").lower()
+    if parent_tag in EMMET_IMPLICIT_CHILD_TAGS:
+        return EMMET_IMPLICIT_CHILD_TAGS[parent_tag]
+    return "span" if parent_tag in EMMET_INLINE_TAGS else "div"
+
+
+# Longest climb-up (`^`) chain used instead of grouping with parentheses
+MAX_CLIMB_UP_DEPTH = 2
+
+
+# Runs of digits which may be replaced by Emmet `$` numbering in repeated siblings
+NUMBER_PATTERN = re.compile(r"(\d+)")
+# Unescaped `$` or `*N`, numbering or multiplication of nested siblings, which `$`
+# numbering of the item would be bound to
+NESTED_MULTIPLICATION_PATTERN = re.compile(r"(?<!\\)(?:\$|\*\d)")
+
+
+class HtmlSiblingsMultiplier:
+    """Finds runs of repeated sibling subtrees to emit with Emmet multiplication"""
+
+    def __init__(self, mode: Literal["off", "lossless", "shape"]):
+        self.mode = mode
+        self._shape_keys: dict[str, int] = {}
+
+    def reset(self) -> None:
+        self._shape_keys = {}
+
+    def get_shape_key(self, node_pool: HtmlNodePool, node: HtmlNode) -> int:
+        """Structural hash of a subtree, ignoring text, ids and attribute values."""
+        shape_key = self._shape_keys.get(node.id)
+        if shape_key is None:
+            classes = node.attrs.get("class", [])
+            attr_names = sorted(k for k in node.attrs if k not in ["id", "class"])
+            children_keys = tuple(
+                self.get_shape_key(node_pool, node_pool.get_node(child_id))
+                for child_id in node.children_ids
+            )
+            shape_key = hash((node.tag, tuple(classes), tuple(attr_names), children_keys))
+            self._shape_keys[node.id] = shape_key
+        return shape_key
+
+    def _match_numbering(
+        self, first_parts: list[str], parts: list[str], offset: int, steps: list[int]
+    ) -> bool:
+        """
+        Check if parts differ from first parts only by numbers growing with the offset.
+        Steps hold 0 for constant and 1 for growing numbers, -1 until known.
+        """
+        if len(parts) != len(first_parts) or parts[::2] != first_parts[::2]:
+            return False
+
+        new_steps = list(steps)
+        for index in range(1, len(parts), 2):
+            step = index // 2
+            first_number, number = first_parts[index], parts[index]
+            if first_number == number and steps[step] in (-1, 0):
+                new_steps[step] = 0
+            elif (
+                steps[step] in (-1, 1)
+                and not first_number.startswith("0")
+                and not number.startswith("0")
+                and int(number) == int(first_number) + offset
+                and not first_parts[index - 1].endswith(("\\", "*", "@"))
+                and not first_parts[index + 1].startswith("@")
+            ):
+                new_steps[step] = 1
+            else:
+                return False
+
+        steps[:] = new_steps
+        return True
+
+    def _numbered_template(self, first_parts: list[str], steps: list[int]) -> str:
+        """Replace growing numbers with Emmet `$` numbering."""
+        template = list(first_parts)
+        for index in range(1, len(template), 2):
+            if steps[index // 2] == 1:
+                number = int(template[index])
+                template[index] = "$" if number == 1 else f"$@{number}"
+        return "".join(template)
+
+    def find_runs(
+        self,
+        node_pool: HtmlNodePool,
+        nodes: list[HtmlNode],
+        nodes_emmet: list[str],
+        holds_references: Union[list[bool], None] = None,
+    ) -> list[tuple[int, int, str]]:
+        """
+        Group sibling nodes into runs of repeated subtrees.
+        Subtrees holding node references are never numbered, as numbering would
+        replace their unique references with ids that can't be resolved.
+        Returns (index of first node, run length, Emmet of a single run item) for every run.
+        """
+        holds_references = holds_references or [False] * len(nodes)
+        runs: list[tuple[int, int, str]] = []
+        index = 0
+        while index < len(nodes):
+            node = nodes[index]
+            if self.mode == "off" or node.is_text_node:
+                runs.append((index, 1, nodes_emmet[index]))
+                index += 1
+                continue
+
+            first_parts = NUMBER_PATTERN.split(nodes_emmet[index])
+            # Numbering would be bound to the nested multiplication,
+            # so only exact repeats are allowed for such subtrees
+            step = 0 if NESTED_MULTIPLICATION_PATTERN.search(nodes_emmet[index]) else -1
+            steps = [step] * (len(first_parts) // 2)
+            is_numbered = not holds_references[index]
+            end = index + 1
+            while end < len(nodes) and not nodes[end].is_text_node:
+                offset = end - index
+                parts = NUMBER_PATTERN.split(nodes_emmet[end])
+                if (
+                    is_numbered
+                    and not holds_references[end]
+                    and self._match_numbering(first_parts, parts, offset, steps)
+                ):
+                    end += 1
+                elif self.mode == "shape" and self.get_shape_key(
+                    node_pool, nodes[end]
+                ) == self.get_shape_key(node_pool, node):
+                    is_numbered = False
+                    end += 1
+                else:
+                    break
+
+            count = end - index
+            if count > 1 and is_numbered:
+                runs.append((index, count, self._numbered_template(first_parts, steps)))
+            elif count > 1:
+                # Lossy shape run, the first item represents all of them
+                runs.append((index, count, nodes_emmet[index]))
+            else:
+                runs.append((index, 1, nodes_emmet[index]))
+            index = end
+
+        return runs
+
+
+HtmlCostKind = Literal["tag", "attribute", "text", "syntax"]
+
+
+@dataclass
+class HtmlConverterCost:
+    kind: HtmlCostKind
+    name: str
+    # Number of emitted tags, attributes or text nodes
+    count: int
+    chars: int
+    tokens: IntOrNoneType = None
+
+
+class HtmlCostRecorder:
+    """Attributes output characters to tag names, attribute names and text"""
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.reset()
+
+    def reset(self) -> None:
+        self._node_pieces: dict[str, list[tuple[HtmlCostKind, str, str]]] = {}
+        self._collapsed_ids: set[str] = set()
+
+    def record(self, node: HtmlNode, kind: HtmlCostKind, name: str, text: str) -> None:
+        """Record a piece of node Emmet, e.g. `#main` for the id attribute."""
+        if self.enabled and text:
+            self._node_pieces.setdefault(node.id, []).append((kind, name, text))
+
+    def collapse(self, node: HtmlNode) -> None:
+        """Mark subtree merged into a multiplied sibling, so it is not in the output."""
+        if self.enabled:
+            self._collapsed_ids.add(node.id)
+
+    def _emitted_pieces(
+        self, node_pool: HtmlNodePool, root_nodes: list[HtmlNode]
+    ) -> list[tuple[HtmlCostKind, str, str]]:
+        pieces: list[tuple[HtmlCostKind, str, str]] = []
+        stack = list(root_nodes)
+        while stack:
+            node = stack.pop()
+            if node.id in self._collapsed_ids:
+                continue
+            pieces.extend(self._node_pieces.get(node.id, []))
+            stack.extend(node_pool.get_node(child_id) for child_id in node.children_ids)
+        return pieces
+
+    def report(
+        self,
+        node_pool: HtmlNodePool,
+        root_nodes: list[HtmlNode],
+        result: str,
+        tokenizer: Union[Tokenizer, None] = None,
+    ) -> list[HtmlConverterCost]:
+        """
+        Sum recorded pieces of emitted nodes by tag name, attribute name and text.
+        Everything else in the output (operators, grouping, numbering, whitespace)
+        is Emmet syntax. Pieces are tokenized independently, so token costs are
+        an approximation of their share in the tokenized output.
+        """
+        costs: dict[tuple[HtmlCostKind, str], HtmlConverterCost] = {}
+        for kind, name, text in self._emitted_pieces(node_pool, root_nodes):
+            cost = costs.get((kind, name))
+            if cost is None:
+                cost = HtmlConverterCost(kind=kind, name=name, count=0, chars=0)
+                costs[(kind, name)] = cost
+            cost.count += 1
+            cost.chars += len(text)
+            if tokenizer:
+                cost.tokens = (cost.tokens or 0) + tokenizer.count_tokens(text)
+
+        syntax_cost = HtmlConverterCost(
+            kind="syntax",
+            name="syntax",
+            count=1,
+            chars=len(result) - sum(cost.chars for cost in costs.values()),
+        )
+        if tokenizer:
+            attributed_tokens = sum(cost.tokens or 0 for cost in costs.values())
+            syntax_cost.tokens = max(tokenizer.count_tokens(result) - attributed_tokens, 0)
+
+        return sorted(
+            [*costs.values(), syntax_cost],
+            key=lambda cost: (-cost.chars, cost.kind, cost.name),
+        )
+
 
 class HtmlPriorityAttributeFilter:
     """Filters HTML attributes based on priority rules"""
@@ -52,6 +352,212 @@ class HtmlPriorityAttributeFilter:
         return {k: v for k, v in filtered_attrs.items() if k in self.config.secondary_attrs}
 
 
+@dataclass
+class HtmlSourceMapEntry:
+    # Span of the node in the output, its tag with attributes or its `{text}`
+    start: int
+    end: int
+    node_id: str
+    # Position of the element in the source html, None for text nodes
+    source_line: IntOrNoneType = None
+    source_column: IntOrNoneType = None
+
+
+@dataclass
+class HtmlSourceMap:
+    """
+    Spans of the output produced by nodes, in parallel arrays ordered by span start.
+    Spans do not overlap, Emmet syntax between them (`>`, `+`, `(`) belongs to no node.
+    """
+
+    starts: "array[int]" = field(default_factory=lambda: array("l"))
+    ends: "array[int]" = field(default_factory=lambda: array("l"))
+    node_ids: list[str] = field(default_factory=list)
+    # Source positions of nodes, -1 when unknown
+    source_lines: "array[int]" = field(default_factory=lambda: array("l"))
+    source_columns: "array[int]" = field(default_factory=lambda: array("l"))
+
+    def __len__(self) -> int:
+        return len(self.node_ids)
+
+    def _entry(self, index: int) -> HtmlSourceMapEntry:
+        line, column = self.source_lines[index], self.source_columns[index]
+        return HtmlSourceMapEntry(
+            start=self.starts[index],
+            end=self.ends[index],
+            node_id=self.node_ids[index],
+            source_line=line if line >= 0 else None,
+            source_column=column if column >= 0 else None,
+        )
+
+    def lookup(self, offset: int) -> Union[HtmlSourceMapEntry, None]:
+        """Find the node which produced the output character at offset."""
+        index = bisect_right(self.starts, offset) - 1
+        if index < 0 or offset >= self.ends[index]:
+            return None
+        return self._entry(index)
+
+    def lookup_range(self, start: int, end: int) -> list[HtmlSourceMapEntry]:
+        """Find nodes which produced any output character in range, e.g. of a citation."""
+        first = max(bisect_right(self.starts, start) - 1, 0)
+        last = bisect_left(self.starts, end)
+        return [
+            self._entry(index)
+            for index in range(first, last)
+            if self.ends[index] > start and self.starts[index] < end
+        ]
+
+
+class HtmlSourceMapRecorder:
+    """
+    Records output spans of nodes while rendering. Emmet is built bottom-up, so spans are
+    recorded relative to the Emmet of the node and resolved to output offsets at the end.
+    """
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.reset()
+
+    def reset(self) -> None:
+        self._head_lengths: dict[str, int] = {}
+        # Offsets of node Emmet in the Emmet of its parent or in the output for root nodes
+        self._offsets: dict[str, int] = {}
+        self._hidden_ids: set[str] = set()
+        self._opaque_ids: set[str] = set()
+
+    def record_head(self, node: HtmlNode, length: int) -> None:
+        if self.enabled:
+            self._head_lengths[node.id] = length
+
+    def place(self, node: HtmlNode, offset: int) -> None:
+        if self.enabled:
+            self._offsets[node.id] = offset
+
+    def shift(self, nodes: list[HtmlNode], offset: int) -> None:
+        """Move nodes placed in a sequence of children after their parent Emmet."""
+        if self.enabled:
+            for node in nodes:
+                if node.id in self._offsets:
+                    self._offsets[node.id] += offset
+
+    def collapse(self, node: HtmlNode) -> None:
+        """Mark subtree merged into a multiplied sibling, so it is not in the output."""
+        if self.enabled:
+            self._hidden_ids.add(node.id)
+
+    def make_opaque(self, node: HtmlNode, length: int) -> None:
+        """Map the whole Emmet of subtree to its node, e.g. when rewritten with numbering."""
+        if self.enabled:
+            self._head_lengths[node.id] = length
+            self._opaque_ids.add(node.id)
+
+    def report(self, node_pool: HtmlNodePool, root_nodes: list[HtmlNode]) -> HtmlSourceMap:
+        entries: list[tuple[int, int, HtmlNode]] = []
+        stack = [(node, 0) for node in root_nodes]
+        while stack:
+            node, container_offset = stack.pop()
+            if node.id in self._hidden_ids or node.id not in self._offsets:
+                continue
+            offset = container_offset + self._offsets[node.id]
+            head_length = self._head_lengths.get(node.id, 0)
+            if head_length:
+                entries.append((offset, offset + head_length, node))
+            if node.id not in self._opaque_ids:
+                stack.extend(
+                    (node_pool.get_node(child_id), offset) for child_id in node.children_ids
+                )
+
+        source_map = HtmlSourceMap()
+        for start, end, node in sorted(entries, key=lambda entry: entry[0]):
+            source_map.starts.append(start)
+            source_map.ends.append(end)
+            source_map.node_ids.append(node.id)
+            source_map.source_lines.append(-1 if node.source_line is None else node.source_line)
+            source_map.source_columns.append(
+                -1 if node.source_column is None else node.source_column
+            )
+        return source_map
+
+
+# Html ids usable as Emmet ids and node references as they are
+REFERENCE_ID_PATTERN = re.compile(r"[A-Za-z][\w-]*")
+
+
+@dataclass
+class HtmlNodeReference:
+    node_id: str
+    # Absolute paths of the element in the source html
+    xpath: str
+    css_path: str
+
+
+class HtmlNodeReferencer:
+    """Assigns compact references to elements, emitted in place of their Emmet ids"""
+
+    def __init__(self, mode: Literal["off", "interactive", "leaves", "all"], tags: set[str]):
+        self.mode = mode
+        self.interactive_tags = tags
+        self.reset()
+
+    def reset(self, keep_names: bool = False) -> None:
+        """Reset references of a conversion, names may be kept for conversions of parts."""
+        self.references: dict[str, HtmlNodeReference] = {}
+        # References emitted so far, to tell which subtrees hold any
+        self.assigned = 0
+        if not keep_names:
+            self._names: dict[str, str] = {}
+            self._counter = 0
+
+    def _is_referenced(self, node_pool: HtmlNodePool, node: HtmlNode) -> bool:
+        if self.mode == "off" or node.is_text_node:
+            return False
+        if self.mode == "all" or node.tag in self.interactive_tags:
+            return True
+        if self.mode == "leaves":
+            return all(node_pool.get_node(child_id).is_text_node for child_id in node.children_ids)
+        return False
+
+    def _get_name(self, node_pool: HtmlNodePool, node: HtmlNode) -> str:
+        """Unique html id of node, or the next numbered name not used as an html id."""
+        index = node_pool.get_index()
+        html_id = node.attrs.get("id")
+        if (
+            isinstance(html_id, str)
+            and REFERENCE_ID_PATTERN.fullmatch(html_id)
+            and html_id not in index.duplicate_ids
+        ):
+            return html_id
+
+        while True:
+            self._counter += 1
+            name = f"r{self._counter}"
+            if name not in index.ids:
+                return name
+
+    def get_reference(self, node_pool: HtmlNodePool, node: HtmlNode) -> StrOrNoneType:
+        """Reference of node, or None when node is not referenced."""
+        if not self._is_referenced(node_pool, node):
+            return None
+        name = self._names.get(node.id)
+        if name is None:
+            name = self._names[node.id] = self._get_name(node_pool, node)
+
+        xpath = node.source_xpath or ""
+        self.references[name] = HtmlNodeReference(node.id, xpath, get_css_path(xpath))
+        self.assigned += 1
+        return name
+
+    def drop(self, node_pool: HtmlNodePool, node: HtmlNode) -> None:
+        """Drop references of subtree merged into a multiplied sibling, not in the output."""
+        if self.mode == "off":
+            return
+        stack = [node]
+        while stack:
+            subtree_node = stack.pop()
+            self.references.pop(self._names.get(subtree_node.id, ""), None)
+            stack.extend(node_pool.get_node(child_id) for child_id in subtree_node.children_ids)
+
+
 @dataclass
 class HtmlConverterMaps:
     classes: dict[str, str]
@@ -59,24 +565,81 @@ class HtmlConverterMaps:
     images: dict[str, str]
 
 
+@dataclass
+class HtmlPrunedSubtree:
+    node_id: str
+    path: str
+    tokens: int
+    score: float
+
+
+@dataclass
+class HtmlConverterTokens:
+    input_tokens: int
+    output_tokens: int
+    # Percentage of input tokens saved by the conversion
+    compression_ratio: float
+
+
 @dataclass
 class HtmlConverterResult:
     result: str
     maps: HtmlConverterMaps
+    token_count: IntOrNoneType = None
+    pruned: list[HtmlPrunedSubtree] = field(default_factory=list)
+    costs: list[HtmlConverterCost] = field(default_factory=list)
+    # Node references in the output, mapped to paths of the referenced elements
+    references: dict[str, HtmlNodeReference] = field(default_factory=dict)
+    source_map: Union[HtmlSourceMap, None] = None
+    # Seconds spent in stages of the conversion, by stage name
+    timings: dict[str, float] = field(default_factory=dict)
+    # Converted nodes, e.g. for evaluating XPath expressions without re-parsing html
+    node_pool: Union[HtmlNodePool, None] = field(default=None, repr=False, compare=False)
+    # Counts tokens of the conversion, set when converted with a tokenizer
+    tokens_counter: Union[Callable[[], HtmlConverterTokens], None] = field(
+        default=None, repr=False, compare=False
+    )
+
+    @cached_property
+    def tokens(self) -> Union[HtmlConverterTokens, None]:
+        """
+        Input and output token counts, when converted with a tokenizer.
+        Counted on first access, as counting input tokens encodes the whole input.
+        """
+        return self.tokens_counter() if self.tokens_counter is not None else None
 
 
-class HtmlConverter(BaseConverter[HtmlNodePool]):
+class HtmlConverter(BaseConverter[HtmlNodePool, "HtmlConverterResult"]):
     """Converts HTML nodes to Emmet"""
 
     def __init__(self, config: EmmetifierConfig):
         super().__init__(config)
 
         self.priority_filter = HtmlPriorityAttributeFilter(config.html.attributes_priority)
-        self.single_token_names = SingleTokenNames()
+        self.siblings_multiplier = HtmlSiblingsMultiplier(config.html.multiply_repeated_siblings)
+        self.cost_recorder = HtmlCostRecorder(config.html.report_costs)
+        self.source_map_recorder = HtmlSourceMapRecorder(config.html.source_map)
+        self.node_referencer = HtmlNodeReferencer(
+            config.html.node_references, config.html.interactive_tags
+        )
+        self._reset_state()
 
-        self.classes_map: dict[str, str] = {}
-        self.links_map: dict[str, str] = {}
-        self.images_map: dict[str, str] = {}
+    def _reset_state(self, keep_maps: bool = False) -> None:
+        """
+        Reset conversion state, so every conversion has its own maps.
+        Maps may be kept to share token names between conversions of parts of a pool.
+        """
+        self.siblings_multiplier.reset()
+        self.cost_recorder.reset()
+        self.source_map_recorder.reset()
+        self.node_referencer.reset(keep_maps)
+        self.used_names: set[str] = set()
+
+        if not keep_maps:
+            self.single_token_names = SingleTokenNames()
+            self.classes_map: dict[str, str] = {}
+            self.links_map: dict[str, str] = {}
+            self.images_map: dict[str, str] = {}
 
     def _escape_text(self, text: str) -> str:
         """Escape * and $ in text content."""
@@ -89,10 +652,14 @@ class HtmlConverter(BaseConverter[HtmlNodePool]):
         no_white_chars = " ".join(escaped.split())
         return no_white_chars
 
-    def _node_to_emmet(self, node: HtmlNode) -> str:
+    def _node_to_emmet(
+        self, node: HtmlNode, parent_tag: StrOrNoneType = None, reference: StrOrNoneType = None
+    ) -> str:
         """Convert single node to Emmet notation with attribute filtering."""
         if node.is_text_node:
-            return f"{{{self._escape_text(node.text_content)}}}"
+            escaped_text = self._escape_text(node.text_content)
+            self.cost_recorder.record(node, "text", "text", escaped_text)
+            return f"{{{escaped_text}}}"
 
         # Start with tag name
         parts = [node.tag]
@@ -101,11 +668,13 @@ class HtmlConverter(BaseConverter[HtmlNodePool]):
         if self.config.html.prioritize_attributes:
             attributes = self.priority_filter.filter_attributes(node.attrs)
         else:
-            attributes = node.attrs
+            attributes = dict(node.attrs)
 
-        # Process id if present
-        if "id" in attributes:
-            parts.append(f'#{attributes["id"]}')
+        # Process id if present, node reference takes its place
+        emmet_id = reference or attributes.get("id")
+        if emmet_id is not None:
+            parts.append(f"#{emmet_id}")
+            self.cost_recorder.record(node, "attribute", "id", parts[-1])
 
         # Process classes if present
         if "class" in attributes:
@@ -122,8 +691,10 @@ class HtmlConverter(BaseConverter[HtmlNodePool]):
                     parts.append(f".{single_token_class}")
                 else:
                     parts.append(f".{mapped_class}")
+                self.used_names.add(self.classes_map[space_separated_class_name])
             else:
                 parts.append(emmet_class_name)
+            self.cost_recorder.record(node, "attribute", "class", parts[-1])
 
         # Process href for absolute links
         if node.tag == "a" and "href" in attributes:
@@ -138,6 +709,7 @@ class HtmlConverter(BaseConverter[HtmlNodePool]):
                     attributes["href"] = single_token_url
                 else:
                     attributes["href"] = mapped_url
+                self.used_names.add(attributes["href"])
 
             # Simplify relative links
             elif self.config.html.simplify_relative_links and not href.startswith("http"):
@@ -148,6 +720,7 @@ class HtmlConverter(BaseConverter[HtmlNodePool]):
                     attributes["href"] = single_token_url
                 else:
                     attributes["href"] = mapped_url
+                self.used_names.add(attributes["href"])
 
         # Process src for images
         if self.config.html.simplify_images and node.tag == "img" and "src" in attributes:
@@ -158,6 +731,7 @@ class HtmlConverter(BaseConverter[HtmlNodePool]):
                 attributes["src"] = single_token_src
             else:
                 attributes["src"] = mapped_src
+            self.used_names.add(attributes["src"])
 
         # Remove id and class from remaining attributes since we've handled them
         remaining_attrs = {k: v for k, v in attributes.items() if k not in ["id", "class"]}
@@ -176,29 +750,25 @@ class HtmlConverter(BaseConverter[HtmlNodePool]):
                     attr_str_list.append(k)
                 else:
                     attr_str_list.append(f"{k}={v}")
+                self.cost_recorder.record(node, "attribute", k, attr_str_list[-1])
             attr_str = " ".join(attr_str_list)
             parts.append(f"[{attr_str}]")
 
-        return "".join(parts)
-
-    def _build_emmet(
-        self, node_pool: HtmlNodePool, node_data: Union[str, HtmlNode], level: int = 0
-    ) -> str:
-        """Recursively build Emmet notation with optional indentation."""
-        indent = " " * (self.config.indent_size * level) if self.config.indent else ""
-
-        if isinstance(node_data, str):
-            node = node_pool.get_node(node_data)
-        else:
-            node = node_data
-
-        if not node:
-            return ""
+        # Elide tag name when Emmet resolves the same tag for a nameless element
+        if (
+            self.config.html.elide_implicit_tags
+            and len(parts) > 1
+            and get_implicit_tag(parent_tag) == node.tag
+        ):
+            parts[0] = ""
+        self.cost_recorder.record(node, "tag", node.tag, parts[0])
 
-        # Emmetify current node
-        node_emmet = self._node_to_emmet(node)
+        return "".join(parts)
 
-        # Get children nodes
+    def _split_children(
+        self, node_pool: HtmlNodePool, node: HtmlNode
+    ) -> tuple[Union[HtmlNode, None], list[HtmlNode]]:
+        """Split node children into direct text child and children rendered after `>`."""
         children_nodes: list[HtmlNode] = []
         direct_text_child_node: Union[HtmlNode, None] = None
         for child_index, child_id in enumerate(node.children_ids):
@@ -210,50 +780,174 @@ class HtmlConverter(BaseConverter[HtmlNodePool]):
                 direct_text_child_node = child_node
             else:
                 children_nodes.append(child_node)
+        return direct_text_child_node, children_nodes
+
+    def _build_sequence_emmet(
+        self, node_pool: HtmlNodePool, nodes: list[HtmlNode], level: int = 0
+    ) -> tuple[str, int]:
+        """
+        Build Emmet notation for a list of sibling nodes.
+        Returns the notation and the number of levels the Emmet context stays
+        below the siblings level after it.
+        """
+        indent = " " * (self.config.indent_size * level) if self.config.indent else ""
+        newline = "\n" if self.config.indent else ""
+
+        nodes_emmet: list[str] = []
+        nodes_depth: list[int] = []
+        holds_references: list[bool] = []
+        for node in nodes:
+            assigned_before = self.node_referencer.assigned
+            node_emmet, depth = self._build_node_emmet(node_pool, node, level)
+            nodes_emmet.append(node_emmet)
+            nodes_depth.append(depth)
+            holds_references.append(self.node_referencer.assigned > assigned_before)
+        runs = self.siblings_multiplier.find_runs(node_pool, nodes, nodes_emmet, holds_references)
+
+        sequence_emmet: list[str] = []
+        sequence_length = 0
+        depth = 0
+        for index, (node_index, count, node_emmet) in enumerate(runs):
+            is_last = index == len(runs) - 1
+            depth = nodes_depth[node_index]
+            run_length = len(node_emmet)
+            # Length of the grouping parenthesis before the node
+            group_length = 0
+
+            if count > 1:
+                for collapsed_node in nodes[slice(node_index + 1, node_index + count)]:
+                    self.cost_recorder.collapse(collapsed_node)
+                    self.source_map_recorder.collapse(collapsed_node)
+                    self.node_referencer.drop(node_pool, collapsed_node)
+                if node_emmet != nodes_emmet[node_index]:
+                    self.source_map_recorder.make_opaque(nodes[node_index], run_length)
+                node_emmet = f"({node_emmet})*{count}" if depth else f"{node_emmet}*{count}"
+                group_length = 1 if depth else 0
+                depth = 0
+                separator = "+"
+            elif self.config.html.minimal_grouping:
+                # Climbing up `depth` levels with `^` replaces `+`, while a group
+                # costs `(` and `)`, so it is cheaper only for deeply open nodes
+                if not is_last and depth > MAX_CLIMB_UP_DEPTH:
+                    node_emmet = f"({node_emmet})"
+                    group_length = 1
+                    depth = 0
+                separator = "^" * depth if depth else "+"
+            else:
+                if len(runs) > 1 and depth:
+                    node_emmet = f"({node_emmet})"
+                    group_length = 1
+                    depth = 0
+                separator = "+"
+
+            self.source_map_recorder.place(
+                nodes[node_index], sequence_length + len(indent) + group_length
+            )
+
+            if not is_last:
+                node_emmet = f"{node_emmet}{separator}{newline}"
+            sequence_emmet.append(f"{indent}{node_emmet}")
+            sequence_length += len(sequence_emmet[-1])
+
+        return "".join(sequence_emmet), depth
+
+    def _build_node_emmet(
+        self, node_pool: HtmlNodePool, node: HtmlNode, level: int
+    ) -> tuple[str, int]:
+        """
+        Build Emmet notation of node with its children, without indentation.
+        Returns the notation and the number of levels the Emmet context stays
+        below the node after it.
+        """
+        # Emmetify current node, top level nodes as if without parent, so nodes
+        # converted apart from their parent (e.g. chunks) expand to their own tags
+        parent_node = node_pool.get_node(node.parent_id) if node.parent_id and level else None
+        reference = self.node_referencer.get_reference(node_pool, node)
+        node_emmet = self._node_to_emmet(node, parent_node.tag if parent_node else None, reference)
+
+        # Get children nodes
+        direct_text_child_node, children_nodes = self._split_children(node_pool, node)
 
         # Emmetify children
-        children_emmet: list[str] = []
-        for child_node in children_nodes:
-            child_emmet = self._build_emmet(node_pool, child_node, level + 1)
-            children_emmet.append(child_emmet)
+        children_emmet_str, children_depth = self._build_sequence_emmet(
+            node_pool, children_nodes, level + 1
+        )
 
         # Emmetify direct text child node
         text_node_emmet = (
             self._node_to_emmet(direct_text_child_node) if direct_text_child_node else ""
         )
 
-        if self.config.indent:
-            children_emmet_str = "+\n".join(children_emmet)
-        else:
-            children_emmet_str = "+".join(children_emmet)
-
         if children_emmet_str:
             if self.config.indent:
                 children_group = f">\n{children_emmet_str}"
             else:
                 children_group = f">{children_emmet_str}"
+            depth = children_depth + 1
         else:
             children_group = ""
+            depth = 0
+
+        self.source_map_recorder.record_head(node, len(node_emmet))
+        if direct_text_child_node:
+            self.source_map_recorder.record_head(direct_text_child_node, len(text_node_emmet))
+            self.source_map_recorder.place(direct_text_child_node, len(node_emmet))
+        children_offset = len(node_emmet) + len(text_node_emmet)
+        self.source_map_recorder.shift(
+            children_nodes, children_offset + len(children_group) - len(children_emmet_str)
+        )
 
-        sibilings_count = node_pool.get_siblings_count(node.id)
-        is_node_with_siblings_and_children = sibilings_count > 0 and len(children_nodes) > 0
+        return f"{node_emmet}{text_node_emmet}{children_group}", depth
 
-        node_emmet_str = ""
-        if is_node_with_siblings_and_children:
-            node_emmet_str = f"({node_emmet}{text_node_emmet}{children_group})"
-        else:
-            node_emmet_str = f"{node_emmet}{text_node_emmet}{children_group}"
+    def convert(
+        self, node_pool: HtmlNodePool, tokenizer: Union[Tokenizer, None] = None
+    ) -> HtmlConverterResult:
+        """
+        Convert node pool to Emmet notation.
+        The tokenizer is only used for token costs, when reporting costs is enabled.
+        """
+        root_nodes = sorted(
+            (node_pool.get_node(root_id) for root_id in node_pool.get_root_ids()),
+            key=lambda node: node.sequence_index,
+        )
+        return self.convert_nodes(node_pool, root_nodes, tokenizer)
+
+    def convert_nodes(
+        self,
+        node_pool: HtmlNodePool,
+        nodes: list[HtmlNode],
+        tokenizer: Union[Tokenizer, None] = None,
+        keep_maps: bool = False,
+    ) -> HtmlConverterResult:
+        """
+        Convert sibling nodes with their subtrees to Emmet notation.
+        With keep_maps, token names of previous conversions are reused and the
+        result maps hold only the names used in this conversion.
+        """
+        self._reset_state(keep_maps)
+        result, _ = self._build_sequence_emmet(node_pool, nodes)
 
-        return f"{indent}{node_emmet_str}"
+        costs = (
+            self.cost_recorder.report(node_pool, nodes, result, tokenizer)
+            if self.config.html.report_costs
+            else []
+        )
 
-    def convert(self, node_pool: HtmlNodePool) -> HtmlConverterResult:
-        result = super().convert(node_pool)
+        source_map = (
+            self.source_map_recorder.report(node_pool, nodes)
+            if self.config.html.source_map
+            else None
+        )
 
         return HtmlConverterResult(
             result=result,
             maps=HtmlConverterMaps(
-                classes={v: k for k, v in self.classes_map.items()},
-                links={v: k for k, v in self.links_map.items()},
-                images={v: k for k, v in self.images_map.items()},
+                classes={v: k for k, v in self.classes_map.items() if v in self.used_names},
+                links={v: k for k, v in self.links_map.items() if v in self.used_names},
+                images={v: k for k, v in self.images_map.items() if v in self.used_names},
             ),
+            costs=costs,
+            references=dict(self.node_referencer.references),
+            source_map=source_map,
+            node_pool=node_pool,
         )
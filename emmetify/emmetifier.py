@@ -1,10 +1,16 @@
-from typing import Union
+from functools import partial
+from typing import Iterator, Union
 
 from emmetify.config import EmmetifierConfig
 from emmetify.converters import get_converter
-from emmetify.converters.html_converter import HtmlConverterResult
+from emmetify.converters.html_converter import HtmlConverterResult, HtmlConverterTokens
+from emmetify.optimizers import get_optimizer
+from emmetify.optimizers.html_chunker import HtmlChunk, HtmlSubtreeChunker
+from emmetify.optimizers.html_pruner import HtmlSubtreePruner
 from emmetify.parsers import get_parser
-from emmetify.types import DefaultFormat, SupportedFormats
+from emmetify.tokenizers import Tokenizer, get_tokenizer
+from emmetify.types import DefaultFormat, IntOrNoneType, SupportedFormats, TokenCounter
+from emmetify.utils.timings import StageTimer
 
 
 class Emmetifier:
@@ -12,15 +18,116 @@ class Emmetifier:
         self,
         format: SupportedFormats = DefaultFormat,
         config: Union[EmmetifierConfig, dict, None] = None,
+        tokenizer: Union[Tokenizer, TokenCounter, None] = None,
     ):
         self.config = EmmetifierConfig.model_validate(config) if config else EmmetifierConfig()
+        self.tokenizer = get_tokenizer(tokenizer)
 
         self._parser = get_parser(format, self.config)
+        self._optimizer = get_optimizer(format, self.config)
         self._converter = get_converter(format, self.config)
+        # Shared with the parser, which times parse and build stages
+        self._timer = StageTimer(self.config.html.report_timings)
+        self._parser.timer = self._timer
+
+    def emmetify(
+        self,
+        content: str,
+        max_tokens: IntOrNoneType = None,
+        tokenizer: Union[Tokenizer, TokenCounter, None] = None,
+    ) -> HtmlConverterResult:
+        """
+        Convert content to Emmet notation.
+
+        Args:
+            content: The content to convert
+            max_tokens: Optional token budget, lowest-value subtrees are pruned to fit in it
+            tokenizer: Optional tokenizer overriding the one of the Emmetifier, used for
+                the budget (approximate count by default) and token accounting
+
+        Returns:
+            The conversion result, with token count and pruned subtrees when budget is set,
+            and input and output token counts when a tokenizer is set, counted on first
+            access of `tokens` as counting input tokens encodes the whole input
+        """
+        tokenizer = get_tokenizer(tokenizer) if tokenizer is not None else self.tokenizer
+        self._timer.reset()
+
+        content_nodes = self._parser.parse(content)
+        with self._timer.stage("optimize"):
+            content_nodes = self._optimizer.optimize(content_nodes)
+        with self._timer.stage("convert"):
+            if max_tokens is not None:
+                pruner = HtmlSubtreePruner(self._converter, tokenizer)
+                result = pruner.prune(content_nodes, max_tokens)
+            else:
+                result = self._converter.convert(content_nodes, tokenizer)
+
+        if tokenizer is not None:
+            result.tokens_counter = partial(
+                self._count_tokens, tokenizer, content, result.result, result.token_count
+            )
+        result.timings = self._timer.timings
+        return result
+
+    def emmetify_chunks(
+        self,
+        content: str,
+        max_tokens: int,
+        tokenizer: Union[Tokenizer, TokenCounter, None] = None,
+    ) -> list[HtmlChunk]:
+        """
+        Convert content to self-contained Emmet chunks, e.g. for parallel LLM calls.
+
+        Args:
+            content: The content to convert
+            max_tokens: Token budget of a single chunk, use `len` as tokenizer for characters
+            tokenizer: Optional tokenizer overriding the one of the Emmetifier
+
+        Returns:
+            Chunks in document order, with their ancestor path and maps
+        """
+        return list(self.iter_chunks(content, max_tokens, tokenizer))
+
+    def iter_chunks(
+        self,
+        content: str,
+        max_tokens: int,
+        tokenizer: Union[Tokenizer, TokenCounter, None] = None,
+    ) -> Iterator[HtmlChunk]:
+        """Like `emmetify_chunks`, but yields every chunk as soon as it is converted."""
+        tokenizer = get_tokenizer(tokenizer) if tokenizer is not None else self.tokenizer
+        self._timer.reset()
 
-    def emmetify(self, content: str) -> HtmlConverterResult:
         content_nodes = self._parser.parse(content)
-        return self._converter.convert(content_nodes)
+        with self._timer.stage("optimize"):
+            content_nodes = self._optimizer.optimize(content_nodes)
+        chunker = HtmlSubtreeChunker(self._converter, tokenizer)
+        chunks = chunker.iter_chunks(content_nodes, max_tokens)
+        while True:
+            # Timed per chunk, without the time the consumer spends between chunks
+            with self._timer.stage("convert"):
+                chunk = next(chunks, None)
+            if chunk is None:
+                return
+            chunk.timings = self._timer.timings
+            self._timer.reset()
+            yield chunk
+
+    def _count_tokens(
+        self, tokenizer: Tokenizer, content: str, output: str, output_tokens: IntOrNoneType
+    ) -> HtmlConverterTokens:
+        input_tokens = tokenizer.count_tokens(content)
+        if output_tokens is None:
+            output_tokens = tokenizer.count_tokens(output)
+        compression_ratio = (
+            round((input_tokens - output_tokens) / input_tokens * 100, 2) if input_tokens else 0.0
+        )
+        return HtmlConverterTokens(
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            compression_ratio=compression_ratio,
+        )
 
     @classmethod
     def create(cls, format: SupportedFormats = DefaultFormat, **config_kwargs) -> "Emmetifier":
@@ -20,6 +20,11 @@ class HtmlNode(BaseNode):
     next_sibling_id: StrOrNoneType = None
     prev_sibling_id: StrOrNoneType = None
     non_text_children_count: int = 0
+    # Absolute XPath of the element in the source html, before optimizations
+    source_xpath: StrOrNoneType = None
+    # Position of the element start tag in the source html, line from 1 and column from 0
+    source_line: IntOrNoneType = None
+    source_column: IntOrNoneType = None
 
     def __str__(self) -> str:
         """String representation of html node for printing."""
@@ -40,6 +45,31 @@ class HtmlNode(BaseNode):
         return self.prev_sibling_id is not None or self.next_sibling_id is not None
 
 
+@dataclass
+class HtmlNodeIndex:
+    """Lookup tables of html nodes, node ids are listed in document order."""
+
+    tags: dict[str, list[str]] = field(default_factory=dict)
+    classes: dict[str, list[str]] = field(default_factory=dict)
+    # First node with the id, as ids may repeat in real-world html
+    ids: dict[str, str] = field(default_factory=dict)
+    duplicate_ids: set[str] = field(default_factory=set)
+    attributes: dict[str, list[str]] = field(default_factory=dict)
+    pre_order: dict[str, int] = field(default_factory=dict)
+    post_order: dict[str, int] = field(default_factory=dict)
+
+    def is_ancestor(self, ancestor_id: str, node_id: str) -> bool:
+        """Check if node is a descendant of ancestor in constant time."""
+        return (
+            self.pre_order[ancestor_id] < self.pre_order[node_id]
+            and self.post_order[node_id] < self.post_order[ancestor_id]
+        )
+
+    def get_descendant_ids(self, ancestor_id: str, node_ids: list[str]) -> list[str]:
+        """Filter node ids to descendants of ancestor."""
+        return [node_id for node_id in node_ids if self.is_ancestor(ancestor_id, node_id)]
+
+
 class HtmlNodePool(BaseNodePool[HtmlNode]):
     """Manages a collection of html nodes for a single HTML conversion."""
 
@@ -48,6 +78,8 @@ class HtmlNodePool(BaseNodePool[HtmlNode]):
         self._nodes: dict[str, HtmlNode] = {}
         self._root_ids: set[str] = set()
         self._sequence_counter = 0
+        # Built on first use, dropped whenever the tree changes
+        self._index: Union[HtmlNodeIndex, None] = None
 
     def get_nodes_count(self) -> int:
         """Get number of nodes in the pool."""
@@ -65,6 +97,7 @@ class HtmlNodePool(BaseNodePool[HtmlNode]):
             self._sequence_counter += 1
             sequence_index = self._sequence_counter
 
+        self._index = None
         node = HtmlNode(
             id=new_id,
             tag="#text",
@@ -76,16 +109,22 @@ class HtmlNodePool(BaseNodePool[HtmlNode]):
         self._nodes[new_id] = node
         return new_id
 
-    def get_or_create_node(self, tag: Tag, is_root: bool = False) -> str:
+    def get_or_create_node(
+        self, tag: Tag, is_root: bool = False, source_xpath: StrOrNoneType = None
+    ) -> str:
         """Get existing node or create new one."""
         self._sequence_counter += 1
         new_id = self.get_next_id()
+        self._index = None
 
         node = HtmlNode(
             id=new_id,
             tag=tag.name,
             attrs=tag.attrs,
             sequence_index=self._sequence_counter,
+            source_xpath=source_xpath,
+            source_line=tag.sourceline,
+            source_column=tag.sourcepos,
         )
 
         self._nodes[new_id] = node
@@ -104,6 +143,7 @@ class HtmlNodePool(BaseNodePool[HtmlNode]):
 
     def update_parent_child(self, child_id: str, parent_id: str) -> None:
         """Update parent-child relationship between nodes."""
+        self._index = None
         child_node = self._nodes[child_id]
         parent_node = self._nodes[parent_id]
 
@@ -126,6 +166,110 @@ class HtmlNodePool(BaseNodePool[HtmlNode]):
         if not child_node.is_text_node:
             parent_node.non_text_children_count += 1
 
+    def _relink_siblings(self, children_ids: list[str]) -> None:
+        """Recompute sibling relationships for an ordered list of sibling nodes."""
+        for index, child_id in enumerate(children_ids):
+            curr_node = self._nodes[child_id]
+            curr_node.prev_sibling_id = children_ids[index - 1] if index > 0 else None
+            curr_node.next_sibling_id = (
+                children_ids[index + 1] if index < len(children_ids) - 1 else None
+            )
+
+    def unwrap_node(self, node_id: str) -> None:
+        """Remove node from the tree, moving its children into its place."""
+        self._index = None
+        node = self._nodes.pop(node_id)
+        parent = self._nodes.get(node.parent_id) if node.parent_id else None
+
+        for child_id in node.children_ids:
+            self._nodes[child_id].parent_id = node.parent_id
+
+        if parent is None:
+            self._root_ids.discard(node_id)
+            for child_id in node.children_ids:
+                child_node = self._nodes[child_id]
+                child_node.prev_sibling_id = None
+                child_node.next_sibling_id = None
+                if not child_node.is_text_node:
+                    self._root_ids.add(child_id)
+            return
+
+        index = parent.children_ids.index(node_id)
+        parent.children_ids[slice(index, index + 1)] = node.children_ids
+        parent.non_text_children_count += node.non_text_children_count - 1
+        self._relink_siblings(parent.children_ids)
+
+    def remove_node(self, node_id: str) -> None:
+        """Remove node with all its descendants from the tree."""
+        self._index = None
+        node = self._nodes[node_id]
+        parent = self._nodes.get(node.parent_id) if node.parent_id else None
+
+        stack = [node_id]
+        while stack:
+            removed_node = self._nodes.pop(stack.pop())
+            stack.extend(removed_node.children_ids)
+
+        if parent is None:
+            self._root_ids.discard(node_id)
+            return
+
+        parent.children_ids.remove(node_id)
+        if not node.is_text_node:
+            parent.non_text_children_count -= 1
+        # Only the neighbours change, relinking all siblings is quadratic for wide nodes
+        if node.prev_sibling_id is not None:
+            self._nodes[node.prev_sibling_id].next_sibling_id = node.next_sibling_id
+        if node.next_sibling_id is not None:
+            self._nodes[node.next_sibling_id].prev_sibling_id = node.prev_sibling_id
+
+    def get_index(self) -> HtmlNodeIndex:
+        """
+        Get lookup tables of tags, classes, ids and attribute names, with pre-order and
+        post-order numbers of nodes. The index is kept until the tree changes.
+        """
+        if self._index is None:
+            self._index = self._build_index()
+        return self._index
+
+    def _build_index(self) -> HtmlNodeIndex:
+        index = HtmlNodeIndex()
+        pre_counter = post_counter = 0
+
+        root_ids = sorted(self._root_ids, key=lambda root_id: self._nodes[root_id].sequence_index)
+        # Nodes are visited twice, before (False) and after (True) their children
+        stack = [(root_id, False) for root_id in reversed(root_ids)]
+        while stack:
+            node_id, is_visited = stack.pop()
+            if is_visited:
+                index.post_order[node_id] = post_counter
+                post_counter += 1
+                continue
+
+            node = self._nodes[node_id]
+            index.pre_order[node_id] = pre_counter
+            pre_counter += 1
+            stack.append((node_id, True))
+            stack.extend((child_id, False) for child_id in reversed(node.children_ids))
+            if node.is_text_node:
+                continue
+
+            index.tags.setdefault(node.tag, []).append(node_id)
+            for attr in node.attrs:
+                index.attributes.setdefault(attr, []).append(node_id)
+            classes = node.attrs.get("class") or []
+            if isinstance(classes, str):
+                classes = classes.split()
+            for class_name in dict.fromkeys(classes):
+                index.classes.setdefault(class_name, []).append(node_id)
+            node_html_id = node.attrs.get("id")
+            if node_html_id in index.ids:
+                index.duplicate_ids.add(node_html_id)
+            elif node_html_id:
+                index.ids[node_html_id] = node_id
+
+        return index
+
     def get_siblings_count(self, node_id: str) -> int:
         """Get number of siblings for a node."""
         node = self._nodes[node_id]
@@ -0,0 +1,14 @@
+from emmetify.config.base_config import EmmetifierConfig
+from emmetify.nodes.html_nodes import HtmlNodePool
+from emmetify.optimizers.base_optimizer import BaseOptimizer
+from emmetify.optimizers.html_optimizer import HtmlOptimizer
+from emmetify.types import DefaultFormat, SupportedFormats
+
+
+def get_optimizer(
+    format: SupportedFormats, config: EmmetifierConfig
+) -> BaseOptimizer[HtmlNodePool]:
+    optimizers: dict[SupportedFormats, BaseOptimizer[HtmlNodePool]] = {
+        "html": HtmlOptimizer(config),
+    }
+    return optimizers.get(format, optimizers[DefaultFormat])
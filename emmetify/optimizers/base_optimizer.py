@@ -0,0 +1,16 @@
+from abc import ABC, abstractmethod
+from typing import Generic
+
+from emmetify.config.base_config import EmmetifierConfig
+from emmetify.nodes.base_nodes import NP
+
+
+class BaseOptimizer(Generic[NP], ABC):
+    """Base interface for tree-rewrite passes run between parsing and conversion"""
+
+    def __init__(self, config: EmmetifierConfig):
+        self.config = config
+
+    @abstractmethod
+    def optimize(self, node_pool: NP) -> NP:
+        raise NotImplementedError
@@ -0,0 +1,116 @@
+from dataclasses import dataclass, field
+from typing import Iterator, Union
+
+from emmetify.converters.html_converter import HtmlConverter, HtmlConverterMaps, HtmlNodeReference
+from emmetify.nodes.html_nodes import HtmlNode, HtmlNodePool
+from emmetify.tokenizers import ApproximateTokenizer, Tokenizer, get_tokenizer
+from emmetify.types import TokenCounter
+from emmetify.utils.paths import get_node_selector
+
+
+@dataclass
+class HtmlChunk:
+    result: str
+    maps: HtmlConverterMaps
+    # Css-like path of the ancestors of chunk nodes, empty for root nodes
+    path: str
+    token_count: int
+    node_ids: list[str] = field(default_factory=list)
+    references: dict[str, HtmlNodeReference] = field(default_factory=dict)
+    # Seconds spent on the chunk by stage, the first chunk includes parsing, with report_timings
+    timings: dict[str, float] = field(default_factory=dict)
+
+
+class HtmlSubtreeChunker:
+    """
+    Splits converted html into self-contained Emmet chunks fitting in a token budget.
+    Chunks are cut only between sibling subtrees, a subtree too large for a single
+    chunk is split into chunks of its children with the subtree node in their path.
+    """
+
+    def __init__(
+        self,
+        converter: HtmlConverter,
+        tokenizer: Union[Tokenizer, TokenCounter, None] = None,
+    ):
+        self.converter = converter
+        self.tokenizer = get_tokenizer(tokenizer) or ApproximateTokenizer()
+
+    def _count_nodes_tokens(self, node_pool: HtmlNodePool, nodes: list[HtmlNode]) -> int:
+        result = self.converter.convert_nodes(node_pool, nodes, keep_maps=True)
+        return self.tokenizer.count_tokens(result.result)
+
+    def _chunk_siblings(
+        self,
+        node_pool: HtmlNodePool,
+        nodes: list[HtmlNode],
+        path: str,
+        max_tokens: int,
+    ) -> Iterator[HtmlChunk]:
+        """Pack consecutive siblings into chunks, descending into subtrees over the budget."""
+        group: list[HtmlNode] = []
+        group_tokens = 0
+        for node in nodes:
+            node_tokens = self._count_nodes_tokens(node_pool, [node])
+            if group and group_tokens + node_tokens > max_tokens:
+                yield from self._render_chunks(node_pool, group, path, max_tokens)
+                group, group_tokens = [], 0
+
+            if node_tokens > max_tokens and node.children_ids:
+                children_nodes = [node_pool.get_node(child_id) for child_id in node.children_ids]
+                node_path = f"{path}>{get_node_selector(node)}" if path else get_node_selector(node)
+                yield from self._chunk_siblings(node_pool, children_nodes, node_path, max_tokens)
+                continue
+
+            group.append(node)
+            # One more token for the `+` sibling operator
+            group_tokens += node_tokens + 1
+
+        if group:
+            yield from self._render_chunks(node_pool, group, path, max_tokens)
+
+    def _render_chunks(
+        self,
+        node_pool: HtmlNodePool,
+        nodes: list[HtmlNode],
+        path: str,
+        max_tokens: int,
+    ) -> Iterator[HtmlChunk]:
+        """Render siblings as a chunk, halving them when counts of siblings were too low."""
+        result = self.converter.convert_nodes(node_pool, nodes, keep_maps=True)
+        token_count = self.tokenizer.count_tokens(result.result)
+
+        if token_count > max_tokens and len(nodes) > 1:
+            middle = len(nodes) // 2
+            yield from self._render_chunks(node_pool, nodes[:middle], path, max_tokens)
+            yield from self._render_chunks(node_pool, nodes[middle:], path, max_tokens)
+            return
+
+        # Leaves too large for the budget are kept whole in their own chunk
+        yield HtmlChunk(
+            result=result.result,
+            maps=result.maps,
+            path=path,
+            token_count=token_count,
+            node_ids=[node.id for node in nodes],
+            references=result.references,
+        )
+
+    def chunk(self, node_pool: HtmlNodePool, max_tokens: int) -> list[HtmlChunk]:
+        """
+        Split node pool into chunks of at most max_tokens, in document order.
+        Token names of simplified classes, links and images are shared by all chunks,
+        every chunk carries only the part of the maps it uses.
+        """
+        return list(self.iter_chunks(node_pool, max_tokens))
+
+    def iter_chunks(self, node_pool: HtmlNodePool, max_tokens: int) -> Iterator[HtmlChunk]:
+        """Like `chunk`, but yields every chunk as soon as it is rendered."""
+        root_nodes = sorted(
+            (node_pool.get_node(root_id) for root_id in node_pool.get_root_ids()),
+            key=lambda node: node.sequence_index,
+        )
+
+        # Start with empty maps, shared by all chunks
+        self.converter.convert_nodes(node_pool, [])
+        yield from self._chunk_siblings(node_pool, root_nodes, "", max_tokens)
@@ -0,0 +1,44 @@
+from emmetify.config.base_config import EmmetifierConfig
+from emmetify.nodes.html_nodes import HtmlNode, HtmlNodePool
+from emmetify.optimizers.base_optimizer import BaseOptimizer
+
+
+class HtmlOptimizer(BaseOptimizer[HtmlNodePool]):
+    """Rewrites html node pool to reduce node count before conversion"""
+
+    def __init__(self, config: EmmetifierConfig):
+        super().__init__(config)
+        self.wrapper_tags = set(config.html.wrapper_tags_to_collapse)
+
+    def _is_collapsible_wrapper(self, node: HtmlNode, node_pool: HtmlNodePool) -> bool:
+        """Check if node is an attribute-less wrapper around a single element."""
+        if node.is_text_node or node.attrs or node.tag not in self.wrapper_tags:
+            return False
+        if len(node.children_ids) != 1:
+            return False
+        child_node = node_pool.get_node(node.children_ids[0])
+        return child_node is not None and not child_node.is_text_node
+
+    def collapse_wrappers(self, node_pool: HtmlNodePool) -> HtmlNodePool:
+        """Collapse chains like div>div>div>span into span."""
+        stack = sorted(node_pool.get_root_ids(), reverse=True)
+        while stack:
+            node = node_pool.get_node(stack.pop())
+            if node is None:
+                continue
+            if self._is_collapsible_wrapper(node, node_pool):
+                child_id = node.children_ids[0]
+                node_pool.unwrap_node(node.id)
+                stack.append(child_id)
+                continue
+            stack.extend(reversed(node.children_ids))
+
+        if self.config.debug:
+            print(f"Nodes count after wrappers collapse: {node_pool.get_nodes_count()}")
+
+        return node_pool
+
+    def optimize(self, node_pool: HtmlNodePool) -> HtmlNodePool:
+        if self.config.html.collapse_wrappers:
+            node_pool = self.collapse_wrappers(node_pool)
+        return node_pool
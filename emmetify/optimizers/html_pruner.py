@@ -0,0 +1,211 @@
+from dataclasses import dataclass
+from typing import Union
+
+from emmetify.converters.html_converter import HtmlConverter, HtmlConverterResult, HtmlPrunedSubtree
+from emmetify.nodes.html_nodes import HtmlNode, HtmlNodePool
+from emmetify.tokenizers import ApproximateTokenizer, Tokenizer, get_tokenizer
+from emmetify.types import StrOrNoneType, TokenCounter
+from emmetify.utils.paths import get_node_selector
+
+# How much less valuable is each level of nesting
+DEPTH_WEIGHT = 0.1
+# How much of the link text counts as content, navigation is mostly boilerplate
+LINK_TEXT_WEIGHT = 0.25
+# How many times over the excess tokens a subtree may be to get pruned
+OVERSHOOT_FACTOR = 2
+
+
+@dataclass
+class HtmlSubtreeStats:
+    node_id: str
+    parent_id: StrOrNoneType
+    path: str
+    depth: int
+    tokens: int
+    text_chars: int
+    link_chars: int
+
+    @property
+    def score(self) -> float:
+        """Value of the subtree per token, lowest scored subtrees are pruned first."""
+        content_chars = self.text_chars - self.link_chars
+        value = content_chars + LINK_TEXT_WEIGHT * self.link_chars + 1
+        return value / max(self.tokens, 1) / (1 + DEPTH_WEIGHT * self.depth)
+
+
+class HtmlSubtreePruner:
+    """Prunes lowest-value subtrees until converted html fits in a token budget"""
+
+    def __init__(
+        self,
+        converter: HtmlConverter,
+        tokenizer: Union[Tokenizer, TokenCounter, None] = None,
+    ):
+        self.converter = converter
+        self.tokenizer = get_tokenizer(tokenizer) or ApproximateTokenizer()
+
+    def _node_tokens(self, node: HtmlNode) -> int:
+        """Estimate tokens of a single node in Emmet notation."""
+        if node.is_text_node:
+            return self.tokenizer.count_tokens(node.text_content or "")
+        attr_values = " ".join(
+            " ".join(value) if isinstance(value, list) else str(value)
+            for value in node.attrs.values()
+        )
+        return self.tokenizer.count_tokens(f"{node.tag} {attr_values}") + 1
+
+    def collect_stats(self, node_pool: HtmlNodePool) -> dict[str, HtmlSubtreeStats]:
+        """Collect size, depth, text and link density of every subtree in the pool."""
+        stats: dict[str, HtmlSubtreeStats] = {}
+
+        def visit(node: HtmlNode, path: str, depth: int, in_link: bool) -> HtmlSubtreeStats:
+            node_stats = HtmlSubtreeStats(
+                node_id=node.id,
+                parent_id=node.parent_id,
+                path=path,
+                depth=depth,
+                tokens=self._node_tokens(node),
+                text_chars=len(node.text_content or "") if node.is_text_node else 0,
+                link_chars=0,
+            )
+            if node.is_text_node and in_link:
+                node_stats.link_chars = node_stats.text_chars
+
+            for child_id in node.children_ids:
+                child_node = node_pool.get_node(child_id)
+                child_path = f"{path}>{get_node_selector(child_node)}"
+                child_stats = visit(child_node, child_path, depth + 1, in_link or node.tag == "a")
+                node_stats.tokens += child_stats.tokens
+                node_stats.text_chars += child_stats.text_chars
+                node_stats.link_chars += child_stats.link_chars
+
+            stats[node.id] = node_stats
+            return node_stats
+
+        for root_id in node_pool.get_root_ids():
+            root_node = node_pool.get_node(root_id)
+            visit(root_node, get_node_selector(root_node), 0, False)
+
+        return stats
+
+    def _prune_subtree(
+        self,
+        node_pool: HtmlNodePool,
+        node_stats: HtmlSubtreeStats,
+        stats: dict[str, HtmlSubtreeStats],
+        pruned: dict[str, HtmlPrunedSubtree],
+        pruned_below: dict[str, int],
+    ) -> int:
+        """
+        Remove subtree from the pool and record it in pruned subtrees.
+        Returns the tokens pruned with it, without those of descendants pruned before.
+        """
+        node_pool.remove_node(node_stats.node_id)
+        pruned[node_stats.node_id] = HtmlPrunedSubtree(
+            node_id=node_stats.node_id,
+            path=node_stats.path,
+            tokens=node_stats.tokens,
+            score=node_stats.score,
+        )
+
+        # Descendants pruned before are part of this subtree now
+        pruned_tokens = node_stats.tokens - pruned_below.pop(node_stats.node_id, 0)
+        parent_id = node_stats.parent_id
+        while parent_id is not None:
+            pruned_below[parent_id] = pruned_below.get(parent_id, 0) + pruned_tokens
+            parent_id = stats[parent_id].parent_id
+        return pruned_tokens
+
+    def _outermost_pruned(
+        self, pruned: dict[str, HtmlPrunedSubtree], stats: dict[str, HtmlSubtreeStats]
+    ) -> list[HtmlPrunedSubtree]:
+        """Pruned subtrees without those pruned later together with their ancestors."""
+
+        def has_pruned_ancestor(node_id: str) -> bool:
+            parent_id = stats[node_id].parent_id
+            while parent_id is not None:
+                if parent_id in pruned:
+                    return True
+                parent_id = stats[parent_id].parent_id
+            return False
+
+        return [subtree for node_id, subtree in pruned.items() if not has_pruned_ancestor(node_id)]
+
+    def _next_candidate(
+        self,
+        node_pool: HtmlNodePool,
+        candidates: list[HtmlSubtreeStats],
+        start: int,
+        max_tokens: int,
+    ) -> int:
+        """Position of the first candidate from start still in the pool and within max_tokens."""
+        for index in range(start, len(candidates)):
+            candidate = candidates[index]
+            if candidate.tokens <= max_tokens and node_pool.get_node(candidate.node_id):
+                return index
+        return len(candidates)
+
+    def prune(self, node_pool: HtmlNodePool, max_tokens: int) -> HtmlConverterResult:
+        """
+        Convert node pool, pruning lowest-value subtrees until the result fits in max_tokens.
+        Root nodes are never pruned, so the result may still exceed a very small budget.
+        """
+        result = self.converter.convert(node_pool, self.tokenizer)
+        token_count = self.tokenizer.count_tokens(result.result)
+        if token_count <= max_tokens:
+            result.token_count = token_count
+            return result
+
+        stats = self.collect_stats(node_pool)
+        candidates = sorted(
+            (node_stats for node_stats in stats.values() if node_stats.parent_id is not None),
+            key=lambda node_stats: (node_stats.score, -node_stats.tokens),
+        )
+
+        pruned: dict[str, HtmlPrunedSubtree] = {}
+        # Tokens of pruned descendants by ancestor, so pruned tokens are counted once
+        pruned_below: dict[str, int] = {}
+        pruned_tokens = rendered_pruned_tokens = 0
+        estimated_tokens = token_count
+        is_rendered = True
+        # Candidates before the position are pruned or over the size limit,
+        # they are scanned again only when the limit grows
+        position = 0
+        max_candidate_tokens = 0
+        while candidates:
+            # Prefer lowest-value subtrees which do not overshoot the budget much
+            excess_tokens = estimated_tokens - max_tokens
+            if excess_tokens * OVERSHOOT_FACTOR > max_candidate_tokens:
+                position = 0
+            max_candidate_tokens = excess_tokens * OVERSHOOT_FACTOR
+            position = self._next_candidate(node_pool, candidates, position, max_candidate_tokens)
+            node_stats = candidates[position] if position < len(candidates) else None
+
+            # Estimates are approximate, so verify them by rendering
+            if estimated_tokens <= max_tokens or (node_stats is None and not is_rendered):
+                result = self.converter.convert(node_pool, self.tokenizer)
+                token_count = estimated_tokens = self.tokenizer.count_tokens(result.result)
+                rendered_pruned_tokens = pruned_tokens
+                is_rendered = True
+                if token_count <= max_tokens:
+                    break
+                # Drop subtrees pruned together with their ancestors
+                candidates = [c for c in candidates if node_pool.get_node(c.node_id)]
+                position = 0
+                continue
+
+            # Fall back to the smallest of the remaining subtrees, all in the pool after rendering
+            if node_stats is None:
+                node_stats = min(candidates, key=lambda c: c.tokens)
+
+            pruned_tokens += self._prune_subtree(node_pool, node_stats, stats, pruned, pruned_below)
+            estimated_tokens = token_count - (pruned_tokens - rendered_pruned_tokens)
+            is_rendered = False
+
+        if not is_rendered:
+            result = self.converter.convert(node_pool, self.tokenizer)
+            token_count = self.tokenizer.count_tokens(result.result)
+
+        result.token_count = token_count
+        result.pruned = self._outermost_pruned(pruned, stats)
+        return result
@@ -1,12 +1,12 @@
 from emmetify.config.base_config import EmmetifierConfig
-from emmetify.nodes.base_nodes import BaseNodePool
+from emmetify.nodes.html_nodes import HtmlNodePool
 from emmetify.parsers.base_parser import BaseParser
 from emmetify.parsers.html_parser import HtmlParser
 from emmetify.types import DefaultFormat, SupportedFormats
 
 
-def get_parser(format: SupportedFormats, config: EmmetifierConfig) -> BaseParser[BaseNodePool]:
-    parsers: dict[SupportedFormats, BaseParser[BaseNodePool]] = {
+def get_parser(format: SupportedFormats, config: EmmetifierConfig) -> BaseParser[HtmlNodePool]:
+    parsers: dict[SupportedFormats, BaseParser[HtmlNodePool]] = {
         "html": HtmlParser(config),
     }
     return parsers.get(format, parsers[DefaultFormat])
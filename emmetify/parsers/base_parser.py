@@ -3,11 +3,14 @@ from typing import Generic
 
 from emmetify.config.base_config import EmmetifierConfig
 from emmetify.nodes.base_nodes import NP
+from emmetify.utils.timings import StageTimer
 
 
 class BaseParser(Generic[NP], ABC):
     def __init__(self, config: EmmetifierConfig):
         self.config = config
+        # Set by the Emmetifier to share its timer
+        self.timer = StageTimer(enabled=False)
 
     @abstractmethod
     def parse(self, content: str) -> NP:
@@ -1,28 +1,96 @@
-from bs4 import BeautifulSoup, Comment, NavigableString, Tag
+from collections import Counter
+from typing import Iterator
+
+from bs4 import BeautifulSoup, Comment, NavigableString, PageElement, Tag
 
 from emmetify.config.base_config import EmmetifierConfig
 from emmetify.nodes.html_nodes import HtmlNodePool
 from emmetify.parsers.base_parser import BaseParser
 
 
+def get_source_xpaths(tags: list[Tag], parent_xpath: str) -> Iterator[str]:
+    """
+    Absolute XPaths of sibling tags, with positions only for tags repeated among them.
+    Skipped and merged tags count, as they are still in the source html.
+    """
+    counts = Counter(tag.name for tag in tags)
+    positions: Counter[str] = Counter()
+    for tag in tags:
+        positions[tag.name] += 1
+        step = f"{tag.name}[{positions[tag.name]}]" if counts[tag.name] > 1 else tag.name
+        yield f"{parent_xpath}/{step}"
+
+
 class HtmlParser(BaseParser[HtmlNodePool]):
     def __init__(self, config: EmmetifierConfig):
         super().__init__(config)
         self.skip_tags = self._get_skip_tags()
+        self.merge_inline_tags = self._get_merge_inline_tags()
 
     def _get_skip_tags(self) -> set[str]:
         if self.config.html.skip_tags:
             return set(self.config.html.tags_to_skip)
         return set()
 
-    def _process_node_contents(self, node: Tag, node_pool: HtmlNodePool) -> list[str]:
-        content_ids = []
+    def _get_merge_inline_tags(self) -> set[str]:
+        if self.config.html.merge_inline_text:
+            return set(self.config.html.inline_tags_to_merge) - self.skip_tags
+        return set()
+
+    def _is_mergeable_inline(self, tag: Tag) -> bool:
+        """Check if tag is an attribute-less inline tag holding text only."""
+        if tag.name not in self.merge_inline_tags or tag.attrs:
+            return False
+        return all(
+            isinstance(content, NavigableString)
+            or (isinstance(content, Tag) and self._is_mergeable_inline(content))
+            for content in tag.contents
+        )
+
+    def _get_inline_text(self, content: PageElement) -> str:
+        """Get raw text of a string or mergeable inline tag, without comments."""
+        if isinstance(content, Comment):
+            return ""
+        if isinstance(content, NavigableString):
+            return str(content)
+        return "".join(self._get_inline_text(child) for child in content.contents)
+
+    def _flush_merged_text(
+        self, text_parts: list[str], content_ids: list[str], node_pool: HtmlNodePool
+    ) -> None:
+        """Create a single text node from text merged with inline tags."""
+        text = "".join(text_parts).strip()
+        text_parts.clear()
+        if text:
+            content_ids.append(node_pool.create_text_node(text))
+
+    def _process_node_contents(
+        self, node: Tag, node_pool: HtmlNodePool, xpath: str = ""
+    ) -> list[str]:
+        content_ids: list[str] = []
+        merged_text_parts: list[str] = []
+        source_xpaths = get_source_xpaths(
+            [content for content in node.contents if isinstance(content, Tag)], xpath
+        )
 
         for content in node.contents:
+            content_xpath = next(source_xpaths) if isinstance(content, Tag) else None
+
             # Skip comments
             if isinstance(content, Comment):
                 continue
 
+            # Merge text with surrounding attribute-less inline tags
+            if self.merge_inline_tags and (
+                isinstance(content, NavigableString)
+                or (isinstance(content, Tag) and self._is_mergeable_inline(content))
+            ):
+                merged_text_parts.append(self._get_inline_text(content))
+                continue
+
+            if merged_text_parts:
+                self._flush_merged_text(merged_text_parts, content_ids, node_pool)
+
             # Skip empty text nodes
             if isinstance(content, NavigableString):
                 text = str(content).strip()
@@ -33,27 +101,28 @@ class HtmlParser(BaseParser[HtmlNodePool]):
             # Skip unnecessary tags
             elif isinstance(content, Tag):
                 if content.name not in self.skip_tags:
-                    tag_id = node_pool.get_or_create_node(content)
+                    tag_id = node_pool.get_or_create_node(content, source_xpath=content_xpath)
                     content_ids.append(tag_id)
 
-                    child_ids = self._process_node_contents(content, node_pool)
+                    child_ids = self._process_node_contents(content, node_pool, content_xpath)
                     for child_id in child_ids:
                         node_pool.update_parent_child(child_id, tag_id)
 
+        if merged_text_parts:
+            self._flush_merged_text(merged_text_parts, content_ids, node_pool)
+
         return content_ids
 
     def _build_tree(self, soup: BeautifulSoup) -> HtmlNodePool:
         """Build tree structure handling both text and tag nodes."""
         node_pool = HtmlNodePool()
 
-        root_tags: list[Tag] = []
-        for tag in soup.children:
-            if isinstance(tag, Tag) and tag.name not in self.skip_tags:
-                root_tags.append(tag)
-
-        for root_tag in root_tags:
-            root_id = node_pool.get_or_create_node(root_tag, is_root=True)
-            content_ids = self._process_node_contents(root_tag, node_pool)
+        root_tags = [tag for tag in soup.children if isinstance(tag, Tag)]
+        for root_tag, root_xpath in zip(root_tags, get_source_xpaths(root_tags, "")):
+            if root_tag.name in self.skip_tags:
+                continue
+            root_id = node_pool.get_or_create_node(root_tag, is_root=True, source_xpath=root_xpath)
+            content_ids = self._process_node_contents(root_tag, node_pool, root_xpath)
 
             for content_id in content_ids:
                 node_pool.update_parent_child(content_id, root_id)
@@ -64,8 +133,10 @@ class HtmlParser(BaseParser[HtmlNodePool]):
         return node_pool
 
     def parse(self, content: str) -> HtmlNodePool:
-        soup = BeautifulSoup(content, "html.parser")
-        node_pool = self._build_tree(soup)
+        with self.timer.stage("parse"):
+            soup = BeautifulSoup(content, "html.parser")
+        with self.timer.stage("build"):
+            node_pool = self._build_tree(soup)
         if self.config.debug:
             node_pool.print_tree()
         return node_pool
@@ -0,0 +1,29 @@
+from typing import Union
+
+from emmetify.tokenizers.approximate_tokenizer import ApproximateTokenizer
+from emmetify.tokenizers.base_tokenizer import Tokenizer
+from emmetify.tokenizers.cached_tokenizer import CachedTokenizer
+from emmetify.tokenizers.callable_tokenizer import CallableTokenizer
+from emmetify.tokenizers.tiktoken_tokenizer import TiktokenTokenizer
+from emmetify.types import TokenCounter
+
+
+def get_tokenizer(tokenizer: Union[Tokenizer, TokenCounter, None]) -> Union[Tokenizer, None]:
+    """Wrap tokenizer or token counting function to cache counts of repeated short texts."""
+    if tokenizer is None:
+        return None
+    if isinstance(tokenizer, (ApproximateTokenizer, CachedTokenizer)):
+        return tokenizer
+    if not isinstance(tokenizer, Tokenizer):
+        tokenizer = CallableTokenizer(tokenizer)
+    return CachedTokenizer(tokenizer)
+
+
+__all__ = [
+    "ApproximateTokenizer",
+    "CachedTokenizer",
+    "CallableTokenizer",
+    "TiktokenTokenizer",
+    "Tokenizer",
+    "get_tokenizer",
+]
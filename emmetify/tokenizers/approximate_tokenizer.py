@@ -0,0 +1,8 @@
+from emmetify.utils.tokens import count_tokens_approximately
+
+
+class ApproximateTokenizer:
+    """Zero-dependency tokenizer approximating token count from text length"""
+
+    def count_tokens(self, text: str) -> int:
+        return count_tokens_approximately(text)
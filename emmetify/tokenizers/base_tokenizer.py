@@ -0,0 +1,9 @@
+from typing import Protocol, runtime_checkable
+
+
+@runtime_checkable
+class Tokenizer(Protocol):
+    """Counts tokens of a text, e.g. with the tokenizer of the target LLM"""
+
+    def count_tokens(self, text: str) -> int:
+        """Number of tokens of the text"""
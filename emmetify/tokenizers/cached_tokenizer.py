@@ -0,0 +1,46 @@
+import re
+
+from emmetify.tokenizers.base_tokenizer import Tokenizer
+
+# Splits text into word-like pieces, similar to pre-tokenization of BPE tokenizers,
+# so counts of pieces repeated in html and Emmet (tags, classes, words) are cached
+PIECES_PATTERN = re.compile(r"'(?:[sdmt]|ll|ve|re)| ?[^\W\d_]+| ?\d{1,3}| ?(?:[^\s\w]|_)+|\s+")
+
+# Texts up to this length, like text nodes and attribute values, have their counts cached
+MAX_CACHED_TEXT_LENGTH = 256
+
+
+class CachedTokenizer:
+    """
+    Counts tokens with the wrapped tokenizer, caching counts of short texts repeated
+    across a page, like text nodes. Longer texts, e.g. whole results, are counted exactly.
+
+    With split_pieces, longer texts are counted as the sum of counts of their cached
+    pieces instead. That stays close to the exact count for BPE tokenizers, which encode
+    pre-tokenized pieces independently, but overcounts with tokenizers adding special
+    tokens to every encoded text.
+    """
+
+    def __init__(
+        self, tokenizer: Tokenizer, max_cache_size: int = 100_000, split_pieces: bool = False
+    ):
+        self.tokenizer = tokenizer
+        self.max_cache_size = max_cache_size
+        self.split_pieces = split_pieces
+        self._cache: dict[str, int] = {}
+
+    def _count_cached_tokens(self, text: str) -> int:
+        count = self._cache.get(text)
+        if count is None:
+            if len(self._cache) >= self.max_cache_size:
+                self._cache.clear()
+            count = self.tokenizer.count_tokens(text)
+            self._cache[text] = count
+        return count
+
+    def count_tokens(self, text: str) -> int:
+        if len(text) <= MAX_CACHED_TEXT_LENGTH:
+            return self._count_cached_tokens(text)
+        if self.split_pieces:
+            return sum(self._count_cached_tokens(piece) for piece in PIECES_PATTERN.findall(text))
+        return self.tokenizer.count_tokens(text)
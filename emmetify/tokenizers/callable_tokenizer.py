@@ -0,0 +1,11 @@
+from emmetify.types import TokenCounter
+
+
+class CallableTokenizer:
+    """Adapts a plain token counting function to the tokenizer protocol"""
+
+    def __init__(self, count_tokens: TokenCounter):
+        self._count_tokens = count_tokens
+
+    def count_tokens(self, text: str) -> int:
+        return self._count_tokens(text)
@@ -0,0 +1,22 @@
+from typing import Any
+
+from emmetify.types import StrOrNoneType
+
+
+class TiktokenTokenizer:
+    """Tokenizer of OpenAI models, requires the optional tiktoken package"""
+
+    def __init__(self, model: StrOrNoneType = None, encoding_name: str = "o200k_base"):
+        try:
+            import tiktoken
+        except ImportError as e:
+            raise ImportError(
+                "TiktokenTokenizer requires tiktoken, install it with `pip install tiktoken`"
+            ) from e
+
+        self.encoding: Any = (
+            tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding(encoding_name)
+        )
+
+    def count_tokens(self, text: str) -> int:
+        return len(self.encoding.encode(text, disallowed_special=()))
@@ -1,9 +1,12 @@
 import sys
-from typing import Literal
+from typing import Callable, Literal
 
 SupportedFormats = Literal["html"]
 DefaultFormat: SupportedFormats = "html"
 
+# Counts tokens of a text, e.g. with the tokenizer of the target LLM
+TokenCounter = Callable[[str], int]
+
 
 if sys.version_info >= (3, 10):
     # Python 3.10+ - Use native union operator
@@ -0,0 +1,21 @@
+from emmetify.nodes.html_nodes import HtmlNode
+
+
+def get_css_path(xpath: str) -> str:
+    """Css path of an absolute XPath made of tag name steps with optional positions."""
+    steps = []
+    for step in xpath.strip("/").split("/"):
+        tag, _, position = step.partition("[")
+        steps.append(f"{tag}:nth-of-type({position.rstrip(']')})" if position else tag)
+    return " > ".join(steps)
+
+
+def get_node_selector(node: HtmlNode) -> str:
+    """Short css-like selector of node for subtree paths."""
+    selector = node.tag
+    if node.attrs.get("id"):
+        selector += f"#{node.attrs['id']}"
+    classes = node.attrs.get("class")
+    if classes:
+        selector += f".{classes[0]}"
+    return selector
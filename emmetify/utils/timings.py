@@ -0,0 +1,26 @@
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Iterator
+
+
+class StageTimer:
+    """Measures seconds spent in named stages of a conversion, e.g. parse and convert"""
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self.reset()
+
+    def reset(self) -> None:
+        self.timings: dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Add the time spent in the block to the stage."""
+        if not self.enabled:
+            yield
+            return
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + perf_counter() - start
@@ -1,11 +1,24 @@
+from functools import lru_cache
+
 from emmetify.data import load_single_token_names
 
 
+@lru_cache(maxsize=None)
+def _get_single_token_names() -> tuple[str, ...]:
+    """Names loaded once, every conversion takes names from its own copy."""
+    return tuple(load_single_token_names())
+
+
 class SingleTokenNames:
     """List of english first names that are single tokens in most LLMs."""
 
     def __init__(self):
-        self._names: set[str] = set(load_single_token_names())
+        self._names: set[str] = set(_get_single_token_names())
 
     def get_name(self) -> str:
         return self._names.pop()
+
+
+def count_tokens_approximately(text: str) -> int:
+    """Approximate token count, LLM tokenizers average about 4 characters per token."""
+    return (len(text) + 3) // 4
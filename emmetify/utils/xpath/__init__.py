@@ -0,0 +1,33 @@
+from emmetify.utils.xpath.evaluator import XPathEvaluationError, XPathEvaluator, evaluate_xpath
+from emmetify.utils.xpath.lexer import XPathSyntaxError, XPathToken, tokenize_xpath
+from emmetify.utils.xpath.parser import XPathExpr, XPathParser, parse_xpath
+from emmetify.utils.xpath.restorer import (
+    XPathAttributeRestorer,
+    XPathRestorer,
+    find_attribute_literals,
+    quote_literal,
+    restore_classes_in_xpath,
+    restore_images_in_xpath,
+    restore_links_in_xpath,
+    restore_xpath_from_converter_maps,
+)
+
+__all__ = [
+    "XPathAttributeRestorer",
+    "XPathEvaluationError",
+    "XPathEvaluator",
+    "XPathExpr",
+    "XPathParser",
+    "XPathRestorer",
+    "XPathSyntaxError",
+    "XPathToken",
+    "evaluate_xpath",
+    "find_attribute_literals",
+    "parse_xpath",
+    "quote_literal",
+    "restore_classes_in_xpath",
+    "restore_images_in_xpath",
+    "restore_links_in_xpath",
+    "restore_xpath_from_converter_maps",
+    "tokenize_xpath",
+]
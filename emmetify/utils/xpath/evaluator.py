@@ -0,0 +1,582 @@
+import math
+import re
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, Optional, Union
+
+from emmetify.converters.html_converter import HtmlConverterMaps
+from emmetify.nodes.html_nodes import HtmlNode, HtmlNodePool
+from emmetify.utils.xpath.parser import (
+    XPathBinaryOp,
+    XPathExpr,
+    XPathFilterExpr,
+    XPathFunctionCall,
+    XPathLiteral,
+    XPathLocationPath,
+    XPathNegate,
+    XPathNumber,
+    XPathStep,
+    XPathVariable,
+    parse_xpath,
+)
+from emmetify.utils.xpath.restorer import XPathRestorer
+
+NUMBER_PATTERN = re.compile(r"\s*-?(?:\d+(?:\.\d*)?|\.\d+)\s*")
+
+
+class XPathEvaluationError(ValueError):
+    """Raised for valid XPath 1.0 expressions which can not be evaluated over node pool"""
+
+
+class XPathDocument:
+    """Root node of the node pool, parent of its root nodes."""
+
+
+@dataclass
+class XPathAttribute:
+    owner: HtmlNode
+    name: str
+    value: str
+
+
+XPathItem = Union[HtmlNode, XPathAttribute, XPathDocument]
+XPathValue = Union[list[XPathItem], str, float, bool]
+# Result of evaluation, elements are nodes and text nodes and attributes are strings
+XPathResult = Union[list[Union[HtmlNode, str]], str, float, bool]
+
+
+@dataclass
+class XPathContext:
+    item: XPathItem
+    position: int = 1
+    size: int = 1
+
+
+def _document_order(item: XPathItem) -> tuple[int, int, str]:
+    """Sort key of item in document order, unique for every item of the pool."""
+    if isinstance(item, XPathDocument):
+        return (-1, 0, "")
+    if isinstance(item, XPathAttribute):
+        return (item.owner.sequence_index, 1, item.name)
+    return (item.sequence_index, 0, "")
+
+
+def _in_document_order(items: Iterable[XPathItem]) -> list[XPathItem]:
+    unique = {_document_order(item): item for item in items}
+    return [unique[key] for key in sorted(unique)]
+
+
+def _attribute_value(value: object) -> str:
+    # Multi-valued attributes like class are lists of values
+    return " ".join(value) if isinstance(value, list) else str(value)
+
+
+def _format_number(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "Infinity" if value > 0 else "-Infinity"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+def _round(value: float) -> float:
+    if math.isnan(value) or math.isinf(value):
+        return value
+    return float(math.floor(value + 0.5))
+
+
+def _is_any_descendant_step(step: XPathStep) -> bool:
+    """Check if step is `//`, abbreviation of descendant-or-self::node()."""
+    return step.axis == "descendant-or-self" and step.node_test == "node()" and not step.predicates
+
+
+def _is_indexed_step(step: XPathStep) -> bool:
+    """Check if elements of the step can be looked up in the tag index of the pool."""
+    if step.axis not in ("child", "descendant"):
+        return False
+    return step.node_test != "*" and not step.node_test.endswith(("()", ":*"))
+
+
+class XPathEvaluator:
+    """
+    Evaluates XPath 1.0 expressions over html node pool, without re-parsing the html.
+    With converter maps, simplified classes, links and images are restored first,
+    so expressions written against Emmet output match the original nodes.
+    Comments and processing instructions are not in the pool, so they never match.
+    """
+
+    def __init__(self, node_pool: HtmlNodePool, converter_maps: Optional[HtmlConverterMaps] = None):
+        self.node_pool = node_pool
+        self.restorer = XPathRestorer(converter_maps) if converter_maps else None
+        self.document = XPathDocument()
+        self.functions: dict[str, Callable[[XPathContext, list[XPathExpr]], XPathValue]] = {
+            "last": lambda context, args: float(context.size),
+            "position": lambda context, args: float(context.position),
+            "count": self._count,
+            "name": self._name,
+            "local-name": self._local_name,
+            "string": self._string_function,
+            "concat": self._concat,
+            "contains": self._contains,
+            "starts-with": self._starts_with,
+            "ends-with": self._ends_with,
+            "substring-before": self._substring_before,
+            "substring-after": self._substring_after,
+            "substring": self._substring,
+            "string-length": self._string_length,
+            "normalize-space": self._normalize_space,
+            "translate": self._translate,
+            "boolean": lambda context, args: self.to_boolean(self._eval(args[0], context)),
+            "not": lambda context, args: not self.to_boolean(self._eval(args[0], context)),
+            "true": lambda context, args: True,
+            "false": lambda context, args: False,
+            "number": self._number_function,
+            "sum": self._sum,
+            "floor": lambda context, args: float(math.floor(self._number_arg(context, args))),
+            "ceiling": lambda context, args: float(math.ceil(self._number_arg(context, args))),
+            "round": lambda context, args: _round(self._number_arg(context, args)),
+        }
+
+    def evaluate(self, xpath: str) -> XPathResult:
+        """
+        Evaluate XPath expression with the root of the pool as context node.
+        Node-sets are lists in document order, with elements as html nodes and text nodes
+        and attributes as their string values, other results are strings, numbers or booleans.
+        Raises XPathSyntaxError for invalid expressions and XPathEvaluationError for
+        unsupported axes, functions and variables.
+        """
+        if self.restorer:
+            xpath = self.restorer.restore(xpath)
+        value = self._eval(parse_xpath(xpath), XPathContext(self.document))
+        if not isinstance(value, list):
+            return value
+        return [
+            (
+                item
+                if isinstance(item, HtmlNode) and not item.is_text_node
+                else self.string_value(item)
+            )
+            for item in value
+        ]
+
+    def select(self, xpath: str) -> list[HtmlNode]:
+        """Evaluate XPath expression selecting elements, other results are skipped."""
+        value = self.evaluate(xpath)
+        if not isinstance(value, list):
+            return []
+        return [item for item in value if isinstance(item, HtmlNode)]
+
+    # Conversions of values
+
+    def string_value(self, item: XPathItem) -> str:
+        """
+        String value of a node, text nodes of elements are joined with spaces,
+        as text is stored stripped of the whitespace between them.
+        """
+        if isinstance(item, XPathAttribute):
+            return item.value
+        if isinstance(item, HtmlNode) and item.is_text_node:
+            return item.text_content or ""
+        return " ".join(node.text_content for node in self._descendants(item) if node.is_text_node)
+
+    def to_string(self, value: XPathValue) -> str:
+        if isinstance(value, list):
+            return self.string_value(value[0]) if value else ""
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        if isinstance(value, float):
+            return _format_number(value)
+        return value
+
+    def to_number(self, value: XPathValue) -> float:
+        if isinstance(value, bool):
+            return 1.0 if value else 0.0
+        if isinstance(value, float):
+            return value
+        text = self.to_string(value)
+        return float(text) if NUMBER_PATTERN.fullmatch(text) else math.nan
+
+    def to_boolean(self, value: XPathValue) -> bool:
+        if isinstance(value, float):
+            return value != 0 and not math.isnan(value)
+        return bool(value)
+
+    # Tree navigation
+
+    def _children(self, item: XPathItem) -> list[HtmlNode]:
+        if isinstance(item, XPathDocument):
+            return sorted(
+                (self.node_pool.get_node(root_id) for root_id in self.node_pool.get_root_ids()),
+                key=lambda node: node.sequence_index,
+            )
+        if isinstance(item, XPathAttribute):
+            return []
+        return [self.node_pool.get_node(child_id) for child_id in item.children_ids]
+
+    def _descendants(self, item: XPathItem) -> Iterator[HtmlNode]:
+        for child in self._children(item):
+            yield child
+            yield from self._descendants(child)
+
+    def _parent(self, item: XPathItem) -> Optional[XPathItem]:
+        if isinstance(item, XPathDocument):
+            return None
+        if isinstance(item, XPathAttribute):
+            return item.owner
+        if item.parent_id is None:
+            return self.document
+        return self.node_pool.get_node(item.parent_id)
+
+    def _ancestors(self, item: XPathItem) -> Iterator[XPathItem]:
+        parent = self._parent(item)
+        while parent is not None:
+            yield parent
+            parent = self._parent(parent)
+
+    def _siblings(self, item: XPathItem, following: bool) -> list[HtmlNode]:
+        parent = self._parent(item)
+        if parent is None or isinstance(item, XPathAttribute):
+            return []
+        siblings = self._children(parent)
+        index = next(i for i, sibling in enumerate(siblings) if sibling is item)
+        return siblings[slice(index + 1, None)] if following else siblings[:index][::-1]
+
+    def _attributes(self, item: XPathItem) -> list[XPathAttribute]:
+        if not isinstance(item, HtmlNode):
+            return []
+        return [
+            XPathAttribute(item, name, _attribute_value(value))
+            for name, value in item.attrs.items()
+        ]
+
+    def _axis(self, axis: str, item: XPathItem) -> Iterable[XPathItem]:
+        """Nodes of the axis, in document order for forward axes and reverse for others."""
+        if axis == "child":
+            return self._children(item)
+        if axis == "descendant":
+            return self._descendants(item)
+        if axis == "descendant-or-self":
+            return [item, *self._descendants(item)]
+        if axis == "self":
+            return [item]
+        if axis == "parent":
+            parent = self._parent(item)
+            return [parent] if parent is not None else []
+        if axis == "ancestor":
+            return self._ancestors(item)
+        if axis == "ancestor-or-self":
+            return [item, *self._ancestors(item)]
+        if axis == "following-sibling":
+            return self._siblings(item, following=True)
+        if axis == "preceding-sibling":
+            return self._siblings(item, following=False)
+        if axis == "attribute":
+            return self._attributes(item)
+        raise XPathEvaluationError(f"Axis {axis!r} is not supported")
+
+    def _matches(self, node_test: str, axis: str, item: XPathItem) -> bool:
+        if node_test == "node()":
+            return True
+        if node_test == "text()":
+            return isinstance(item, HtmlNode) and item.is_text_node
+        if node_test.endswith("()"):
+            # Comments and processing instructions are not kept in the pool
+            return False
+
+        # Name tests select the principal node type of the axis
+        if axis == "attribute":
+            return isinstance(item, XPathAttribute) and node_test in ("*", item.name)
+        if not isinstance(item, HtmlNode) or item.is_text_node:
+            return False
+        if node_test == "*":
+            return True
+        if node_test.endswith(":*"):
+            return item.tag.startswith(node_test[:-1])
+        return item.tag == node_test
+
+    # Expressions
+
+    def _eval(self, expr: XPathExpr, context: XPathContext) -> XPathValue:
+        if isinstance(expr, XPathLocationPath):
+            items = [self.document] if expr.absolute else [context.item]
+            return self._eval_steps(expr.steps, items)
+        if isinstance(expr, XPathLiteral):
+            return expr.value
+        if isinstance(expr, XPathNumber):
+            return expr.value
+        if isinstance(expr, XPathBinaryOp):
+            return self._eval_binary(expr, context)
+        if isinstance(expr, XPathNegate):
+            return -self.to_number(self._eval(expr.operand, context))
+        if isinstance(expr, XPathFunctionCall):
+            function = self.functions.get(expr.name)
+            if function is None:
+                raise XPathEvaluationError(f"Function {expr.name!r} is not supported")
+            return function(context, expr.args)
+        if isinstance(expr, XPathFilterExpr):
+            items = self._eval_node_set(expr.primary, context)
+            for predicate in expr.predicates:
+                items = self._filter(items, predicate)
+            return self._eval_steps(expr.path.steps, items) if expr.path else items
+        if isinstance(expr, XPathVariable):
+            raise XPathEvaluationError(f"Variable ${expr.name} is not defined")
+        raise XPathEvaluationError(f"Unexpected expression {expr!r}")
+
+    def _eval_node_set(self, expr: XPathExpr, context: XPathContext) -> list[XPathItem]:
+        value = self._eval(expr, context)
+        if not isinstance(value, list):
+            raise XPathEvaluationError("Expression does not evaluate to a node-set")
+        return value
+
+    def _eval_steps(self, steps: list[XPathStep], items: list[XPathItem]) -> list[XPathItem]:
+        step_index = 0
+        while step_index < len(steps):
+            step = steps[step_index]
+            # `//tag` and `descendant::tag` are looked up in the tag index of the pool
+            next_step = steps[step_index + 1] if step_index + 1 < len(steps) else None
+            if (
+                _is_any_descendant_step(step)
+                and next_step
+                and next_step.axis == "child"
+                and _is_indexed_step(next_step)
+            ):
+                items = self._select_descendants(items, next_step, by_parent=True)
+                step_index += 2
+                continue
+            if step.axis == "descendant" and _is_indexed_step(step):
+                items = self._select_descendants(items, step, by_parent=False)
+                step_index += 1
+                continue
+
+            selected: list[XPathItem] = []
+            for item in items:
+                step_items = [
+                    node
+                    for node in self._axis(step.axis, item)
+                    if self._matches(step.node_test, step.axis, node)
+                ]
+                for predicate in step.predicates:
+                    step_items = self._filter(step_items, predicate)
+                selected.extend(step_items)
+            items = _in_document_order(selected)
+            step_index += 1
+        return items
+
+    def _select_descendants(
+        self, items: list[XPathItem], step: XPathStep, by_parent: bool
+    ) -> list[XPathItem]:
+        """
+        Select descendants of items with the tag of the step from the tag index.
+        For `//tag`, predicates count positions among children of the same parent.
+        """
+        index = self.node_pool.get_index()
+        tag_ids = index.tags.get(step.node_test, [])
+        selected: list[XPathItem] = []
+        for item in items:
+            if isinstance(item, XPathDocument):
+                node_ids = tag_ids
+            elif isinstance(item, HtmlNode) and not item.is_text_node:
+                node_ids = index.get_descendant_ids(item.id, tag_ids)
+            else:
+                continue
+
+            nodes = [self.node_pool.get_node(node_id) for node_id in node_ids]
+            groups: dict[Optional[str], list[XPathItem]] = {}
+            if by_parent:
+                for node in nodes:
+                    groups.setdefault(node.parent_id, []).append(node)
+            else:
+                groups[None] = list(nodes)
+
+            for group in groups.values():
+                for predicate in step.predicates:
+                    group = self._filter(group, predicate)
+                selected.extend(group)
+        return _in_document_order(selected)
+
+    def _filter(self, items: list[XPathItem], predicate: XPathExpr) -> list[XPathItem]:
+        """Keep items matching predicate, numbers match the position of the item."""
+        filtered = []
+        for position, item in enumerate(items, start=1):
+            value = self._eval(predicate, XPathContext(item, position, len(items)))
+            if isinstance(value, float):
+                if value == position:
+                    filtered.append(item)
+            elif self.to_boolean(value):
+                filtered.append(item)
+        return filtered
+
+    def _eval_binary(self, expr: XPathBinaryOp, context: XPathContext) -> XPathValue:
+        operator = expr.operator
+        if operator == "or":
+            return self.to_boolean(self._eval(expr.left, context)) or self.to_boolean(
+                self._eval(expr.right, context)
+            )
+        if operator == "and":
+            return self.to_boolean(self._eval(expr.left, context)) and self.to_boolean(
+                self._eval(expr.right, context)
+            )
+        if operator == "|":
+            return _in_document_order(
+                [
+                    *self._eval_node_set(expr.left, context),
+                    *self._eval_node_set(expr.right, context),
+                ]
+            )
+
+        left = self._eval(expr.left, context)
+        right = self._eval(expr.right, context)
+        if operator in ("=", "!=", "<", "<=", ">", ">="):
+            return self._compare(operator, left, right)
+
+        left_number, right_number = self.to_number(left), self.to_number(right)
+        if operator == "+":
+            return left_number + right_number
+        if operator == "-":
+            return left_number - right_number
+        if operator == "*":
+            return left_number * right_number
+        if operator == "div":
+            if right_number == 0:
+                if left_number == 0 or math.isnan(left_number):
+                    return math.nan
+                return math.copysign(math.inf, left_number) * math.copysign(1, right_number)
+            return left_number / right_number
+        if right_number == 0:
+            return math.nan
+        return math.fmod(left_number, right_number)
+
+    def _compare(self, operator: str, left: XPathValue, right: XPathValue) -> bool:
+        """Compare values, node-sets compare true when any of their nodes does (XPath 3.4)."""
+        if operator in ("=", "!=") and (isinstance(left, bool) or isinstance(right, bool)):
+            equal = self.to_boolean(left) == self.to_boolean(right)
+            return equal if operator == "=" else not equal
+        if isinstance(left, list):
+            return any(self._compare(operator, self.string_value(item), right) for item in left)
+        if isinstance(right, list):
+            return any(self._compare(operator, left, self.string_value(item)) for item in right)
+
+        if operator in ("=", "!="):
+            if isinstance(left, float) or isinstance(right, float):
+                equal = self.to_number(left) == self.to_number(right)
+            else:
+                equal = left == right
+            return equal if operator == "=" else not equal
+
+        left_number, right_number = self.to_number(left), self.to_number(right)
+        if operator == "<":
+            return left_number < right_number
+        if operator == "<=":
+            return left_number <= right_number
+        if operator == ">":
+            return left_number > right_number
+        return left_number >= right_number
+
+    # Core function library
+
+    def _string_arg(self, context: XPathContext, args: list[XPathExpr], index: int = 0) -> str:
+        """String of the argument, the context node when the argument is omitted."""
+        if index >= len(args):
+            return self.string_value(context.item)
+        return self.to_string(self._eval(args[index], context))
+
+    def _number_arg(self, context: XPathContext, args: list[XPathExpr], index: int = 0) -> float:
+        if index >= len(args):
+            return self.to_number(self.string_value(context.item))
+        return self.to_number(self._eval(args[index], context))
+
+    def _node_arg(self, context: XPathContext, args: list[XPathExpr]) -> Optional[XPathItem]:
+        if not args:
+            return context.item
+        items = self._eval_node_set(args[0], context)
+        return items[0] if items else None
+
+    def _count(self, context: XPathContext, args: list[XPathExpr]) -> float:
+        return float(len(self._eval_node_set(args[0], context)))
+
+    def _name(self, context: XPathContext, args: list[XPathExpr]) -> str:
+        item = self._node_arg(context, args)
+        if isinstance(item, XPathAttribute):
+            return item.name
+        if isinstance(item, HtmlNode) and not item.is_text_node:
+            return item.tag
+        return ""
+
+    def _local_name(self, context: XPathContext, args: list[XPathExpr]) -> str:
+        return self._name(context, args).rpartition(":")[2]
+
+    def _string_function(self, context: XPathContext, args: list[XPathExpr]) -> str:
+        return self._string_arg(context, args)
+
+    def _concat(self, context: XPathContext, args: list[XPathExpr]) -> str:
+        return "".join(self._string_arg(context, args, index) for index in range(len(args)))
+
+    def _contains(self, context: XPathContext, args: list[XPathExpr]) -> bool:
+        return self._string_arg(context, args, 1) in self._string_arg(context, args)
+
+    def _starts_with(self, context: XPathContext, args: list[XPathExpr]) -> bool:
+        return self._string_arg(context, args).startswith(self._string_arg(context, args, 1))
+
+    def _ends_with(self, context: XPathContext, args: list[XPathExpr]) -> bool:
+        return self._string_arg(context, args).endswith(self._string_arg(context, args, 1))
+
+    def _substring_before(self, context: XPathContext, args: list[XPathExpr]) -> str:
+        text, separator = self._string_arg(context, args), self._string_arg(context, args, 1)
+        before, found, _ = text.partition(separator)
+        return before if found else ""
+
+    def _substring_after(self, context: XPathContext, args: list[XPathExpr]) -> str:
+        text, separator = self._string_arg(context, args), self._string_arg(context, args, 1)
+        _, found, after = text.partition(separator)
+        return after if found else ""
+
+    def _substring(self, context: XPathContext, args: list[XPathExpr]) -> str:
+        """Substring by 1-based rounded positions, as defined by XPath 1.0."""
+        text = self._string_arg(context, args)
+        start = _round(self._number_arg(context, args, 1))
+        end = start + _round(self._number_arg(context, args, 2)) if len(args) > 2 else math.inf
+        return "".join(
+            char for position, char in enumerate(text, start=1) if start <= position < end
+        )
+
+    def _string_length(self, context: XPathContext, args: list[XPathExpr]) -> float:
+        return float(len(self._string_arg(context, args)))
+
+    def _normalize_space(self, context: XPathContext, args: list[XPathExpr]) -> str:
+        return " ".join(self._string_arg(context, args).split())
+
+    def _translate(self, context: XPathContext, args: list[XPathExpr]) -> str:
+        text = self._string_arg(context, args)
+        source, target = self._string_arg(context, args, 1), self._string_arg(context, args, 2)
+        table: dict[int, Optional[str]] = {}
+        for index, char in enumerate(source):
+            table.setdefault(ord(char), target[index] if index < len(target) else None)
+        return text.translate(table)
+
+    def _number_function(self, context: XPathContext, args: list[XPathExpr]) -> float:
+        return self._number_arg(context, args)
+
+    def _sum(self, context: XPathContext, args: list[XPathExpr]) -> float:
+        return sum(
+            self.to_number(self.string_value(item))
+            for item in self._eval_node_set(args[0], context)
+        )
+
+
+def evaluate_xpath(
+    xpath: str, node_pool: HtmlNodePool, converter_maps: Optional[HtmlConverterMaps] = None
+) -> XPathResult:
+    """
+    Evaluate XPath expression over html node pool.
+
+    Args:
+        xpath: The XPath expression, possibly with simplified classes, links and images
+        node_pool: The node pool of the converted html
+        converter_maps: Optional converter maps to restore simplified values with
+
+    Returns:
+        Elements as html nodes and text nodes and attributes as strings for node-sets,
+        strings, numbers or booleans for other expressions
+    """
+    return XPathEvaluator(node_pool, converter_maps).evaluate(xpath)
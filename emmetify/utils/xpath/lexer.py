@@ -0,0 +1,76 @@
+import re
+from dataclasses import dataclass
+from typing import Literal, Optional
+
+XPathTokenKind = Literal["literal", "number", "name", "variable", "operator"]
+
+# Names are NCNames or QNames, with `prefix:*` and `*` name tests
+NCNAME = r"[^\W\d][\w.\-]*"
+TOKEN_PATTERN = re.compile(
+    rf"""
+    (?P<whitespace>\s+)
+    |(?P<literal>"[^"]*"|'[^']*')
+    |(?P<number>\d+(?:\.\d*)?|\.\d+)
+    |(?P<variable>\${NCNAME}(?::{NCNAME})?)
+    |(?P<name>{NCNAME}(?::{NCNAME}|:\*)?|\*)
+    |(?P<operator>//|::|\.\.|!=|<=|>=|[/|+\-=<>()\[\].@,])
+    |(?P<error>.)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+# Token kinds of the pattern groups, whitespace is skipped and errors are raised
+TOKEN_KINDS: dict[str, XPathTokenKind] = {
+    "literal": "literal",
+    "number": "number",
+    "variable": "variable",
+    "name": "name",
+    "operator": "operator",
+}
+OPERATOR_NAMES = {"and", "or", "mod", "div"}
+OPERATORS = {*OPERATOR_NAMES, "*", "/", "//", "|", "+", "-", "=", "!=", "<", "<=", ">", ">="}
+# Tokens after which `*` is a name test and operator names are names, as after operators
+NAME_CONTEXT_TOKENS = {"@", "::", "(", "[", ","}
+
+
+class XPathSyntaxError(ValueError):
+    """Raised for expressions which are not valid XPath 1.0"""
+
+
+@dataclass
+class XPathToken:
+    kind: XPathTokenKind
+    value: str
+    # Position of the token in the expression, for rewriting it in place
+    start: int
+    end: int
+
+
+def _is_operator_context(previous: Optional[XPathToken]) -> bool:
+    """Check if the previous token makes `*` and operator names operators (XPath 1.0, 3.7)."""
+    if previous is None or previous.value in NAME_CONTEXT_TOKENS:
+        return False
+    return not (previous.kind == "operator" and previous.value in OPERATORS)
+
+
+def tokenize_xpath(xpath: str) -> list[XPathToken]:
+    """Split XPath 1.0 expression into tokens in a single pass."""
+    tokens: list[XPathToken] = []
+    previous: Optional[XPathToken] = None
+    for match in TOKEN_PATTERN.finditer(xpath):
+        group = match.lastgroup
+        if group == "whitespace":
+            continue
+        if group == "error":
+            raise XPathSyntaxError(f"Unexpected character {match.group()!r} at {match.start()}")
+        # One of the alternatives always matches, so the group is set
+        assert group is not None
+        kind = TOKEN_KINDS[group]
+        value = match.group()
+        if kind == "name" and (value == "*" or value in OPERATOR_NAMES):
+            if _is_operator_context(previous):
+                kind = "operator"
+
+        previous = XPathToken(kind, value, match.start(), match.end())
+        tokens.append(previous)
+
+    return tokens
@@ -0,0 +1,307 @@
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Optional, Union
+
+from emmetify.utils.xpath.lexer import XPathSyntaxError, XPathToken, tokenize_xpath
+
+AXES = {
+    "ancestor",
+    "ancestor-or-self",
+    "attribute",
+    "child",
+    "descendant",
+    "descendant-or-self",
+    "following",
+    "following-sibling",
+    "namespace",
+    "parent",
+    "preceding",
+    "preceding-sibling",
+    "self",
+}
+NODE_TYPES = {"comment", "text", "processing-instruction", "node"}
+
+# Precedence of binary operators, from the lowest to the highest
+BINARY_OPERATORS = {
+    "or": 0,
+    "and": 1,
+    "=": 2,
+    "!=": 2,
+    "<": 3,
+    "<=": 3,
+    ">": 3,
+    ">=": 3,
+    "+": 4,
+    "-": 4,
+    "*": 5,
+    "div": 5,
+    "mod": 5,
+}
+
+
+@dataclass
+class XPathLiteral:
+    value: str
+    # Position of the quoted literal in the expression, for rewriting it in place
+    start: int
+    end: int
+
+
+@dataclass
+class XPathNumber:
+    value: float
+
+
+@dataclass
+class XPathVariable:
+    name: str
+
+
+@dataclass
+class XPathFunctionCall:
+    name: str
+    args: list["XPathExpr"] = field(default_factory=list)
+
+
+@dataclass
+class XPathBinaryOp:
+    operator: str
+    left: "XPathExpr"
+    right: "XPathExpr"
+
+
+@dataclass
+class XPathNegate:
+    operand: "XPathExpr"
+
+
+@dataclass
+class XPathStep:
+    axis: str
+    # Name test (`div`, `my:div`, `*`, `my:*`) or node type test (`text()`, `node()`)
+    node_test: str
+    predicates: list["XPathExpr"] = field(default_factory=list)
+
+
+@dataclass
+class XPathLocationPath:
+    absolute: bool
+    steps: list[XPathStep] = field(default_factory=list)
+
+
+@dataclass
+class XPathFilterExpr:
+    primary: "XPathExpr"
+    predicates: list["XPathExpr"] = field(default_factory=list)
+    # Relative location path following the filtered expression
+    path: Optional[XPathLocationPath] = None
+
+
+XPathExpr = Union[
+    XPathLiteral,
+    XPathNumber,
+    XPathVariable,
+    XPathFunctionCall,
+    XPathBinaryOp,
+    XPathNegate,
+    XPathLocationPath,
+    XPathFilterExpr,
+]
+
+
+def _descendant_or_self_step() -> XPathStep:
+    """Step abbreviated by `//`."""
+    return XPathStep(axis="descendant-or-self", node_test="node()")
+
+
+class XPathParser:
+    """Recursive descent parser of XPath 1.0 expressions"""
+
+    def __init__(self, xpath: str):
+        self.tokens = tokenize_xpath(xpath)
+        # Values of operator tokens, None for other tokens and after the last token
+        self.operators = [
+            token.value if token.kind == "operator" else None for token in self.tokens
+        ]
+        self.operators.append(None)
+        self.index = 0
+
+    def _peek(self, offset: int = 0) -> Optional[XPathToken]:
+        index = self.index + offset
+        return self.tokens[index] if index < len(self.tokens) else None
+
+    def _peek_value(self, offset: int = 0) -> Optional[str]:
+        token = self._peek(offset)
+        return token.value if token and token.kind in ("operator", "name") else None
+
+    def _next(self) -> XPathToken:
+        token = self._peek()
+        if token is None:
+            raise XPathSyntaxError("Unexpected end of expression")
+        self.index += 1
+        return token
+
+    def _accept(self, *values: str) -> Optional[XPathToken]:
+        if self.operators[self.index] in values:
+            self.index += 1
+            return self.tokens[self.index - 1]
+        return None
+
+    def _expect(self, value: str) -> XPathToken:
+        token = self._accept(value)
+        if token is None:
+            raise self._error(f"Expected {value!r}")
+        return token
+
+    def _error(self, message: str) -> XPathSyntaxError:
+        token = self._peek()
+        if token is None:
+            return XPathSyntaxError(f"{message} at the end of expression")
+        return XPathSyntaxError(f"{message}, got {token.value!r} at {token.start}")
+
+    def parse(self) -> XPathExpr:
+        expr = self._parse_binary()
+        if self._peek() is not None:
+            raise self._error("Unexpected token")
+        return expr
+
+    def _parse_binary(self, min_precedence: int = 0) -> XPathExpr:
+        """Parse binary operators by precedence climbing, all of them are left-associative."""
+        expr = self._parse_unary()
+        while True:
+            operator = self.operators[self.index]
+            if operator is None or operator not in BINARY_OPERATORS:
+                return expr
+            precedence = BINARY_OPERATORS[operator]
+            if precedence < min_precedence:
+                return expr
+            self.index += 1
+            expr = XPathBinaryOp(operator, expr, self._parse_binary(precedence + 1))
+
+    def _parse_unary(self) -> XPathExpr:
+        if self._accept("-"):
+            return XPathNegate(self._parse_unary())
+        expr = self._parse_path()
+        while self._accept("|"):
+            expr = XPathBinaryOp("|", expr, self._parse_path())
+        return expr
+
+    def _is_filter_start(self) -> bool:
+        token = self._peek()
+        if token is None:
+            return False
+        if token.kind in ("literal", "number", "variable"):
+            return True
+        if token.kind == "operator":
+            return token.value == "("
+        # Function calls, names followed by `(` other than node type tests
+        return self._peek_value(1) == "(" and token.value not in NODE_TYPES
+
+    def _parse_path(self) -> XPathExpr:
+        if not self._is_filter_start():
+            return self._parse_location_path()
+
+        primary = self._parse_primary()
+        predicates = self._parse_predicates()
+        separator = self._accept("/", "//")
+        if separator is None:
+            return XPathFilterExpr(primary, predicates) if predicates else primary
+
+        steps = [_descendant_or_self_step()] if separator.value == "//" else []
+        steps.extend(self._parse_relative_steps())
+        return XPathFilterExpr(primary, predicates, XPathLocationPath(False, steps))
+
+    def _parse_location_path(self) -> XPathLocationPath:
+        separator = self._accept("/", "//")
+        if separator is None:
+            return XPathLocationPath(False, self._parse_relative_steps())
+        if separator.value == "//":
+            return XPathLocationPath(
+                True, [_descendant_or_self_step(), *self._parse_relative_steps()]
+            )
+        # Root node alone
+        if not self._is_step_start():
+            return XPathLocationPath(True, [])
+        return XPathLocationPath(True, self._parse_relative_steps())
+
+    def _is_step_start(self) -> bool:
+        token = self._peek()
+        if token is None:
+            return False
+        return token.kind == "name" or token.value in (".", "..", "@")
+
+    def _parse_relative_steps(self) -> list[XPathStep]:
+        steps = [self._parse_step()]
+        while True:
+            separator = self._accept("/", "//")
+            if separator is None:
+                return steps
+            if separator.value == "//":
+                steps.append(_descendant_or_self_step())
+            steps.append(self._parse_step())
+
+    def _parse_step(self) -> XPathStep:
+        if self._accept("."):
+            return XPathStep(axis="self", node_test="node()")
+        if self._accept(".."):
+            return XPathStep(axis="parent", node_test="node()")
+
+        axis = "child"
+        if self._accept("@"):
+            axis = "attribute"
+        elif self._peek_value(1) == "::":
+            axis = self._next().value
+            if axis not in AXES:
+                raise XPathSyntaxError(f"Unknown axis {axis!r}")
+            self._next()
+
+        return XPathStep(axis, self._parse_node_test(), self._parse_predicates())
+
+    def _parse_node_test(self) -> str:
+        token = self._peek()
+        if token is None or token.kind != "name":
+            raise self._error("Expected node test")
+        self._next()
+        if token.value in NODE_TYPES and self._accept("("):
+            literal = self._peek()
+            if token.value == "processing-instruction" and literal and literal.kind == "literal":
+                self._next()
+            self._expect(")")
+            return f"{token.value}()"
+        return token.value
+
+    def _parse_predicates(self) -> list[XPathExpr]:
+        predicates = []
+        while self._accept("["):
+            predicates.append(self._parse_binary())
+            self._expect("]")
+        return predicates
+
+    def _parse_primary(self) -> XPathExpr:
+        token = self._next()
+        if token.kind == "literal":
+            return XPathLiteral(token.value[1:-1], token.start, token.end)
+        if token.kind == "number":
+            return XPathNumber(float(token.value))
+        if token.kind == "variable":
+            return XPathVariable(token.value[1:])
+        if token.value == "(":
+            expr = self._parse_binary()
+            self._expect(")")
+            return expr
+
+        # Function call
+        self._expect("(")
+        args = []
+        if not self._accept(")"):
+            args.append(self._parse_binary())
+            while self._accept(","):
+                args.append(self._parse_binary())
+            self._expect(")")
+        return XPathFunctionCall(token.value, args)
+
+
+@lru_cache(maxsize=1024)
+def parse_xpath(xpath: str) -> XPathExpr:
+    """Parse XPath 1.0 expression to its syntax tree, raising XPathSyntaxError if invalid."""
+    return XPathParser(xpath).parse()
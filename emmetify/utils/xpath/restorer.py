@@ -0,0 +1,325 @@
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional, Tuple
+
+from emmetify.converters.html_converter import HtmlConverterMaps
+from emmetify.utils.xpath.lexer import XPathSyntaxError, XPathToken, tokenize_xpath
+from emmetify.utils.xpath.parser import (
+    XPathBinaryOp,
+    XPathExpr,
+    XPathFilterExpr,
+    XPathFunctionCall,
+    XPathLiteral,
+    XPathLocationPath,
+    XPathNegate,
+    parse_xpath,
+)
+
+# Attribute replace rules, attribute name mapped to the tag name to restrict
+# replacements to (None for any tag) and to the replacement map
+AttributeRules = dict[str, Tuple[Optional[str], dict[str, str]]]
+# Replacements of literals, keyed by attribute name and literal value, with the tag
+# name to restrict the replacement to (None for any tag) and the restored value
+ReplacementTable = dict[Tuple[str, str], Tuple[Optional[str], str]]
+# Attribute compared with a literal: tag name of the element owning the attribute
+# (None when unknown), attribute name and the literal
+AttributeLiteral = Tuple[Optional[str], str, XPathLiteral]
+
+# Functions comparing their first argument with the second one
+COMPARISON_FUNCTIONS = {"contains", "starts-with", "ends-with", "matches"}
+
+
+def quote_literal(value: str, quote: str = "'") -> str:
+    """Quote value as XPath literal, XPath 1.0 has no escapes, so quotes need concat."""
+    if quote not in value:
+        return f"{quote}{value}{quote}"
+    other_quote = '"' if quote == "'" else "'"
+    if other_quote not in value:
+        return f"{other_quote}{value}{other_quote}"
+    parts = ', "\'", '.join(f"'{part}'" for part in value.split("'"))
+    return f"concat({parts})"
+
+
+def _step_tag(node_test: str, axis: str, context_tag: Optional[str]) -> Optional[str]:
+    """Tag name of elements selected by a step, the context tag for the self axis."""
+    if axis == "self":
+        return context_tag
+    return node_test
+
+
+def find_attribute_literals(
+    expr: XPathExpr, context_tag: Optional[str] = None
+) -> Iterator[AttributeLiteral]:
+    """
+    Find literals compared with attributes, directly (`@class='a'`, `'a'=a/@href`),
+    through normalize-space and in contains, starts-with, ends-with and matches.
+    """
+    if isinstance(expr, XPathLocationPath):
+        tag = None if expr.absolute else context_tag
+        for step in expr.steps:
+            if step.axis != "attribute":
+                tag = _step_tag(step.node_test, step.axis, tag)
+            for predicate in step.predicates:
+                yield from find_attribute_literals(predicate, tag)
+
+    elif isinstance(expr, XPathBinaryOp):
+        if expr.operator in ("=", "!="):
+            for attribute, literal in ((expr.left, expr.right), (expr.right, expr.left)):
+                reference = _attribute_reference(attribute, context_tag)
+                if reference and isinstance(literal, XPathLiteral):
+                    yield (*reference, literal)
+        yield from find_attribute_literals(expr.left, context_tag)
+        yield from find_attribute_literals(expr.right, context_tag)
+
+    elif isinstance(expr, XPathFunctionCall):
+        if expr.name in COMPARISON_FUNCTIONS and len(expr.args) >= 2:
+            reference = _attribute_reference(expr.args[0], context_tag)
+            if reference and isinstance(expr.args[1], XPathLiteral):
+                yield (*reference, expr.args[1])
+        for arg in expr.args:
+            yield from find_attribute_literals(arg, context_tag)
+
+    elif isinstance(expr, XPathNegate):
+        yield from find_attribute_literals(expr.operand, context_tag)
+
+    elif isinstance(expr, XPathFilterExpr):
+        yield from find_attribute_literals(expr.primary, context_tag)
+        # Elements selected by the filtered expression are not known
+        for predicate in expr.predicates:
+            yield from find_attribute_literals(predicate)
+        if expr.path:
+            yield from find_attribute_literals(expr.path)
+
+
+def _attribute_reference(
+    expr: XPathExpr, context_tag: Optional[str]
+) -> Optional[Tuple[Optional[str], str]]:
+    """Tag name and attribute name of `@attr`, `tag/@attr` or normalize-space of them."""
+    if isinstance(expr, XPathFunctionCall) and expr.name == "normalize-space":
+        if len(expr.args) != 1:
+            return None
+        expr = expr.args[0]
+
+    if not isinstance(expr, XPathLocationPath) or expr.absolute or not expr.steps:
+        return None
+    *element_steps, attribute_step = expr.steps
+    if attribute_step.axis != "attribute" or attribute_step.predicates:
+        return None
+
+    tag = context_tag
+    for step in element_steps:
+        tag = _step_tag(step.node_test, step.axis, tag)
+    return tag, attribute_step.node_test
+
+
+def _scan_attribute_literals(tokens: list[XPathToken]) -> Iterator[AttributeLiteral]:
+    """
+    Find literals compared with attributes in tokens of expressions which are not
+    valid XPath 1.0 (e.g. with comments), the owning tag is the step of the predicate.
+    """
+    values = [token.value if token.kind != "literal" else None for token in tokens]
+
+    def value_at(index: int) -> Optional[str]:
+        return values[index] if 0 <= index < len(values) else None
+
+    def literal_at(index: int) -> Optional[XPathLiteral]:
+        if 0 <= index < len(tokens) and tokens[index].kind == "literal":
+            token = tokens[index]
+            return XPathLiteral(token.value[1:-1], token.start, token.end)
+        return None
+
+    owner_tags: list[Optional[str]] = []
+    tag: Optional[str] = None
+    for index, token in enumerate(tokens):
+        if token.kind == "name" and value_at(index - 1) != "@":
+            if value_at(index + 1) not in ("(", "::"):
+                tag = token.value
+        elif token.value == "[" and token.kind == "operator":
+            owner_tags.append(tag)
+        elif token.value == "]" and token.kind == "operator":
+            tag = owner_tags.pop() if owner_tags else None
+        elif token.value == "@" and token.kind == "operator" and value_at(index + 1):
+            owner_tag = owner_tags[-1] if owner_tags else None
+            attr = tokens[index + 1].value
+            # Start and end of the attribute reference, with normalize-space around it
+            start, end = index, index + 2
+            if value_at(index - 2) == "normalize-space" and value_at(index - 1) == "(":
+                if value_at(index + 2) == ")":
+                    start, end = index - 2, index + 3
+
+            literal = literal_at(end + 1)
+            if value_at(end) in ("=", "!=") and literal:
+                yield owner_tag, attr, literal
+            if (
+                value_at(start - 2) in COMPARISON_FUNCTIONS
+                and value_at(start - 1) == "("
+                and value_at(end) == ","
+                and literal
+            ):
+                yield owner_tag, attr, literal
+
+
+def build_replacement_table(rules: AttributeRules) -> ReplacementTable:
+    """Merge replacement maps of all attributes into a single lookup table."""
+    return {
+        (attr.lower(), value): (tag, restored_value)
+        for attr, (tag, replace_map) in rules.items()
+        for value, restored_value in replace_map.items()
+        if isinstance(value, str)
+    }
+
+
+def restore_attribute_literals(xpath: str, table: ReplacementTable) -> str:
+    """Rewrite literals compared with attributes in place, in one pass over the XPath."""
+    if not table:
+        return xpath
+
+    try:
+        attribute_literals = list(find_attribute_literals(parse_xpath(xpath)))
+    except XPathSyntaxError:
+        try:
+            attribute_literals = list(_scan_attribute_literals(tokenize_xpath(xpath)))
+        except XPathSyntaxError:
+            # Not even tokens, e.g. unterminated literal
+            return xpath
+
+    parts = []
+    position = 0
+    for owner_tag, attr, literal in sorted(attribute_literals, key=lambda a: a[2].start):
+        replacement = table.get((attr.lower(), literal.value))
+        if replacement is None or literal.start < position:
+            continue
+        tag, restored_value = replacement
+        if tag is not None and tag != owner_tag:
+            continue
+        parts.append(xpath[slice(position, literal.start)])
+        parts.append(quote_literal(restored_value, xpath[literal.start]))
+        position = literal.end
+    parts.append(xpath[position:])
+
+    return "".join(parts)
+
+
+@dataclass
+class XPathAttributeRestorer:
+    """Class for restoring attributes in XPath expressions."""
+
+    def restore_attribute(
+        self, xpath: str, tag: Optional[str], attr: str, replace_map: dict[str, str]
+    ) -> str:
+        """
+        Restores attributes in an XPath expression based on a replacement map.
+
+        Args:
+            xpath: The XPath expression to process
+            tag: Optional tag name to restrict replacements to
+            attr: The attribute name to process
+            replace_map: Dictionary mapping old values to new values
+
+        Returns:
+            The processed XPath expression with restored attributes
+        """
+        return self.restore_attributes(xpath, {attr: (tag, replace_map)})
+
+    def restore_attributes(self, xpath: str, rules: AttributeRules) -> str:
+        """
+        Restores values of several attributes in a single pass over the XPath expression.
+        Only literals compared with the attributes are rewritten, in place.
+
+        Args:
+            xpath: The XPath expression to process
+            rules: Attribute names mapped to the optional tag name to restrict
+                replacements to and the replacement map
+
+        Returns:
+            The processed XPath expression with restored attributes
+        """
+        return restore_attribute_literals(xpath, build_replacement_table(rules))
+
+
+class XPathRestorer:
+    """
+    Restores simplified classes, links and images in batches of XPath expressions.
+    Replacements of all maps are merged into one lookup table once per maps,
+    so every XPath costs a single pass over its attribute literals.
+    """
+
+    def __init__(self, converter_maps: HtmlConverterMaps):
+        self.table = build_replacement_table(
+            {
+                "class": (None, converter_maps.classes),
+                "href": ("a", converter_maps.links),
+                "src": ("img", converter_maps.images),
+            }
+        )
+
+    def restore(self, xpath: str) -> str:
+        return restore_attribute_literals(xpath, self.table)
+
+    def restore_many(self, xpaths: Iterable[str]) -> list[str]:
+        """Restore XPath expressions in order, repeated expressions are restored once."""
+        restored: dict[str, str] = {}
+        results = []
+        for xpath in xpaths:
+            if xpath not in restored:
+                restored[xpath] = self.restore(xpath)
+            results.append(restored[xpath])
+        return results
+
+
+def restore_classes_in_xpath(xpath: str, classes_map: dict[str, str]) -> str:
+    """
+    Restores class attribute values in the XPath expression.
+
+    Args:
+        xpath (str): The XPath expression to process.
+        classes_map (dict[str, str]): A mapping from old class names to new ones.
+
+    Returns:
+        str: The updated XPath expression.
+    """
+    restorer = XPathAttributeRestorer()
+    return restorer.restore_attribute(xpath, tag=None, attr="class", replace_map=classes_map)
+
+
+def restore_links_in_xpath(xpath: str, links_map: dict[str, str]) -> str:
+    """
+    Restores href attribute values in the XPath expression for 'a' tags.
+
+    Args:
+        xpath (str): The XPath expression to process.
+        links_map (dict[str, str]): A mapping from old href values to new ones.
+
+    Returns:
+        str: The updated XPath expression.
+    """
+    restorer = XPathAttributeRestorer()
+    return restorer.restore_attribute(xpath, tag="a", attr="href", replace_map=links_map)
+
+
+def restore_images_in_xpath(xpath: str, images_map: dict[str, str]) -> str:
+    """
+    Restores src attribute values in the XPath expression for 'img' tags.
+
+    Args:
+        xpath (str): The XPath expression to process.
+        images_map (dict[str, str]): A mapping from old src values to new ones.
+
+    Returns:
+        str: The updated XPath expression.
+    """
+    restorer = XPathAttributeRestorer()
+    return restorer.restore_attribute(xpath, tag="img", attr="src", replace_map=images_map)
+
+
+def restore_xpath_from_converter_maps(xpath: str, converter_maps: HtmlConverterMaps) -> str:
+    """
+    Restores attribute values in the XPath expression using the provided converter maps.
+
+    Args:
+        xpath (str): The XPath expression to process.
+        converter_maps: An object containing the attribute mappings (classes, links, images).
+
+    Returns:
+        str: The updated XPath expression.
+    """
+    return XPathRestorer(converter_maps).restore(xpath)
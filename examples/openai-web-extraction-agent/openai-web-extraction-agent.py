@@ -5,16 +5,14 @@ import urllib.parse
 from typing import Type
 
 import requests
-import tiktoken
 from dotenv import load_dotenv
-from lxml import html as lxml_html
-from lxml.etree import XPathEvalError
 from openai import OpenAI
 from pydantic import BaseModel, create_model
 
 from emmetify import emmetify_compact_html
-from emmetify.converters.html_converter import HtmlConverterMaps
-from emmetify.utils.xpath import restore_xpath_from_converter_maps
+from emmetify.converters.html_converter import HtmlConverterResult, HtmlConverterTokens
+from emmetify.tokenizers import TiktokenTokenizer
+from emmetify.utils.xpath import XPathEvaluationError, XPathSyntaxError, evaluate_xpath
 
 load_dotenv()
 
@@ -64,7 +62,7 @@ class WebExtractionAgent:
 
     def __init__(self, start_url: str, queries: list[str], max_count: int, model: str):
         self.model = model
-        self.tokenizer = tiktoken.encoding_for_model(model)
+        self.tokenizer = TiktokenTokenizer(model)
         self.max_count = max_count
         self.requests_queue = [start_url]
 
@@ -82,16 +80,13 @@ class WebExtractionAgent:
 
         self.ExtractionResultType = ExtractionResult
 
-    def count_tokens(self, html: str, compact_html: str):
-        html_tokens = len(self.tokenizer.encode(html))
-        compact_tokens = len(self.tokenizer.encode(compact_html))
-        ratio = round((html_tokens - compact_tokens) / html_tokens * 100, 2)
-        print(f"HTML tokens: {html_tokens}")
-        print(f"HTML compact tokens: {compact_tokens}")
-        print(f"HTML compression ratio: {ratio}%\n")
+    def count_tokens(self, tokens: HtmlConverterTokens):
+        print(f"HTML tokens: {tokens.input_tokens}")
+        print(f"HTML compact tokens: {tokens.output_tokens}")
+        print(f"HTML compression ratio: {tokens.compression_ratio}%\n")
 
-        self.tokens["html"]["raw"] += html_tokens
-        self.tokens["html"]["compressed"] += compact_tokens
+        self.tokens["html"]["raw"] += tokens.input_tokens
+        self.tokens["html"]["compressed"] += tokens.output_tokens
         self.tokens["html"]["compression_ratio"] = round(
             (self.tokens["html"]["raw"] - self.tokens["html"]["compressed"])
             / self.tokens["html"]["raw"]
@@ -99,34 +94,27 @@ class WebExtractionAgent:
             2,
         )
 
-    def extract_data_by_xpath(
-        self, compressed_xpath: str, html: str, converter_maps: HtmlConverterMaps
-    ) -> str:
+    def extract_data_by_xpath(self, compressed_xpath: str, emmetified: HtmlConverterResult) -> str:
         """
         Get the data from the HTML using the XPath
         @param compressed_xpath: The compressed XPath to use (from the LLM)
-        @param html: The HTML content
-        @param converter_maps: The converter maps from the emmetified HTML
+        @param emmetified: The emmetified HTML, with its nodes and converter maps
         @return: The data from the HTML
         """
-        full_xpath = restore_xpath_from_converter_maps(compressed_xpath, converter_maps)
-        if full_xpath is None:
-            print("Invalid XPath expression")
-            return
-        if full_xpath == "":
+        if compressed_xpath == "":
             print("Empty XPath expression")
             return ""
 
+        # Evaluated on the already parsed nodes, no need to parse the HTML again
         try:
-            tree = lxml_html.fromstring(html)
-            results = list(set(tree.xpath(full_xpath)))
-        except XPathEvalError as e:
+            results = evaluate_xpath(compressed_xpath, emmetified.node_pool, emmetified.maps)
+        except (XPathSyntaxError, XPathEvaluationError) as e:
             print(f"Invalid XPath expression: {e}")
             return None
-        except ValueError as e:
-            print(f"Invalid HTML content: {e}")
-            return None
 
+        if not isinstance(results, list):
+            return str(results)
+        results = [result for result in results if isinstance(result, str)]
         if len(results) == 0:
             print("No data found")
             raise ExtractionError("No data found")
@@ -134,9 +122,9 @@ class WebExtractionAgent:
         return results[0]
 
     def get_url_from_xpath(
-        self, current_url: str, compressed_xpath: str, html: str, converter_maps: HtmlConverterMaps
+        self, current_url: str, compressed_xpath: str, emmetified: HtmlConverterResult
     ) -> str:
-        url = self.extract_data_by_xpath(compressed_xpath, html, converter_maps)
+        url = self.extract_data_by_xpath(compressed_xpath, emmetified)
         if url is None:
             print("Empty URL")
             return
@@ -214,8 +202,8 @@ class WebExtractionAgent:
             return
 
         # Compress the HTML
-        emmetified = emmetify_compact_html(current_html)
-        self.count_tokens(current_html, emmetified.result)
+        emmetified = emmetify_compact_html(current_html, tokenizer=self.tokenizer)
+        self.count_tokens(emmetified.tokens)
 
         llm_result = self.run_llm(current_url, current_queries, emmetified.result)
 
@@ -232,9 +220,7 @@ class WebExtractionAgent:
 
         # Handle redirect action
         if llm_result.action_type == "redirect":
-            redirect_url = self.get_url_from_xpath(
-                current_url, llm_result.action_xpath, current_html, emmetified.maps
-            )
+            redirect_url = self.get_url_from_xpath(current_url, llm_result.action_xpath, emmetified)
             if redirect_url is None:
                 print("Invalid redirect URL")
                 return
@@ -0,0 +1,81 @@
+from emmetify.config.base_config import EmmetifierConfig
+from emmetify.converters.html_converter import HtmlConverter, HtmlConverterResult
+from emmetify.parsers.html_parser import HtmlParser
+from emmetify.tokenizers import CallableTokenizer
+from tests.utils import BaseEmmetTestCase
+
+
+class TestHtmlConverterWithCostReport(BaseEmmetTestCase):
+    def setUp(self):
+        self.config = EmmetifierConfig()
+        self.config.html.report_costs = True
+        self.config.indent = False
+
+    def _convert(self, input_html: str, tokenizer=None) -> HtmlConverterResult:
+        parser = HtmlParser(self.config)
+        converter = HtmlConverter(self.config)
+        return converter.convert(parser.parse(input_html), tokenizer)
+
+    def _costs(self, result: HtmlConverterResult) -> dict[tuple[str, str], tuple[int, int]]:
+        return {(cost.kind, cost.name): (cost.count, cost.chars) for cost in result.costs}
+
+    def test_costs_attributed_to_tags_attributes_and_text(self):
+        input_html = '<div id="main" class="card"><a href="/titans" title="Titans">Eren</a></div>'
+        result = self._convert(input_html)
+        self.assertEqual("div#main.card>a[href=/titans title=Titans]{Eren}", result.result)
+        self.assertEqual(
+            {
+                ("tag", "div"): (1, 3),
+                ("tag", "a"): (1, 1),
+                ("attribute", "id"): (1, 5),
+                ("attribute", "class"): (1, 5),
+                ("attribute", "href"): (1, 12),
+                ("attribute", "title"): (1, 12),
+                ("text", "text"): (1, 4),
+                ("syntax", "syntax"): (1, 6),
+            },
+            self._costs(result),
+        )
+
+    def test_costs_sum_to_output_length(self):
+        input_html = """
+            <div class="page">
+                <ul><li><a href="/a">Mikasa</a></li><li><a href="/b">Armin</a></li></ul>
+                <p>Levi <span>Ackerman</span> is humanity's strongest soldier.</p>
+            </div>
+        """
+        result = self._convert(input_html)
+        self.assertEqual(len(result.result), sum(cost.chars for cost in result.costs))
+
+    def test_costs_sorted_by_chars(self):
+        input_html = '<p aria-label="Attack on Titan season one">Eren</p>'
+        result = self._convert(input_html)
+        chars = [cost.chars for cost in result.costs]
+        self.assertEqual(sorted(chars, reverse=True), chars)
+        self.assertEqual(("attribute", "aria-label"), (result.costs[0].kind, result.costs[0].name))
+
+    def test_multiplied_siblings_counted_once(self):
+        self.config.html.multiply_repeated_siblings = "lossless"
+        input_html = "<ul>" + '<li class="item">Titan</li>' * 3 + "</ul>"
+        result = self._convert(input_html)
+        self.assertEqual("ul>li.item{Titan}*3", result.result)
+        costs = self._costs(result)
+        self.assertEqual((1, 2), costs[("tag", "li")])
+        self.assertEqual((1, 5), costs[("text", "text")])
+        self.assertEqual(len(result.result), sum(cost.chars for cost in result.costs))
+
+    def test_elided_tags_have_no_cost(self):
+        self.config.html.elide_implicit_tags = True
+        result = self._convert('<ul><li class="item">Titan</li></ul>')
+        self.assertEqual("ul>.item{Titan}", result.result)
+        self.assertNotIn(("tag", "li"), self._costs(result))
+
+    def test_token_costs_with_tokenizer(self):
+        result = self._convert('<div id="main">Eren</div>', CallableTokenizer(len))
+        for cost in result.costs:
+            self.assertEqual(cost.chars, cost.tokens)
+
+    def test_no_costs_when_disabled(self):
+        self.config.html.report_costs = False
+        result = self._convert('<div id="main">Eren</div>')
+        self.assertEqual([], result.costs)
@@ -0,0 +1,72 @@
+from emmetify.config.base_config import EmmetifierConfig
+from emmetify.converters.html_converter import HtmlConverter
+from emmetify.parsers.html_parser import HtmlParser
+from tests.utils import BaseEmmetTestCase
+
+
+class TestHtmlConverterWithImplicitTags(BaseEmmetTestCase):
+    def setUp(self):
+        self.config = EmmetifierConfig()
+        self.config.html.elide_implicit_tags = True
+        self.config.indent = False
+
+    def _convert(self, input_html: str) -> str:
+        parser = HtmlParser(self.config)
+        converter = HtmlConverter(self.config)
+        return converter.convert(parser.parse(input_html)).result
+
+    def test_elide_div_with_class_or_id(self):
+        input_html = '<div class="card"><div id="title">Eren Yeager</div></div>'
+        result = self._convert(input_html)
+        self.assertEqual(".card>#title{Eren Yeager}", result)
+        self.emmet_reverse_assert(input_html, result)
+
+    def test_elide_div_with_attributes_only(self):
+        input_html = '<div data-test="ignore">Mikasa Ackerman</div>'
+        result = self._convert(input_html)
+        self.assertEqual("[data-test=ignore]{Mikasa Ackerman}", result)
+        self.emmet_reverse_assert(input_html, result)
+
+    def test_keep_div_without_attributes(self):
+        input_html = "<div><div>Armin Arlert</div></div>"
+        result = self._convert(input_html)
+        self.assertEqual("div>div{Armin Arlert}", result)
+        self.emmet_reverse_assert(input_html, result)
+
+    def test_elide_list_items(self):
+        input_html = '<ul class="menu"><li class="item">Home</li><li>About</li></ul>'
+        result = self._convert(input_html)
+        self.assertEqual("ul.menu>.item{Home}+li{About}", result)
+        self.emmet_reverse_assert(input_html, result)
+
+    def test_elide_table_rows_and_cells(self):
+        input_html = '<table><tr class="row"><td class="cell">1</td><td id="c2">2</td></tr></table>'
+        result = self._convert(input_html)
+        self.assertEqual("table>.row>.cell{1}+#c2{2}", result)
+        self.emmet_reverse_assert(input_html, result)
+
+    def test_elide_span_inside_inline_parent(self):
+        input_html = (
+            '<p><span class="price">10</span><a href="#"><span class="icon"></span></a></p>'
+        )
+        result = self._convert(input_html)
+        self.assertEqual("p>.price{10}+(a[href=#]>.icon)", result)
+        self.emmet_reverse_assert(input_html, result)
+
+    def test_keep_div_inside_inline_parent(self):
+        input_html = '<a href="#"><div class="card">Levi</div></a>'
+        result = self._convert(input_html)
+        self.assertEqual("a[href=#]>div.card{Levi}", result)
+        self.emmet_reverse_assert(input_html, result)
+
+    def test_keep_tag_not_matching_implicit_tag(self):
+        input_html = '<ul><div class="odd">Hange</div></ul>'
+        result = self._convert(input_html)
+        self.assertEqual("ul>div.odd{Hange}", result)
+        self.emmet_reverse_assert(input_html, result)
+
+    def test_disabled_elision(self):
+        self.config.html.elide_implicit_tags = False
+        input_html = '<div class="card"><div id="title">Eren Yeager</div></div>'
+        result = self._convert(input_html)
+        self.assertEqual("div.card>div#title{Eren Yeager}", result)
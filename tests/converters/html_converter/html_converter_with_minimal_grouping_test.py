@@ -0,0 +1,100 @@
+from emmet import expand as expand_emmet
+
+from emmetify.config.base_config import EmmetifierConfig
+from emmetify.converters.html_converter import HtmlConverter
+from emmetify.parsers.html_parser import HtmlParser
+from tests.utils import BaseEmmetTestCase
+
+
+class TestHtmlConverterWithMinimalGrouping(BaseEmmetTestCase):
+    def setUp(self):
+        self.config = EmmetifierConfig()
+        self.config.html.minimal_grouping = True
+        self.config.indent = False
+
+    def _convert(self, input_html: str, minimal_grouping: bool = True) -> str:
+        self.config.html.minimal_grouping = minimal_grouping
+        parser = HtmlParser(self.config)
+        converter = HtmlConverter(self.config)
+        return converter.convert(parser.parse(input_html)).result
+
+    def assert_same_expansion(self, input_html: str) -> str:
+        """Assert that minimal grouping expands to the same html as parentheses grouping."""
+        grouped_result = self._convert(input_html, minimal_grouping=False)
+        minimal_result = self._convert(input_html, minimal_grouping=True)
+        self.assertEqual(expand_emmet(grouped_result), expand_emmet(minimal_result))
+        self.assertLessEqual(len(minimal_result), len(grouped_result))
+        self.emmet_reverse_assert(input_html, minimal_result)
+        return minimal_result
+
+    def test_climb_up_one_level(self):
+        input_html = '<ul><li id="first"><a href="#a">A</a></li><li id="second">B</li></ul>'
+        result = self.assert_same_expansion(input_html)
+        self.assertEqual("ul>li#first>a[href=#a]{A}^li#second{B}", result)
+
+    def test_climb_up_two_levels(self):
+        input_html = """
+            <nav class="menu">
+                <ul>
+                    <li id="no-children"></li>
+                    <li id="children"><div id="2"></div></li>
+                    <li><a href="#about">About</a></li>
+                </ul>
+                <div id="3"></div>
+            </nav>
+        """
+        result = self.assert_same_expansion(input_html)
+        self.assertEqual(
+            "nav.menu>ul>li#no-children+li#children>div#2^li>a[href=#about]{About}^^div#3",
+            result,
+        )
+
+    def test_parentheses_for_deep_groups(self):
+        input_html = """
+            <div>
+                <section><article><p><b>Eren</b></p></article></section>
+                <footer>Mikasa</footer>
+            </div>
+        """
+        result = self.assert_same_expansion(input_html)
+        self.assertEqual("div>(section>article>p>b{Eren})+footer{Mikasa}", result)
+
+    def test_no_group_for_last_sibling(self):
+        input_html = '<div id="a"></div><div id="b"><p>Armin</p></div>'
+        result = self.assert_same_expansion(input_html)
+        self.assertEqual("div#a+div#b>p{Armin}", result)
+
+    def test_climb_up_between_root_nodes(self):
+        input_html = "<div><p>Levi</p></div><div>Hange</div>"
+        result = self.assert_same_expansion(input_html)
+        self.assertEqual("div>p{Levi}^div{Hange}", result)
+
+    def test_climb_up_before_text_sibling(self):
+        input_html = '<p>Read <span>the <a href="/docs">docs</a></span> first</p>'
+        result = self.assert_same_expansion(input_html)
+        self.assertEqual("p{Read}>span{the}>a[href=/docs]{docs}^{first}", result)
+
+    def test_nested_groups(self):
+        input_html = """
+            <main>
+                <header><h1>Title</h1><nav><a href="/">Home</a></nav></header>
+                <section>
+                    <div class="row"><div class="col"><p>One</p></div></div>
+                    <div class="row"><div class="col"><p>Two</p><p>Three</p></div></div>
+                </section>
+                <footer><p>Footer</p></footer>
+            </main>
+        """
+        self.assert_same_expansion(input_html)
+
+    def test_parentheses_grouping_of_root_nodes(self):
+        input_html = "<div><p>Levi</p></div><div>Hange</div>"
+        result = self._convert(input_html, minimal_grouping=False)
+        self.assertEqual("(div>p{Levi})+div{Hange}", result)
+        self.emmet_reverse_assert(input_html, result)
+
+    def test_parentheses_grouping_before_text_sibling(self):
+        input_html = '<p>Read <span>the <a href="/docs">docs</a></span> first</p>'
+        result = self._convert(input_html, minimal_grouping=False)
+        self.assertEqual("p{Read}>(span{the}>a[href=/docs]{docs})+{first}", result)
+        self.emmet_reverse_assert(input_html, result)
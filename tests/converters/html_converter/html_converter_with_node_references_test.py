@@ -0,0 +1,102 @@
+from bs4 import BeautifulSoup
+from lxml import html as lxml_html
+
+from emmetify.config.base_config import EmmetifierConfig
+from emmetify.converters.html_converter import HtmlConverter, HtmlConverterResult
+from emmetify.parsers.html_parser import HtmlParser
+from tests.utils import BaseEmmetTestCase
+
+
+class TestHtmlConverterWithNodeReferences(BaseEmmetTestCase):
+    def setUp(self):
+        self.config = EmmetifierConfig()
+        self.config.html.node_references = "interactive"
+        self.config.indent = False
+
+    def _convert(self, input_html: str) -> HtmlConverterResult:
+        parser = HtmlParser(self.config)
+        converter = HtmlConverter(self.config)
+        return converter.convert(parser.parse(input_html))
+
+    def test_interactive_elements_referenced(self):
+        input_html = '<nav><a href="/titans">Titans</a><a href="/scouts">Scouts</a></nav>'
+        result = self._convert(input_html)
+        self.assertEqual("nav>a#r1[href=/titans]{Titans}+a#r2[href=/scouts]{Scouts}", result.result)
+        self.assertEqual("/nav/a[1]", result.references["r1"].xpath)
+        self.assertEqual("nav > a:nth-of-type(2)", result.references["r2"].css_path)
+
+    def test_unique_ids_used_as_references(self):
+        input_html = (
+            '<form><input id="q" name="q"><button id="go">Go</button>'
+            '<button id="x">A</button><button id="x">B</button></form>'
+        )
+        result = self._convert(input_html)
+        self.assertEqual(
+            "form>input#q[name=q]+button#go{Go}+button#r1{A}+button#r2{B}", result.result
+        )
+        self.assertEqual(["q", "go", "r1", "r2"], list(result.references))
+
+    def test_generated_names_skip_html_ids(self):
+        result = self._convert('<div id="r1"><a href="/">Home</a></div>')
+        self.assertEqual("div#r1>a#r2[href=/]{Home}", result.result)
+
+    def test_leaves_mode(self):
+        self.config.html.node_references = "leaves"
+        result = self._convert("<div><p>Eren</p><p>Mikasa <b>Ackerman</b></p><hr></div>")
+        self.assertEqual("div>p#r1{Eren}+(p{Mikasa}>b#r2{Ackerman})+hr#r3", result.result)
+        self.assertEqual("/div/p[2]/b", result.references["r2"].xpath)
+
+    def test_off_by_default(self):
+        self.config.html.node_references = "off"
+        result = self._convert('<a href="/">Home</a>')
+        self.assertEqual("a[href=/]{Home}", result.result)
+        self.assertEqual({}, result.references)
+
+    def test_paths_count_skipped_and_merged_tags(self):
+        self.config.html.skip_tags = True
+        self.config.html.merge_inline_text = True
+        self.config.html.collapse_wrappers = True
+        input_html = (
+            "<html><body><script>1</script><div><span>Go <b>to</b></span>"
+            '<div><a href="/a">A</a></div></div><script>2</script>'
+            '<div><p><i>x</i></p><a href="/b">B</a></div></body></html>'
+        )
+        result = self._convert(input_html)
+        tree = lxml_html.fromstring(input_html)
+        soup = BeautifulSoup(input_html, "html.parser")
+        for name, reference in result.references.items():
+            with self.subTest(name=name):
+                href = result.node_pool.get_node(reference.node_id).attrs["href"]
+                self.assertEqual([href], [a.get("href") for a in tree.xpath(reference.xpath)])
+                self.assertEqual([href], [a["href"] for a in soup.select(reference.css_path)])
+
+    def test_references_of_multiplied_siblings_dropped(self):
+        self.config.html.node_references = "all"
+        self.config.html.multiply_repeated_siblings = "shape"
+        result = self._convert("<ul><li>Eren</li><li>Mikasa</li><li>Armin</li></ul>")
+        self.assertEqual("ul#r1>li#r2{Eren}*3", result.result)
+        self.assertEqual(["r1", "r2"], sorted(result.references))
+
+    def test_references_not_numbered_in_lossless_multiplication(self):
+        self.config.html.multiply_repeated_siblings = "lossless"
+        for mode, input_html, expected in [
+            ("all", "<ul><li>A</li><li>A</li><li>A</li></ul>", "ul#r1>li#r2{A}+li#r3{A}+li#r4{A}"),
+            (
+                "interactive",
+                '<ul><li><a href="/x">A</a></li><li><a href="/x">A</a></li></ul>',
+                "ul>(li>a#r1[href=/x]{A})+(li>a#r2[href=/x]{A})",
+            ),
+        ]:
+            with self.subTest(mode=mode):
+                self.config.html.node_references = mode
+                result = self._convert(input_html)
+                self.assertEqual(expected, result.result)
+                self.assertNotIn("$", result.result)
+                self.assertEqual(result.result.count("#r"), len(result.references))
+
+    def test_siblings_without_references_still_multiplied(self):
+        self.config.html.multiply_repeated_siblings = "lossless"
+        result = self._convert(
+            '<div><p>Item 1</p><p>Item 2</p><p>Item 3</p><a href="/">Home</a></div>'
+        )
+        self.assertEqual("div>p{Item $}*3+a#r1[href=/]{Home}", result.result)
@@ -0,0 +1,128 @@
+from emmetify.config.base_config import EmmetifierConfig
+from emmetify.converters.html_converter import HtmlConverter
+from emmetify.parsers.html_parser import HtmlParser
+from tests.utils import BaseEmmetTestCase
+
+
+class TestHtmlConverterWithRepeatedSiblings(BaseEmmetTestCase):
+    def setUp(self):
+        self.config = EmmetifierConfig()
+        self.config.html.multiply_repeated_siblings = "lossless"
+        self.config.indent = False
+
+    def _convert(self, input_html: str) -> str:
+        parser = HtmlParser(self.config)
+        converter = HtmlConverter(self.config)
+        return converter.convert(parser.parse(input_html)).result
+
+    def test_multiply_identical_leaf_siblings(self):
+        input_html = '<div class="rating">' + '<i class="star"></i>' * 5 + "</div>"
+        result = self._convert(input_html)
+        self.assertEqual("div.rating>i.star*5", result)
+        self.emmet_reverse_assert(input_html, result)
+
+    def test_multiply_identical_subtrees(self):
+        item = '<li class="item"><a href="#cart">Add to cart</a></li>'
+        input_html = f'<ul class="menu">{item * 3}</ul>'
+        result = self._convert(input_html)
+        self.assertEqual("ul.menu>(li.item>a[href=#cart]{Add to cart})*3", result)
+        self.emmet_reverse_assert(input_html, result)
+
+    def test_multiply_with_numbering(self):
+        items = "".join(
+            f'<li class="item"><a href="/products/{i}">Product {i}</a></li>' for i in range(1, 4)
+        )
+        input_html = f"<ul>{items}</ul>"
+        result = self._convert(input_html)
+        self.assertEqual("ul>(li.item>a[href=/products/$]{Product $})*3", result)
+        self.emmet_reverse_assert(input_html, result)
+
+    def test_nested_multiplication_not_numbered(self):
+        rows = "".join(f"<tr><td>r{i}</td><td>r{i}</td></tr>" for i in range(1, 4))
+        spans = "".join(f"<li><span>{i}</span><span>{i}</span></li>" for i in range(1, 4))
+        for input_html in [f"<table>{rows}</table>", f"<ul>{spans}</ul>"]:
+            with self.subTest(input_html=input_html):
+                result = self._convert(input_html)
+                self.assertNotIn("$", result)
+                self.emmet_reverse_assert(input_html, result)
+
+    def test_nested_multiplication_exactly_repeated(self):
+        row = "<tr><td>r</td><td>r</td></tr>"
+        input_html = f"<table>{row * 3}</table>"
+        result = self._convert(input_html)
+        self.assertEqual("table>(tr>td{r}*2)*3", result)
+        self.emmet_reverse_assert(input_html, result)
+
+    def test_multiply_with_numbering_offset(self):
+        items = "".join(f'<li id="page{i}">{i}</li>' for i in range(5, 8))
+        input_html = f"<ul>{items}</ul>"
+        result = self._convert(input_html)
+        self.assertEqual("ul>li#page$@5{$@5}*3", result)
+        self.emmet_reverse_assert(input_html, result)
+
+    def test_keep_constant_numbers(self):
+        items = "".join(f'<li class="col-3">Item {i}</li>' for i in range(1, 4))
+        input_html = f"<ul>{items}</ul>"
+        result = self._convert(input_html)
+        self.assertEqual("ul>li.col-3{Item $}*3", result)
+        self.emmet_reverse_assert(input_html, result)
+
+    def test_keep_different_siblings(self):
+        input_html = "<ul><li>Eren</li><li>Eren</li><li>Mikasa</li><li>Eren</li></ul>"
+        result = self._convert(input_html)
+        self.assertEqual("ul>li{Eren}*2+li{Mikasa}+li{Eren}", result)
+        self.emmet_reverse_assert(input_html, result)
+
+    def test_no_numbering_across_nested_multiplication(self):
+        rows = "".join(
+            "<tr>" + "".join(f"<td>R{r} C{c}</td>" for c in range(1, 3)) + "</tr>"
+            for r in range(1, 3)
+        )
+        input_html = f"<table>{rows}</table>"
+        result = self._convert(input_html)
+        self.assertEqual("table>(tr>td{R1 C$}*2)+(tr>td{R2 C$}*2)", result)
+        self.emmet_reverse_assert(input_html, result)
+
+    def test_no_numbering_of_nested_multipliers(self):
+        rows = "".join("<tr>" + "<td>x</td>" * count + "</tr>" for count in range(2, 4))
+        input_html = f"<table>{rows}</table>"
+        result = self._convert(input_html)
+        self.assertEqual("table>(tr>td{x}*2)+(tr>td{x}*3)", result)
+        self.emmet_reverse_assert(input_html, result)
+
+    def test_text_siblings_are_not_multiplied(self):
+        input_html = "<p>Levi <br> Levi <br> Levi</p>"
+        result = self._convert(input_html)
+        self.assertEqual("p{Levi}>br+{Levi}+br+{Levi}", result)
+
+    def test_shape_mode_merges_structurally_identical_siblings(self):
+        self.config.html.multiply_repeated_siblings = "shape"
+        input_html = """
+            <ul class="products">
+                <li class="product"><a href="/p/shoes">Shoes</a></li>
+                <li class="product"><a href="/p/boots">Boots</a></li>
+                <li class="product"><a href="/p/socks">Socks</a></li>
+            </ul>
+            <p>Footer</p>
+        """
+        result = self._convert(input_html)
+        self.assertEqual("(ul.products>(li.product>a[href=/p/shoes]{Shoes})*3)+p{Footer}", result)
+
+    def test_shape_mode_keeps_different_structures(self):
+        self.config.html.multiply_repeated_siblings = "shape"
+        input_html = '<ul><li class="a">Eren</li><li class="b">Mikasa</li></ul>'
+        result = self._convert(input_html)
+        self.assertEqual("ul>li.a{Eren}+li.b{Mikasa}", result)
+
+    def test_multiplied_group_with_minimal_grouping(self):
+        self.config.html.minimal_grouping = True
+        input_html = "<div><ul>" + "<li><b>x</b></li>" * 2 + "</ul><p>Armin</p></div>"
+        result = self._convert(input_html)
+        self.assertEqual("div>ul>(li>b{x})*2^p{Armin}", result)
+        self.emmet_reverse_assert(input_html, result)
+
+    def test_disabled_multiplication(self):
+        self.config.html.multiply_repeated_siblings = "off"
+        input_html = '<div class="rating">' + '<i class="star"></i>' * 3 + "</div>"
+        result = self._convert(input_html)
+        self.assertEqual("div.rating>i.star+i.star+i.star", result)
@@ -0,0 +1,89 @@
+from emmetify.config.base_config import EmmetifierConfig
+from emmetify.converters.html_converter import HtmlConverter, HtmlConverterResult
+from emmetify.parsers.html_parser import HtmlParser
+from tests.utils import BaseEmmetTestCase
+
+
+class TestHtmlConverterWithSourceMap(BaseEmmetTestCase):
+    def setUp(self):
+        self.config = EmmetifierConfig()
+        self.config.html.source_map = True
+        self.config.indent = False
+
+    def _convert(self, input_html: str) -> HtmlConverterResult:
+        parser = HtmlParser(self.config)
+        converter = HtmlConverter(self.config)
+        return converter.convert(parser.parse(input_html))
+
+    def _spans(self, result: HtmlConverterResult) -> list[tuple[str, str]]:
+        source_map = result.source_map
+        return [
+            (result.node_pool.get_node(node_id).tag, result.result[slice(start, end)])
+            for start, end, node_id in zip(source_map.starts, source_map.ends, source_map.node_ids)
+        ]
+
+    def test_spans_of_tags_and_text(self):
+        result = self._convert('<div id="main"><p>Eren</p><a href="/titans">Titans</a></div>')
+        self.assertEqual("div#main>p{Eren}+a[href=/titans]{Titans}", result.result)
+        self.assertEqual(
+            [
+                ("div", "div#main"),
+                ("p", "p"),
+                ("#text", "{Eren}"),
+                ("a", "a[href=/titans]"),
+                ("#text", "{Titans}"),
+            ],
+            self._spans(result),
+        )
+
+    def test_spans_with_groups_and_indentation(self):
+        self.config.indent = True
+        result = self._convert(
+            "<main><section><div><p>Eren</p></div></section><footer>End</footer></main>"
+        )
+        self.assertEqual(
+            [
+                ("main", "main"),
+                ("section", "section"),
+                ("div", "div"),
+                ("p", "p"),
+                ("#text", "{Eren}"),
+                ("footer", "footer"),
+                ("#text", "{End}"),
+            ],
+            self._spans(result),
+        )
+
+    def test_lookup(self):
+        result = self._convert('<ul class="menu"><li>Eren</li><li>Mikasa</li></ul>')
+        self.assertEqual("ul.menu>li{Eren}+li{Mikasa}", result.result)
+        entry = result.source_map.lookup(result.result.index("Mikasa"))
+        self.assertEqual("Mikasa", result.node_pool.get_node(entry.node_id).text_content)
+        self.assertIsNone(result.source_map.lookup(result.result.index("+")))
+        self.assertIsNone(result.source_map.lookup(len(result.result)))
+
+    def test_lookup_range(self):
+        result = self._convert("<ul><li>Eren</li><li>Mikasa</li><li>Armin</li></ul>")
+        start, end = result.result.index("Eren"), result.result.index("{Mikasa}")
+        entries = result.source_map.lookup_range(start, end)
+        self.assertEqual(["{Eren}", "li"], [result.result[slice(e.start, e.end)] for e in entries])
+
+    def test_source_positions(self):
+        result = self._convert('<div>\n  <a href="/">Home</a>\n</div>')
+        offsets = [0, result.result.index("a"), result.result.index("{Home}")]
+        entries = [result.source_map.lookup(offset) for offset in offsets]
+        self.assertEqual(
+            [(1, 0), (2, 2), (None, None)],
+            [(entry.source_line, entry.source_column) for entry in entries],
+        )
+
+    def test_multiplied_siblings(self):
+        self.config.html.multiply_repeated_siblings = "lossless"
+        result = self._convert("<ul><li>Item 1</li><li>Item 2</li><li>Item 3</li></ul>")
+        self.assertEqual("ul>li{Item $}*3", result.result)
+        # Numbered run is mapped as a whole to its first node
+        self.assertEqual([("ul", "ul"), ("li", "li{Item $}")], self._spans(result))
+
+    def test_disabled_by_default(self):
+        self.config.html.source_map = False
+        self.assertIsNone(self._convert("<p>Eren</p>").source_map)
@@ -218,3 +218,120 @@ class TestEmmetifierWithSkipTags(BaseTestCase):
         """
         self.emmetify_assert(self.emmetifier, input_html, expected_abbr)
         self.reverse_assert(expected_html, expected_abbr)
+
+
+class TestEmmetifierWithTokenBudget(BaseTestCase):
+    def setUp(self):
+        self.emmetifier = Emmetifier(config=EmmetifierConfig(html=HtmlConfig(skip_tags=True)))
+
+    def test_emmetify_within_budget(self):
+        input_html = '<div id="main"><p>Eren Yeager</p></div>'
+        result = self.emmetifier.emmetify(input_html, max_tokens=100)
+        self.assertEqual("div#main>p{Eren Yeager}", result.result)
+        self.assertEqual([], result.pruned)
+        self.assertEqual(6, result.token_count)
+
+    def test_emmetify_over_budget_with_tokenizer(self):
+        input_html = """
+            <div id="main">
+                <ul><li><a href="/a">Mikasa</a></li><li><a href="/b">Armin</a></li></ul>
+                <p>Levi Ackerman is humanity's strongest soldier.</p>
+            </div>
+        """
+        result = self.emmetifier.emmetify(input_html, max_tokens=60, tokenizer=len)
+        self.assertEqual(
+            "div#main>p{Levi Ackerman is humanity's strongest soldier.}", result.result
+        )
+        self.assertEqual(len(result.result), result.token_count)
+        self.assertEqual(["div#main>ul"], [subtree.path for subtree in result.pruned])
+
+    def test_emmetify_without_budget(self):
+        result = self.emmetifier.emmetify("<div>Hange</div>")
+        self.assertIsNone(result.token_count)
+        self.assertEqual([], result.pruned)
+
+
+class TestEmmetifierWithTokenizer(BaseTestCase):
+    def setUp(self):
+        self.input_html = '<div id="main"><p>Eren Yeager</p></div>'
+
+    def test_emmetify_without_tokenizer(self):
+        result = Emmetifier().emmetify(self.input_html)
+        self.assertIsNone(result.tokens)
+
+    def test_emmetify_with_tokenizer(self):
+        result = Emmetifier(tokenizer=len).emmetify(self.input_html)
+        self.assertEqual(len(self.input_html), result.tokens.input_tokens)
+        self.assertEqual(len(result.result), result.tokens.output_tokens)
+        self.assertEqual(
+            round((len(self.input_html) - len(result.result)) / len(self.input_html) * 100, 2),
+            result.tokens.compression_ratio,
+        )
+
+    def test_tokens_counted_on_first_access(self):
+        counted: list[str] = []
+
+        def count_tokens(text: str) -> int:
+            counted.append(text)
+            return len(text)
+
+        result = Emmetifier(tokenizer=count_tokens).emmetify(self.input_html)
+        self.assertEqual([], counted)
+        self.assertEqual(len(self.input_html), result.tokens.input_tokens)
+        self.assertIs(result.tokens, result.tokens)
+        self.assertEqual([self.input_html, result.result], counted)
+
+    def test_emmetify_tokenizer_override(self):
+        emmetifier = Emmetifier(tokenizer=lambda text: 1)
+        result = emmetifier.emmetify(self.input_html, tokenizer=len)
+        self.assertEqual(len(self.input_html), result.tokens.input_tokens)
+
+    def test_emmetify_budget_reuses_token_count(self):
+        result = Emmetifier(tokenizer=len).emmetify(self.input_html, max_tokens=100)
+        self.assertEqual(result.token_count, result.tokens.output_tokens)
+
+    def test_emmetify_empty_content(self):
+        result = Emmetifier(tokenizer=len).emmetify("")
+        self.assertEqual(0.0, result.tokens.compression_ratio)
+
+
+class TestEmmetifierChunks(BaseTestCase):
+    def test_emmetify_chunks(self):
+        input_html = "<ul>" + "".join(f"<li>Titan {i}</li>" for i in range(10)) + "</ul>"
+        chunks = Emmetifier().emmetify_chunks(input_html, max_tokens=40, tokenizer=len)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual({"ul"}, {chunk.path for chunk in chunks})
+        self.assertEqual(
+            [f"Titan {i}" for i in range(10)],
+            [text for chunk in chunks for text in chunk.result[3:-1].split("}+li{")],
+        )
+
+
+class TestEmmetifierWithTimings(BaseTestCase):
+    def setUp(self):
+        self.input_html = '<div id="main"><p>Eren Yeager</p></div>'
+
+    def test_timings_off_by_default(self):
+        self.assertEqual({}, Emmetifier().emmetify(self.input_html).timings)
+
+    def test_timings_per_stage(self):
+        emmetifier = Emmetifier(config={"html": {"report_timings": True}}, tokenizer=len)
+        timings = emmetifier.emmetify(self.input_html).timings
+        self.assertEqual(["parse", "build", "optimize", "convert"], list(timings))
+        self.assertTrue(all(seconds >= 0 for seconds in timings.values()))
+
+    def test_timings_of_every_conversion(self):
+        emmetifier = Emmetifier(config={"html": {"report_timings": True}})
+        first = emmetifier.emmetify(self.input_html)
+        second = emmetifier.emmetify(self.input_html, max_tokens=100)
+        self.assertIsNot(first.timings, second.timings)
+        self.assertEqual(["parse", "build", "optimize", "convert"], list(second.timings))
+
+    def test_timings_of_chunks(self):
+        emmetifier = Emmetifier(config={"html": {"report_timings": True}})
+        html = "<ul>{}</ul>".format("".join(f"<li>Titan {i}</li>" for i in range(20)))
+        chunks = emmetifier.emmetify_chunks(html, max_tokens=20)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(["parse", "build", "optimize", "convert"], list(chunks[0].timings))
+        self.assertTrue(all(list(chunk.timings) == ["convert"] for chunk in chunks[1:]))
+        self.assertEqual({}, Emmetifier().emmetify_chunks(html, max_tokens=20)[0].timings)
@@ -0,0 +1,104 @@
+from emmet import expand as expand_emmet
+
+from emmetify.config.base_config import EmmetifierConfig
+from emmetify.converters.html_converter import HtmlConverter
+from emmetify.optimizers.html_chunker import HtmlSubtreeChunker
+from emmetify.parsers.html_parser import HtmlParser
+from tests.utils import BaseEmmetTestCase
+
+
+def count_chars(text: str) -> int:
+    return len(text)
+
+
+class TestHtmlSubtreeChunker(BaseEmmetTestCase):
+    def setUp(self):
+        self.config = EmmetifierConfig()
+        self.config.indent = False
+        items = "".join(
+            f'<li class="item"><a href="https://titans.example/{i}">Titan number {i}</a></li>'
+            for i in range(1, 7)
+        )
+        self.input_html = f"""
+            <div id="page">
+                <header><h1>Titans</h1></header>
+                <ul class="list">{items}</ul>
+                <footer>Paradis</footer>
+            </div>
+        """
+
+    def _chunk(self, max_tokens: int):
+        parser = HtmlParser(self.config)
+        chunker = HtmlSubtreeChunker(HtmlConverter(self.config), count_chars)
+        return chunker.chunk(parser.parse(self.input_html), max_tokens)
+
+    def test_single_chunk_within_budget(self):
+        chunks = self._chunk(10_000)
+        self.assertEqual(1, len(chunks))
+        self.assertEqual("", chunks[0].path)
+        self.assertTrue(chunks[0].result.startswith("div#page>"))
+
+    def test_chunks_fit_in_budget(self):
+        chunks = self._chunk(120)
+        self.assertGreater(len(chunks), 2)
+        for chunk in chunks:
+            self.assertLessEqual(chunk.token_count, 120)
+            self.assertEqual(len(chunk.result), chunk.token_count)
+
+    def test_chunks_are_valid_emmet(self):
+        for chunk in self._chunk(120):
+            # Cut Emmet would fail to expand or leave unbalanced groups
+            self.assertEqual(chunk.result.count("("), chunk.result.count(")"))
+            self.assertTrue(expand_emmet(chunk.result))
+
+    def test_chunks_are_self_contained_with_elided_tags(self):
+        self.config.html.elide_implicit_tags = True
+        chunks = self._chunk(120)
+        self.assertEqual("div#page>ul.list", chunks[1].path)
+        self.assertTrue(chunks[1].result.startswith("(li.item>a"))
+        for chunk in chunks:
+            # Expanded on its own, every chunk keeps the tags of its nodes
+            self.assertNotIn('<div class="item">', expand_emmet(chunk.result))
+
+    def test_chunks_carry_ancestor_path(self):
+        chunks = self._chunk(120)
+        self.assertEqual("div#page", chunks[0].path)
+        self.assertEqual("header>h1{Titans}", chunks[0].result)
+        self.assertEqual("div#page>ul.list", chunks[1].path)
+        self.assertTrue(chunks[1].result.startswith("(li.item>a"))
+        self.assertEqual(("div#page", "footer{Paradis}"), (chunks[-1].path, chunks[-1].result))
+
+    def test_chunks_cover_all_items_in_order(self):
+        chunks = self._chunk(120)
+        text = "".join(chunk.result for chunk in chunks)
+        positions = [text.index(f"Titan number {i}") for i in range(1, 7)]
+        self.assertEqual(sorted(positions), positions)
+
+    def test_chunks_carry_only_used_maps(self):
+        self.config.html.simplify_classes = True
+        self.config.html.simplify_absolute_links = True
+        chunks = self._chunk(60)
+        class_names = set()
+        for chunk in chunks:
+            for name, link in chunk.maps.links.items():
+                self.assertIn(f"href={name}", chunk.result)
+                self.assertTrue(link.startswith("https://titans.example/"))
+            class_names.update(chunk.maps.classes)
+        # The same class keeps the same name in every chunk
+        self.assertEqual(1, len(class_names))
+        all_links = [link for chunk in chunks for link in chunk.maps.links.values()]
+        self.assertEqual(6, len(all_links))
+
+    def test_oversized_leaf_kept_whole(self):
+        self.input_html = f"<div><p>{'Titan ' * 50}</p></div>"
+        chunks = self._chunk(40)
+        self.assertEqual(1, len(chunks))
+        self.assertGreater(chunks[0].token_count, 40)
+        self.assertEqual("div>p", chunks[0].path)
+
+    def test_iter_chunks_yields_chunks_as_rendered(self):
+        parser = HtmlParser(self.config)
+        chunker = HtmlSubtreeChunker(HtmlConverter(self.config), count_chars)
+        chunks = chunker.iter_chunks(parser.parse(self.input_html), 120)
+        self.assertEqual(self._chunk(120)[0], next(chunks))
+        self.assertEqual(self._chunk(120)[1:], list(chunks))
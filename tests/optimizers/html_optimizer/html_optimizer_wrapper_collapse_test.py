@@ -0,0 +1,90 @@
+from emmetify.config.base_config import EmmetifierConfig
+from emmetify.converters.html_converter import HtmlConverter
+from emmetify.optimizers.html_optimizer import HtmlOptimizer
+from emmetify.parsers.html_parser import HtmlParser
+from tests.utils import BaseEmmetTestCase
+
+
+class TestHtmlOptimizerWrapperCollapse(BaseEmmetTestCase):
+    def setUp(self):
+        self.config = EmmetifierConfig()
+        self.config.html.collapse_wrappers = True
+        self.config.indent = False
+
+    def _convert(self, input_html: str) -> str:
+        parser = HtmlParser(self.config)
+        optimizer = HtmlOptimizer(self.config)
+        converter = HtmlConverter(self.config)
+        node_pool = optimizer.optimize(parser.parse(input_html))
+        return converter.convert(node_pool).result
+
+    def test_collapse_wrapper_chain(self):
+        input_html = """
+            <div class="card">
+                <div>
+                    <div>
+                        <div>
+                            <span class="price">Eren Yeager</span>
+                        </div>
+                    </div>
+                </div>
+            </div>
+        """
+        result = self._convert(input_html)
+        self.assertEqual("div.card>span.price{Eren Yeager}", result)
+
+    def test_collapse_root_wrapper(self):
+        input_html = "<div><div><p>Mikasa Ackerman</p></div></div>"
+        result = self._convert(input_html)
+        self.assertEqual("p{Mikasa Ackerman}", result)
+
+    def test_keep_wrapper_with_attributes(self):
+        input_html = '<div id="main"><div data-x="1"><p>Armin</p></div></div>'
+        result = self._convert(input_html)
+        self.assertEqual("div#main>div[data-x=1]>p{Armin}", result)
+
+    def test_keep_wrapper_with_multiple_children(self):
+        input_html = "<section><div><p>Levi</p><p>Hange</p></div></section>"
+        result = self._convert(input_html)
+        self.assertEqual("section>div>p{Levi}+p{Hange}", result)
+
+    def test_keep_wrapper_with_text_child(self):
+        input_html = "<section><div>Erwin Smith</div></section>"
+        result = self._convert(input_html)
+        self.assertEqual("section>div{Erwin Smith}", result)
+
+    def test_keep_tags_outside_of_wrapper_set(self):
+        input_html = "<main><section><article><p>Reiner</p></article></section></main>"
+        result = self._convert(input_html)
+        self.assertEqual("main>section>article>p{Reiner}", result)
+
+    def test_custom_wrapper_tags(self):
+        self.config.html.wrapper_tags_to_collapse = {"section", "article"}
+        input_html = "<main><section><article><p>Reiner</p></article></section></main>"
+        result = self._convert(input_html)
+        self.assertEqual("main>p{Reiner}", result)
+
+    def test_collapse_keeps_siblings_order(self):
+        input_html = """
+            <ul>
+                <li>Annie</li>
+                <div><div><li>Bertholdt</li></div></div>
+                <li>Ymir</li>
+            </ul>
+        """
+        result = self._convert(input_html)
+        self.assertEqual("ul>li{Annie}+li{Bertholdt}+li{Ymir}", result)
+
+    def test_collapse_reduces_node_count(self):
+        parser = HtmlParser(self.config)
+        optimizer = HtmlOptimizer(self.config)
+        node_pool = parser.parse("<div><div><div><a href='#'>Link</a></div></div></div>")
+        self.assertEqual(5, node_pool.get_nodes_count())
+        node_pool = optimizer.optimize(node_pool)
+        self.assertEqual(2, node_pool.get_nodes_count())
+
+    def test_disabled_collapse(self):
+        self.config.html.collapse_wrappers = False
+        input_html = "<div><div><p>Mikasa Ackerman</p></div></div>"
+        result = self._convert(input_html)
+        self.assertEqual("div>div>p{Mikasa Ackerman}", result)
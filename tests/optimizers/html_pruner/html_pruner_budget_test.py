@@ -0,0 +1,80 @@
+from emmetify.config.base_config import EmmetifierConfig
+from emmetify.converters.html_converter import HtmlConverter
+from emmetify.optimizers.html_pruner import HtmlSubtreePruner
+from emmetify.parsers.html_parser import HtmlParser
+from tests.utils import BaseEmmetTestCase
+
+
+def count_chars(text: str) -> int:
+    return len(text)
+
+
+class TestHtmlSubtreePruner(BaseEmmetTestCase):
+    def setUp(self):
+        self.config = EmmetifierConfig()
+        self.config.indent = False
+        self.input_html = """
+            <div id="page">
+                <nav>
+                    <a href="/home">Home</a>
+                    <a href="/about">About</a>
+                    <a href="/contact">Contact</a>
+                </nav>
+                <article>
+                    <p>Eren Yeager fights the titans to protect humanity.</p>
+                </article>
+            </div>
+        """
+
+    def _prune(self, max_tokens: int):
+        parser = HtmlParser(self.config)
+        pruner = HtmlSubtreePruner(HtmlConverter(self.config), count_chars)
+        return pruner.prune(parser.parse(self.input_html), max_tokens)
+
+    def test_no_pruning_within_budget(self):
+        result = self._prune(1000)
+        self.assertEqual([], result.pruned)
+        self.assertEqual(len(result.result), result.token_count)
+
+    def test_prune_navigation_before_content(self):
+        result = self._prune(90)
+        self.assertEqual(
+            "div#page>article>p{Eren Yeager fights the titans to protect humanity.}",
+            result.result,
+        )
+        self.assertEqual(["div#page>nav"], [subtree.path for subtree in result.pruned])
+        self.assertEqual(len(result.result), result.token_count)
+        self.assertLessEqual(result.token_count, 90)
+
+    def test_prune_smaller_subtrees_first(self):
+        result = self._prune(140)
+        self.assertLessEqual(result.token_count, 140)
+        self.assertIn("article>p{Eren Yeager", result.result)
+        self.assertTrue(all(subtree.path.startswith("div#page>nav") for subtree in result.pruned))
+
+    def test_roots_are_never_pruned(self):
+        result = self._prune(1)
+        self.assertEqual("div#page", result.result)
+        self.assertGreater(result.token_count, 1)
+
+    def test_pruned_descendants_are_merged_into_ancestor(self):
+        result = self._prune(20)
+        paths = [subtree.path for subtree in result.pruned]
+        self.assertEqual(len(paths), len(set(paths)))
+        for path in paths:
+            self.assertFalse(any(path.startswith(f"{other}>") for other in paths))
+
+    def test_collect_stats(self):
+        parser = HtmlParser(self.config)
+        pruner = HtmlSubtreePruner(HtmlConverter(self.config), count_chars)
+        node_pool = parser.parse(self.input_html)
+        stats = {s.path: s for s in pruner.collect_stats(node_pool).values()}
+
+        nav_stats = stats["div#page>nav"]
+        self.assertEqual(1, nav_stats.depth)
+        self.assertEqual(len("HomeAboutContact"), nav_stats.text_chars)
+        self.assertEqual(nav_stats.text_chars, nav_stats.link_chars)
+
+        article_stats = stats["div#page>article"]
+        self.assertEqual(0, article_stats.link_chars)
+        self.assertGreater(article_stats.score, nav_stats.score)
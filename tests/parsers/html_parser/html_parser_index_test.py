@@ -0,0 +1,60 @@
+import unittest
+
+from emmetify.config.base_config import EmmetifierConfig
+from emmetify.parsers.html_parser import HtmlParser
+
+HTML = (
+    '<div id="main" class="card wide"><p class="lead">Eren</p>'
+    '<ul><li><a href="/titans" class="lead">Titans</a></li></ul></div>'
+    '<footer id="main"><a href="/scouts">Scouts</a></footer>'
+)
+
+
+class TestHtmlNodePoolIndex(unittest.TestCase):
+    def setUp(self):
+        self.node_pool = HtmlParser(EmmetifierConfig()).parse(HTML)
+        self.index = self.node_pool.get_index()
+
+    def _tags(self, node_ids: list[str]) -> list[str]:
+        return [self.node_pool.get_node(node_id).tag for node_id in node_ids]
+
+    def test_tags_and_classes_in_document_order(self):
+        self.assertEqual(["a", "a"], self._tags(self.index.tags["a"]))
+        self.assertEqual(["p", "a"], self._tags(self.index.classes["lead"]))
+        self.assertEqual(["div"], self._tags(self.index.classes["wide"]))
+        self.assertNotIn("#text", self.index.tags)
+
+    def test_first_node_of_repeated_id(self):
+        self.assertEqual("div", self.node_pool.get_node(self.index.ids["main"]).tag)
+
+    def test_attribute_names(self):
+        self.assertEqual(["a", "a"], self._tags(self.index.attributes["href"]))
+        self.assertEqual(["div", "footer"], self._tags(self.index.attributes["id"]))
+
+    def test_ancestor_tests(self):
+        div_id, footer_id = self.index.tags["div"][0], self.index.tags["footer"][0]
+        first_link_id, second_link_id = self.index.tags["a"]
+        self.assertTrue(self.index.is_ancestor(div_id, first_link_id))
+        self.assertFalse(self.index.is_ancestor(div_id, second_link_id))
+        self.assertFalse(self.index.is_ancestor(first_link_id, div_id))
+        self.assertFalse(self.index.is_ancestor(div_id, div_id))
+        self.assertEqual(
+            [second_link_id], self.index.get_descendant_ids(footer_id, self.index.tags["a"])
+        )
+
+    def test_index_is_rebuilt_after_tree_changes(self):
+        self.assertIs(self.index, self.node_pool.get_index())
+        self.node_pool.remove_node(self.index.tags["ul"][0])
+        index = self.node_pool.get_index()
+        self.assertIsNot(self.index, index)
+        self.assertEqual(["a"], self._tags(index.tags["a"]))
+        self.assertNotIn("ul", index.tags)
+
+    def test_siblings_relinked_after_removal(self):
+        div_id = self.index.tags["div"][0]
+        p_id, ul_id = self.node_pool.get_node(div_id).children_ids
+        self.node_pool.remove_node(p_id)
+        ul_node = self.node_pool.get_node(ul_id)
+        self.assertEqual([ul_id], self.node_pool.get_node(div_id).children_ids)
+        self.assertIsNone(ul_node.prev_sibling_id)
+        self.assertIsNone(ul_node.next_sibling_id)
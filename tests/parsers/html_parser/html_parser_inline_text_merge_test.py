@@ -0,0 +1,69 @@
+from emmetify.config.base_config import EmmetifierConfig
+from emmetify.converters.html_converter import HtmlConverter
+from emmetify.parsers.html_parser import HtmlParser
+from tests.utils import BaseEmmetTestCase
+
+
+class TestHtmlParserInlineTextMerge(BaseEmmetTestCase):
+    def setUp(self):
+        self.config = EmmetifierConfig()
+        self.config.html.merge_inline_text = True
+        self.config.indent = False
+
+    def _convert(self, input_html: str) -> str:
+        parser = HtmlParser(self.config)
+        converter = HtmlConverter(self.config)
+        return converter.convert(parser.parse(input_html)).result
+
+    def test_merge_inline_tags_into_text(self):
+        input_html = "<p>Price: <b>$10</b> <span>incl. VAT</span></p>"
+        result = self._convert(input_html)
+        self.assertEqual(r"p{Price: \$10 incl. VAT}", result)
+        self.emmet_reverse_assert("<p>Price: $10 incl. VAT</p>", result)
+
+    def test_merge_keeps_original_spacing(self):
+        input_html = "<p><strong>Eren</strong>Yeager and <em>Mikasa</em> Ackerman</p>"
+        result = self._convert(input_html)
+        self.assertEqual("p{ErenYeager and Mikasa Ackerman}", result)
+
+    def test_merge_nested_inline_tags(self):
+        input_html = "<p>Attack <i>on <b>Titan</b></i> <small>(2013)</small></p>"
+        result = self._convert(input_html)
+        self.assertEqual("p{Attack on Titan (2013)}", result)
+
+    def test_keep_inline_tags_with_attributes(self):
+        input_html = '<p>Price: <b>$10</b> <span class="vat">incl. VAT</span> today</p>'
+        result = self._convert(input_html)
+        self.assertEqual(r"p{Price: \$10}>span.vat{incl. VAT}+{today}", result)
+
+    def test_keep_inline_tags_with_element_children(self):
+        input_html = '<p>Read <span>the <a href="/docs">docs</a></span></p>'
+        result = self._convert(input_html)
+        self.assertEqual("p{Read}>span{the}>a[href=/docs]{docs}", result)
+
+    def test_skip_comments_in_merged_text(self):
+        input_html = "<p>Levi <!-- captain --><b>Ackerman</b></p>"
+        result = self._convert(input_html)
+        self.assertEqual("p{Levi Ackerman}", result)
+
+    def test_keep_tags_outside_of_merge_set(self):
+        input_html = "<p>Press <kbd>Ctrl</kbd> now</p>"
+        result = self._convert(input_html)
+        self.assertEqual("p{Press}>kbd{Ctrl}+{now}", result)
+
+    def test_custom_inline_tags(self):
+        self.config.html.inline_tags_to_merge = {"kbd"}
+        input_html = "<p>Press <kbd>Ctrl</kbd> <b>now</b></p>"
+        result = self._convert(input_html)
+        self.assertEqual("p{Press Ctrl}>b{now}", result)
+
+    def test_merge_reduces_node_count(self):
+        parser = HtmlParser(self.config)
+        node_pool = parser.parse("<p>Price: <b>$10</b> <span>incl. VAT</span></p>")
+        self.assertEqual(2, node_pool.get_nodes_count())
+
+    def test_disabled_merge(self):
+        self.config.html.merge_inline_text = False
+        input_html = "<p>Price: <b>$10</b> <span>incl. VAT</span></p>"
+        result = self._convert(input_html)
+        self.assertEqual(r"p{Price:}>b{\$10}+span{incl. VAT}", result)
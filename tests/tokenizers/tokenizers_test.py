@@ -0,0 +1,103 @@
+import sys
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from emmetify.tokenizers import (
+    ApproximateTokenizer,
+    CachedTokenizer,
+    CallableTokenizer,
+    TiktokenTokenizer,
+    Tokenizer,
+    get_tokenizer,
+)
+from emmetify.tokenizers.cached_tokenizer import PIECES_PATTERN
+
+
+class CountingTokenizer:
+    def __init__(self):
+        self.calls: list[str] = []
+
+    def count_tokens(self, text: str) -> int:
+        self.calls.append(text)
+        return len(text)
+
+
+class TestTokenizers(unittest.TestCase):
+    def test_get_tokenizer_none(self):
+        self.assertIsNone(get_tokenizer(None))
+
+    def test_get_tokenizer_wraps_callable(self):
+        tokenizer = get_tokenizer(len)
+        self.assertIsInstance(tokenizer, CachedTokenizer)
+        self.assertIsInstance(tokenizer.tokenizer, CallableTokenizer)
+        self.assertEqual(11, tokenizer.count_tokens("hello world"))
+
+    def test_get_tokenizer_keeps_approximate_and_cached(self):
+        approximate = ApproximateTokenizer()
+        cached = CachedTokenizer(approximate)
+        self.assertIs(approximate, get_tokenizer(approximate))
+        self.assertIs(cached, get_tokenizer(cached))
+
+    def test_tokenizer_protocol(self):
+        self.assertIsInstance(CountingTokenizer(), Tokenizer)
+        self.assertNotIsInstance(len, Tokenizer)
+
+    def test_pieces_cover_whole_text(self):
+        text = "<div class='card_title'>Eren's 12345 titans</div>\n  div.card_title{Eren}"
+        self.assertEqual(text, "".join(PIECES_PATTERN.findall(text)))
+
+    def test_cached_tokenizer_counts_repeated_texts_once(self):
+        counting = CountingTokenizer()
+        tokenizer = CachedTokenizer(counting)
+        for text in ["Eren", "Mikasa", "Eren", "Eren"]:
+            self.assertEqual(len(text), tokenizer.count_tokens(text))
+        self.assertEqual(["Eren", "Mikasa"], counting.calls)
+
+    def test_cached_tokenizer_counts_long_texts_whole(self):
+        counting = CountingTokenizer()
+        tokenizer = CachedTokenizer(counting)
+        text = "<div><div>titan</div></div>" * 20
+
+        self.assertEqual(len(text), tokenizer.count_tokens(text))
+        self.assertEqual([text], counting.calls)
+
+    def test_cached_tokenizer_counts_special_tokens_once(self):
+        # Tokenizer adding a begin of sequence token to every encoded text
+        tokenizer = CachedTokenizer(CallableTokenizer(lambda text: len(text.split()) + 1))
+        text = " ".join(["titan"] * 100)
+        self.assertEqual(101, tokenizer.count_tokens(text))
+
+    def test_cached_tokenizer_split_pieces(self):
+        counting = CountingTokenizer()
+        tokenizer = CachedTokenizer(counting, split_pieces=True)
+        text = "<div><div><div>titan</div></div></div>" * 10
+
+        self.assertEqual(len(text), tokenizer.count_tokens(text))
+        self.assertEqual(len(text), tokenizer.count_tokens(text))
+        self.assertEqual(len(set(counting.calls)), len(counting.calls))
+        self.assertNotIn(text, counting.calls)
+
+    def test_cached_tokenizer_clears_full_cache(self):
+        tokenizer = CachedTokenizer(CountingTokenizer(), max_cache_size=2)
+        for text in ["one", "two", "three"]:
+            tokenizer.count_tokens(text)
+        self.assertLessEqual(len(tokenizer._cache), 2)
+
+    def test_tiktoken_tokenizer(self):
+        encoding = SimpleNamespace(encode=lambda text, disallowed_special: text.split())
+        tiktoken = SimpleNamespace(
+            get_encoding=lambda name: encoding, encoding_for_model=lambda model: encoding
+        )
+        with patch.dict(sys.modules, {"tiktoken": tiktoken}):
+            self.assertEqual(3, TiktokenTokenizer().count_tokens("div p span"))
+            self.assertEqual(2, TiktokenTokenizer("gpt-4o").count_tokens("div p"))
+
+    def test_tiktoken_tokenizer_missing_dependency(self):
+        with patch.dict(sys.modules, {"tiktoken": None}):
+            with self.assertRaises(ImportError):
+                TiktokenTokenizer()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import unittest
+
+from lxml import html as lxml_html
+
+from emmetify import Emmetifier
+from emmetify.config import EmmetifierConfig
+from emmetify.converters.html_converter import HtmlConverterMaps
+from emmetify.parsers.html_parser import HtmlParser
+from emmetify.utils.xpath import (
+    XPathEvaluationError,
+    XPathEvaluator,
+    XPathSyntaxError,
+    evaluate_xpath,
+)
+
+HTML = (
+    "<html><body>"
+    '<nav id="menu"><a href="/titans" class="link active">Titans</a>'
+    '<a href="/scouts" class="link">Scouts</a></nav>'
+    '<div class="card"><h2>Eren</h2><p>Attack <b>titan</b></p><p>Founding</p>'
+    '<img src="/eren.png" alt="Eren"></div>'
+    '<div class="card"><h2>Mikasa</h2><p>Ackerman</p></div>'
+    "</body></html>"
+)
+
+
+class TestXPathEvaluator(unittest.TestCase):
+    def setUp(self):
+        self.node_pool = HtmlParser(EmmetifierConfig()).parse(HTML)
+        self.evaluator = XPathEvaluator(self.node_pool)
+
+    def _tags(self, xpath: str) -> list[str]:
+        return [node.tag for node in self.evaluator.select(xpath)]
+
+    def test_child_and_descendant_axes(self):
+        self.assertEqual(["nav", "div", "div"], self._tags("/html/body/*"))
+        self.assertEqual(["h2", "h2"], self._tags("//div/h2"))
+        self.assertEqual(["b"], self._tags("//div//b"))
+        self.assertEqual(["html"], self._tags("/html"))
+        self.assertEqual([], self._tags("/body"))
+
+    def test_positional_predicates(self):
+        self.assertEqual(["Founding"], self.evaluator.evaluate("//div[1]/p[2]/text()"))
+        self.assertEqual(["Founding", "Ackerman"], self.evaluator.evaluate("//p[last()]/text()"))
+        self.assertEqual(["Founding"], self.evaluator.evaluate("(//p)[2]/text()"))
+        self.assertEqual(["Eren"], self.evaluator.evaluate("(//h2)[position() < 2]/text()"))
+        self.assertEqual(["p", "img"], self._tags("//div[1]/*[position() > 2]"))
+        self.assertEqual(["Founding"], self.evaluator.evaluate("//div/descendant::p[2]/text()"))
+        self.assertEqual(["Ackerman"], self.evaluator.evaluate("/descendant::p[3]/text()"))
+
+    def test_attribute_predicates(self):
+        self.assertEqual(["/titans"], self.evaluator.evaluate("//a[@class='link active']/@href"))
+        self.assertEqual(["a", "a"], self._tags("//nav[@id='menu']/a[@href]"))
+        self.assertEqual(["Eren"], self.evaluator.evaluate("//img/@alt"))
+        self.assertEqual([], self._tags("//a[@title]"))
+
+    def test_contains_and_text(self):
+        self.assertEqual(
+            ["/titans", "/scouts"],
+            self.evaluator.evaluate("//a[contains(@class, 'link')]/@href"),
+        )
+        self.assertEqual(["p"], self._tags("//p[contains(., 'Attack titan')]"))
+        self.assertEqual(["Scouts"], self.evaluator.evaluate("//a[text()='Scouts']/text()"))
+        self.assertEqual(["h2"], self._tags("//h2[starts-with(normalize-space(), 'Mik')]"))
+
+    def test_reverse_and_sibling_axes(self):
+        self.assertEqual(["p"], self._tags("//b/ancestor::*[1]"))
+        self.assertEqual(["p", "img"], self._tags("//div[1]/p[1]/following-sibling::*"))
+        self.assertEqual(["p"], self._tags("//img/preceding-sibling::*[1]"))
+        self.assertEqual(["div"], self._tags("//b/../.."))
+
+    def test_scalar_results(self):
+        self.assertEqual(3.0, self.evaluator.evaluate("count(//p)"))
+        self.assertEqual("Mikasa", self.evaluator.evaluate("string(//div[2]/h2)"))
+        self.assertTrue(self.evaluator.evaluate("//h2 = 'Mikasa'"))
+        self.assertFalse(self.evaluator.evaluate("//h2 != 'Eren' and //h2 = 'Armin'"))
+        self.assertEqual(7.0, self.evaluator.evaluate("1 + 2 * 3"))
+
+    def test_union_in_document_order(self):
+        self.assertEqual(["nav", "h2", "h2"], self._tags("//h2 | //nav"))
+
+    def test_errors(self):
+        with self.assertRaises(XPathSyntaxError):
+            self.evaluator.evaluate("//div[")
+        with self.assertRaises(XPathEvaluationError):
+            self.evaluator.evaluate("//div[matches(@class, 'c.*')]")
+        with self.assertRaises(XPathEvaluationError):
+            self.evaluator.evaluate("//div[@class=$card]")
+        with self.assertRaises(XPathEvaluationError):
+            self.evaluator.evaluate("//div/following::p")
+
+    def test_matches_lxml(self):
+        tree = lxml_html.fromstring(HTML)
+        xpaths = [
+            "//a/@href",
+            "//p[last()]/text()",
+            "//div[@class='card'][2]/p/text()",
+            "//nav/a[2]/text()",
+            "//div[h2='Eren']/img/@src",
+            "//*[@alt]/@alt",
+            "//p[b]/b/text()",
+            "count(//div/*)",
+            "string(//nav/a[last()]/@class)",
+            "//a[not(contains(@class, 'active'))]/text()",
+        ]
+        for xpath in xpaths:
+            with self.subTest(xpath=xpath):
+                self.assertEqual(tree.xpath(xpath), self.evaluator.evaluate(xpath))
+
+
+class TestXPathEvaluatorWithConverterMaps(unittest.TestCase):
+    def test_simplified_values_are_restored(self):
+        emmetifier = Emmetifier(
+            config={
+                "html": {
+                    "simplify_classes": True,
+                    "simplify_relative_links": True,
+                    "simplify_images": True,
+                }
+            }
+        )
+        result = emmetifier.emmetify(HTML)
+        link_name = {link: name for name, link in result.maps.links.items()}["/scouts"]
+        image_name = next(iter(result.maps.images))
+
+        self.assertEqual(
+            ["Scouts"],
+            evaluate_xpath(f"//a[@href='{link_name}']/text()", result.node_pool, result.maps),
+        )
+        self.assertEqual(
+            ["Eren"],
+            evaluate_xpath(f"//img[@src='{image_name}']/@alt", result.node_pool, result.maps),
+        )
+
+    def test_values_are_restored_only_with_maps(self):
+        node_pool = HtmlParser(EmmetifierConfig()).parse(HTML)
+        maps = HtmlConverterMaps(classes={"a": "card"}, links={}, images={})
+        self.assertEqual(2, len(XPathEvaluator(node_pool, maps).select("//div[@class='a']")))
+        self.assertEqual([], XPathEvaluator(node_pool).select("//div[@class='a']"))
@@ -0,0 +1,98 @@
+import unittest
+
+from emmetify.utils.xpath import XPathSyntaxError, parse_xpath, tokenize_xpath
+from emmetify.utils.xpath.parser import (
+    XPathBinaryOp,
+    XPathFilterExpr,
+    XPathFunctionCall,
+    XPathLiteral,
+    XPathLocationPath,
+    XPathNumber,
+    XPathStep,
+)
+
+
+class TestXPathLexer(unittest.TestCase):
+    def _tokens(self, xpath: str) -> list[tuple[str, str]]:
+        return [(token.kind, token.value) for token in tokenize_xpath(xpath)]
+
+    def test_literals_with_quotes_and_slashes(self):
+        self.assertEqual(
+            [("name", "a"), ("operator", "["), ("operator", "@"), ("name", "href")]
+            + [("operator", "="), ("literal", '"/titans/eren\'s"'), ("operator", "]")],
+            self._tokens('a[@href="/titans/eren\'s"]'),
+        )
+
+    def test_star_and_operator_names(self):
+        self.assertEqual(
+            [("name", "*"), ("operator", "["), ("number", "2"), ("operator", "*")]
+            + [("number", "3"), ("operator", "div"), ("name", "div"), ("operator", "]")],
+            self._tokens("*[2 * 3 div div]"),
+        )
+
+    def test_qualified_names_and_axes(self):
+        self.assertEqual(
+            [("name", "child"), ("operator", "::"), ("name", "my:*")],
+            self._tokens("child::my:*"),
+        )
+
+    def test_token_positions(self):
+        token = tokenize_xpath("//a[@class = 'card']")[-2]
+        self.assertEqual((13, 19), (token.start, token.end))
+
+    def test_unterminated_literal(self):
+        with self.assertRaises(XPathSyntaxError):
+            tokenize_xpath("//a[@href='eren]")
+
+
+class TestXPathParser(unittest.TestCase):
+    def test_abbreviated_location_path(self):
+        self.assertEqual(
+            XPathLocationPath(
+                True,
+                [
+                    XPathStep("descendant-or-self", "node()"),
+                    XPathStep("child", "div"),
+                    XPathStep("child", "text()", [XPathNumber(2.0)]),
+                ],
+            ),
+            parse_xpath("//div/text()[2]"),
+        )
+
+    def test_attribute_comparison(self):
+        expr = parse_xpath("a[@href='/titans']")
+        self.assertEqual(
+            XPathBinaryOp(
+                "=",
+                XPathLocationPath(False, [XPathStep("attribute", "href")]),
+                XPathLiteral("/titans", 8, 17),
+            ),
+            expr.steps[0].predicates[0],
+        )
+
+    def test_nested_predicates(self):
+        expr = parse_xpath("//ul[li[a[contains(@href, 'titan')]]]")
+        li_path = expr.steps[1].predicates[0]
+        a_path = li_path.steps[0].predicates[0]
+        self.assertIsInstance(a_path.steps[0].predicates[0], XPathFunctionCall)
+
+    def test_union(self):
+        expr = parse_xpath("//a | //img")
+        self.assertEqual("|", expr.operator)
+        self.assertEqual("img", expr.right.steps[-1].node_test)
+
+    def test_filter_expression(self):
+        expr = parse_xpath("(//a)[1]/@href")
+        self.assertIsInstance(expr, XPathFilterExpr)
+        self.assertEqual([XPathNumber(1.0)], expr.predicates)
+        self.assertEqual([XPathStep("attribute", "href")], expr.path.steps)
+
+    def test_operator_precedence(self):
+        expr = parse_xpath("@a = 1 or @b = 2 and @c = 3")
+        self.assertEqual("or", expr.operator)
+        self.assertEqual("and", expr.right.operator)
+
+    def test_invalid_expressions(self):
+        for xpath in ["//a[", "//a]", "foo::a", "//a[@href='eren'/*comment*/]"]:
+            with self.subTest(xpath=xpath), self.assertRaises(XPathSyntaxError):
+                parse_xpath(xpath)
@@ -0,0 +1,50 @@
+import unittest
+
+from emmetify.converters.html_converter import HtmlConverterMaps
+from emmetify.utils.xpath import XPathRestorer, restore_xpath_from_converter_maps
+
+
+class TestXPathRestorer(unittest.TestCase):
+    def setUp(self):
+        self.maps = HtmlConverterMaps(
+            classes={"a": "card", "b": "menu"},
+            links={"c": "/titans", "d": "https://example.com/"},
+            images={"e": "/eren.png"},
+        )
+
+    def test_restore_many(self):
+        xpaths = [
+            "//div[@class='a']//a[@href='c']",
+            "//ul[contains(@class,'b')]/li/a[starts-with(@href,'d')]",
+            "//img[@src='e'] | //div[@class='b']",
+        ]
+        self.assertEqual(
+            [
+                "//div[@class='card']//a[@href='/titans']",
+                "//ul[contains(@class,'menu')]/li/a[starts-with(@href,'https://example.com/')]",
+                "//img[@src='/eren.png'] | //div[@class='menu']",
+            ],
+            XPathRestorer(self.maps).restore_many(xpaths),
+        )
+
+    def test_restore_many_matches_single_restores(self):
+        xpaths = [
+            "//div[@class='a' and @href='c']",
+            "//a[@class='e' and @href='e']",
+            "//img[@src='c'][@class='a']",
+            "//a[@href='john\\'s']",
+        ]
+        self.assertEqual(
+            [restore_xpath_from_converter_maps(xpath, self.maps) for xpath in xpaths],
+            XPathRestorer(self.maps).restore_many(xpaths),
+        )
+
+    def test_restore_many_keeps_order_of_repeated_xpaths(self):
+        restorer = XPathRestorer(self.maps)
+        results = restorer.restore_many(["//a[@href='c']", "//b", "//a[@href='c']"])
+        self.assertEqual(["//a[@href='/titans']", "//b", "//a[@href='/titans']"], results)
+
+    def test_restore_many_with_empty_maps(self):
+        restorer = XPathRestorer(HtmlConverterMaps(classes={}, links={}, images={}))
+        self.assertEqual(["//div[@class='a']"], restorer.restore_many(["//div[@class='a']"]))
+        self.assertEqual([], restorer.restore_many([]))
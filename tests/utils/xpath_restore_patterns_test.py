@@ -0,0 +1,106 @@
+import unittest
+
+from emmetify.converters.html_converter import HtmlConverterMaps
+from emmetify.utils.xpath import (
+    XPathAttributeRestorer,
+    parse_xpath,
+    restore_xpath_from_converter_maps,
+)
+
+
+class TestXPathAttributePatterns(unittest.TestCase):
+    def test_xpath_parsed_once(self):
+        parse_xpath.cache_clear()
+        restorer = XPathAttributeRestorer()
+        for _ in range(3):
+            restorer.restore_attribute("//div[@class='a']", None, "class", {"a": "card"})
+        self.assertEqual(1, parse_xpath.cache_info().misses)
+        self.assertEqual(2, parse_xpath.cache_info().hits)
+
+    def test_value_replaced_once(self):
+        # Chained maps must not restore a restored value again
+        restorer = XPathAttributeRestorer()
+        result = restorer.restore_attribute(
+            "//div[@class='a']", None, "class", {"a": "b", "b": "c"}
+        )
+        self.assertEqual("//div[@class='b']", result)
+
+    def test_only_compared_value_replaced(self):
+        # The value equal to the attribute name must not touch the attribute name
+        restorer = XPathAttributeRestorer()
+        result = restorer.restore_attribute(
+            "//div[contains(@class,'class')]", None, "class", {"class": "card"}
+        )
+        self.assertEqual("//div[contains(@class,'card')]", result)
+
+    def test_case_insensitive_attribute(self):
+        restorer = XPathAttributeRestorer()
+        result = restorer.restore_attribute("//div[@CLASS='a']", None, "class", {"a": "card"})
+        self.assertEqual("//div[@CLASS='card']", result)
+
+    def test_all_attributes_in_single_pass(self):
+        xpath = "//div[@class='a']/a[@href='b' and @class='a']/img[@src='c' and @href='b']"
+        maps = HtmlConverterMaps(
+            classes={"a": "card"},
+            links={"b": "https://example.com"},
+            images={"c": "https://example.com/titan.png"},
+        )
+        self.assertEqual(
+            "//div[@class='card']/a[@href='https://example.com' and @class='card']"
+            "/img[@src='https://example.com/titan.png' and @href='b']",
+            restore_xpath_from_converter_maps(xpath, maps),
+        )
+
+    def test_literal_before_attribute(self):
+        result = restore_xpath_from_converter_maps(
+            "//a['b'=@href]", HtmlConverterMaps(classes={}, links={"b": "/titans"}, images={})
+        )
+        self.assertEqual("//a['/titans'=@href]", result)
+
+    def test_nested_predicates_use_own_tag(self):
+        maps = HtmlConverterMaps(classes={"a": "card"}, links={"b": "/titans"}, images={})
+        self.assertEqual(
+            "//div[a[@href='/titans'] and @class='card']//span[@href='b']",
+            restore_xpath_from_converter_maps(
+                "//div[a[@href='b'] and @class='a']//span[@href='b']", maps
+            ),
+        )
+
+    def test_attribute_of_relative_path(self):
+        maps = HtmlConverterMaps(classes={}, links={"b": "/titans"}, images={})
+        self.assertEqual(
+            "//li[a/@href='/titans']",
+            restore_xpath_from_converter_maps("//li[a/@href='b']", maps),
+        )
+
+    def test_union(self):
+        maps = HtmlConverterMaps(classes={}, links={"b": "/titans"}, images={"c": "/eren.png"})
+        self.assertEqual(
+            "//a[@href='/titans'] | //img[@src='/eren.png']",
+            restore_xpath_from_converter_maps("//a[@href='b'] | //img[@src='c']", maps),
+        )
+
+    def test_values_with_slashes_and_brackets(self):
+        restorer = XPathAttributeRestorer()
+        result = restorer.restore_attribute(
+            "//div[@class='a/b[1]']/p[@class='c']", None, "class", {"a/b[1]": "x", "c": "y"}
+        )
+        self.assertEqual("//div[@class='x']/p[@class='y']", result)
+
+    def test_restored_value_with_quotes(self):
+        restorer = XPathAttributeRestorer()
+        self.assertEqual(
+            '//a[@href="/eren\'s"]',
+            restorer.restore_attribute("//a[@href='b']", "a", "href", {"b": "/eren's"}),
+        )
+        self.assertEqual(
+            "//a[@href=concat('/eren', \"'\", 's \"titan\"')]",
+            restorer.restore_attribute("//a[@href='b']", "a", "href", {"b": '/eren\'s "titan"'}),
+        )
+
+    def test_other_literals_untouched(self):
+        restorer = XPathAttributeRestorer()
+        result = restorer.restore_attribute(
+            "//div[@class='a' and text()='a']", None, "class", {"a": "card"}
+        )
+        self.assertEqual("//div[@class='card' and text()='a']", result)
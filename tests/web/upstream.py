@@ -0,0 +1,159 @@
+import hashlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+# Last-Modified of all pages, their ETag changes with their content
+LAST_MODIFIED = "Mon, 19 Oct 2026 00:00:00 GMT"
+
+
+class UpstreamServer:
+    """
+    Local stand-in for websites fetched by the web server, serving html pages from memory.
+    Answers conditional requests with 304 Not Modified when the page didn't change.
+    Counts requests, connections and concurrently served requests.
+    """
+
+    def __init__(
+        self,
+        pages: dict[str, str],
+        delay: float = 0.0,
+        content_type: str = "text/html; charset=utf-8",
+        chunk_size: Optional[int] = None,
+        chunk_delay: float = 0.0,
+    ):
+        self.pages = pages
+        # Seconds to wait before answering, to hold connections open
+        self.delay = delay
+        self.content_type = content_type
+        # Bodies are sent in chunks of this size, without Content-Length, if set
+        self.chunk_size = chunk_size
+        # Seconds to wait between chunks, to trickle pages slowly
+        self.chunk_delay = chunk_delay
+        self.requests_count = 0
+        self.not_modified_count = 0
+        self.connections_count = 0
+        self.max_concurrency = 0
+        self._concurrency = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def _enter(self) -> None:
+        with self._lock:
+            self.requests_count += 1
+            self._concurrency += 1
+            self.max_concurrency = max(self.max_concurrency, self._concurrency)
+
+    def _leave(self) -> None:
+        with self._lock:
+            self._concurrency -= 1
+
+    def _not_modified(self) -> None:
+        with self._lock:
+            self.not_modified_count += 1
+
+    def _connect(self) -> None:
+        with self._lock:
+            self.connections_count += 1
+
+    def _make_handler(self) -> type[BaseHTTPRequestHandler]:
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive connections, as served by real websites
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                upstream._connect()
+
+            def do_GET(self):
+                upstream._enter()
+                try:
+                    if upstream.delay:
+                        time.sleep(upstream.delay)
+                    page = upstream.pages.get(self.path)
+                    if page is None:
+                        self._send(404, b"Not Found")
+                        return
+
+                    body = page.encode(self._charset())
+                    etag = f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+                    if self._is_not_modified(etag):
+                        upstream._not_modified()
+                        self._send(304, b"", etag)
+                    else:
+                        self._send(200, body, etag)
+                except (BrokenPipeError, ConnectionResetError):
+                    # Client gave up waiting, e.g. on timeout
+                    pass
+                finally:
+                    upstream._leave()
+
+            def _is_not_modified(self, etag: str) -> bool:
+                # If-None-Match takes precedence over If-Modified-Since
+                if_none_match = self.headers.get("If-None-Match")
+                if if_none_match is not None:
+                    return if_none_match == etag
+                return self.headers.get("If-Modified-Since") == LAST_MODIFIED
+
+            def _charset(self) -> str:
+                _, _, charset = upstream.content_type.partition("charset=")
+                return charset or "utf-8"
+
+            def _send(self, status: int, body: bytes, etag: Optional[str] = None):
+                self.send_response(status)
+                self.send_header("Content-Type", upstream.content_type)
+                if etag is not None:
+                    self.send_header("ETag", etag)
+                    self.send_header("Last-Modified", LAST_MODIFIED)
+                if status == 304:
+                    self.end_headers()
+                elif upstream.chunk_size is None or status != 200:
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                else:
+                    self.send_header("Transfer-Encoding", "chunked")
+                    self.end_headers()
+                    self._send_chunks(body)
+
+            def _send_chunks(self, body: bytes):
+                for start in range(0, len(body), upstream.chunk_size):
+                    if upstream.chunk_delay:
+                        time.sleep(upstream.chunk_delay)
+                    chunk = body[slice(start, start + upstream.chunk_size)]
+                    self.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+                    self.wfile.flush()
+                self.wfile.write(b"0\r\n\r\n")
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "UpstreamServer":
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "UpstreamServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
@@ -0,0 +1,785 @@
+import asyncio
+import gzip
+import importlib.util
+import json
+import sys
+import unittest
+from pathlib import Path
+from typing import Optional
+from unittest.mock import patch
+
+from tests.web.upstream import UpstreamServer
+
+HAS_SERVER_DEPENDENCIES = all(
+    importlib.util.find_spec(name) for name in ("fastapi", "httpx", "emmet")
+)
+SERVER_DIR = Path(__file__).parents[2] / "web" / "server"
+
+PAGES = {
+    "/titans": '<html><body><div class="card"><a href="/eren">Eren</a></div></body></html>',
+    "/scouts": "<html><body><ul><li>Mikasa</li><li>Armin</li></ul></body></html>",
+}
+
+LONG_PAGE = "<html><body><ul>{}</ul></body></html>".format(
+    "".join(f'<li><a href="/titans/{i}">Titan {i}</a></li>' for i in range(40))
+)
+
+
+def load_server_module(name: str):
+    if str(SERVER_DIR) not in sys.path:
+        sys.path.insert(0, str(SERVER_DIR))
+    return importlib.import_module(name)
+
+
+@unittest.skipUnless(HAS_SERVER_DEPENDENCIES, "web server dependencies are not installed")
+class ServerTestCase(unittest.TestCase):
+    """
+    Runs the app once per test class, as its startup starts the conversion pool.
+    Each test gets a new upstream server serving the pages and an empty fetch cache.
+    """
+
+    pages: Optional[dict[str, str]] = PAGES
+
+    @classmethod
+    def setUpClass(cls):
+        from fastapi.testclient import TestClient
+
+        cls.main = load_server_module("main")
+        cls.client = TestClient(cls.main.app)
+        cls.client.__enter__()
+        cls.addClassCleanup(cls.client.__exit__, None, None, None)
+
+    def setUp(self):
+        self.client.app.state.cache = self.main.FetchCache()
+        if self.pages is not None:
+            self.upstream = UpstreamServer(dict(self.pages)).start()
+            self.addCleanup(self.upstream.stop)
+
+
+class TestUrlEndpoint(ServerTestCase):
+    def test_emmetify_url(self):
+        response = self.client.post("/api/v1/url", json={"url": f"{self.upstream.url}/titans"})
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(
+            "html>body>div.card>a[href=/eren]{Eren}", response.json()["emmet"]["result"]
+        )
+        self.assertEqual(
+            {"classes": {}, "links": {}, "images": {}}, response.json()["emmet"]["maps"]
+        )
+
+    def test_connections_are_reused(self):
+        for path in ["/titans", "/scouts", "/titans", "/scouts"]:
+            response = self.client.post("/api/v1/url", json={"url": f"{self.upstream.url}{path}"})
+            self.assertEqual(200, response.status_code)
+        self.assertEqual(4, self.upstream.requests_count)
+        self.assertEqual(1, self.upstream.connections_count)
+
+    def test_fetch_errors(self):
+        for url in [f"{self.upstream.url}/missing", "not a url", "http://127.0.0.1:1/"]:
+            with self.subTest(url=url):
+                response = self.client.post("/api/v1/url", json={"url": url})
+                self.assertEqual(400, response.status_code)
+                self.assertTrue(response.json()["detail"].startswith("Could not fetch URL"))
+
+    def test_busy_server(self):
+        pool = self.client.app.state.pool
+        pool.in_flight = pool.workers + pool.max_queue_depth
+        self.addCleanup(setattr, pool, "in_flight", 0)
+
+        response = self.client.post("/api/v1/html", json={"html": PAGES["/scouts"]})
+        self.assertEqual(503, response.status_code)
+        self.assertGreaterEqual(int(response.headers["Retry-After"]), 1)
+
+
+class TestConversionConfig(ServerTestCase):
+    pages = None
+
+    def _emmetify(self, html: str, **options):
+        return self.client.post("/api/v1/html", json={"html": html, **options})
+
+    def test_custom_config(self):
+        config = {"html": {"simplify_classes": True, "simplify_relative_links": True}}
+        emmet = self._emmetify(PAGES["/titans"], config=config).json()["emmet"]
+        [(class_name, class_value)] = emmet["maps"]["classes"].items()
+        [(link_name, link)] = emmet["maps"]["links"].items()
+        self.assertEqual(("card", "/eren"), (class_value, link))
+        self.assertEqual(f"html>body>div.{class_name}>a[href={link_name}]{{Eren}}", emmet["result"])
+
+    def test_config_over_compact_config(self):
+        config = {"html": {"simplify_classes": False}}
+        emmet = self._emmetify(PAGES["/titans"], compact=True, config=config).json()["emmet"]
+        # Classes are kept, unlike with the compact config alone
+        self.assertEqual("html>body>div.card>a[href=/eren]{Eren}", emmet["result"])
+        self.assertEqual({}, emmet["maps"]["classes"])
+
+    def test_references_and_source_map(self):
+        config = {"html": {"node_references": "interactive", "source_map": True}}
+        emmet = self._emmetify(PAGES["/titans"], config=config).json()["emmet"]
+        self.assertEqual("html>body>div.card>a#r1[href=/eren]{Eren}", emmet["result"])
+        reference = emmet["references"]["r1"]
+        self.assertEqual("/html/body/div/a", reference["xpath"])
+        self.assertEqual("html > body > div > a", reference["css_path"])
+        source_map = emmet["source_map"]
+        self.assertEqual(
+            ["start", "end", "node_id", "source_line", "source_column"], [*source_map[0]]
+        )
+        self.assertEqual(
+            ["html", "body", "div.card", "a#r1[href=/eren]", "{Eren}"],
+            [emmet["result"][slice(entry["start"], entry["end"])] for entry in source_map],
+        )
+
+    def test_invalid_config(self):
+        for config in [{"html": {"skip_tags": "sometimes"}}, {"indent_size": 100}]:
+            with self.subTest(config=config):
+                response = self._emmetify(PAGES["/titans"], config=config)
+                self.assertEqual(422, response.status_code)
+                self.assertIn("Invalid config", json.dumps(response.json()["detail"]))
+
+    def test_equal_configs_share_emmetifier(self):
+        workers = load_server_module("workers")
+        first = workers.get_config_key(False, {"html": {"skip_tags": True}, "debug": False})
+        second = workers.get_config_key(False, {"debug": False, "html": {"skip_tags": True}})
+        self.assertEqual(first, second)
+        self.assertIs(workers.get_emmetifier(first), workers.get_emmetifier(second))
+        self.assertNotEqual(first, workers.get_config_key(True, {"html": {"skip_tags": True}}))
+
+
+class TestUrlCache(ServerTestCase):
+    def setUp(self):
+        super().setUp()
+        pool = self.client.app.state.pool
+        self.convert = patch.object(pool, "convert", wraps=pool.convert).start()
+        self.addCleanup(patch.stopall)
+
+    def _emmetify(self, path: str, compact: bool = False) -> dict:
+        payload = {"url": f"{self.upstream.url}{path}", "compact": compact}
+        response = self.client.post("/api/v1/url", json=payload)
+        self.assertEqual(200, response.status_code)
+        return response.json()["emmet"]
+
+    def test_not_modified_page_is_not_converted_again(self):
+        first = self._emmetify("/titans")
+        self.assertEqual(first, self._emmetify("/titans"))
+        self.assertEqual(first, self._emmetify("/titans"))
+
+        self.assertEqual(3, self.upstream.requests_count)
+        self.assertEqual(2, self.upstream.not_modified_count)
+        self.assertEqual(1, self.convert.call_count)
+        self.assertEqual(2, self.client.app.state.cache.hits)
+
+    def test_modified_page_is_converted(self):
+        self._emmetify("/scouts")
+        self.upstream.pages["/scouts"] = "<ul><li>Levi</li></ul>"
+        self.assertEqual("ul>li{Levi}", self._emmetify("/scouts")["result"])
+        self.assertEqual("ul>li{Levi}", self._emmetify("/scouts")["result"])
+        self.assertEqual(2, self.convert.call_count)
+
+    def test_options_are_cached_separately(self):
+        self._emmetify("/titans")
+        self._emmetify("/titans", compact=True)
+        self.assertEqual(0, self.upstream.not_modified_count)
+        self.assertEqual(2, self.convert.call_count)
+
+    def test_batch_urls_use_cache(self):
+        self._emmetify("/titans")
+        items = [{"url": f"{self.upstream.url}/titans"}, {"url": f"{self.upstream.url}/scouts"}]
+        response = self.client.post("/api/v1/batch", json={"items": items})
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(1, self.upstream.not_modified_count)
+        self.assertEqual(2, self.convert.call_count)
+
+
+@unittest.skipUnless(HAS_SERVER_DEPENDENCIES, "web server dependencies are not installed")
+class TestFetchCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_module = load_server_module("cache")
+
+    def _page(self, text: str, etag: str = '"v1"'):
+        return self.cache_module.CachedPage({"result": text}, etag=etag)
+
+    def test_expired_pages_are_dropped(self):
+        cache = self.cache_module.FetchCache(ttl=60)
+        cache.put("/titans", "{}", self._page("div"))
+        self.assertEqual({"result": "div"}, cache.get("/titans", "{}").result)
+
+        cache.get("/titans", "{}").stored_at -= 61
+        self.assertIsNone(cache.get("/titans", "{}"))
+        self.assertEqual((0, 0), (len(cache), cache.size))
+
+    def test_least_recently_used_pages_are_evicted(self):
+        page_size = self._page("p").size
+        cache = self.cache_module.FetchCache(max_bytes=2 * page_size)
+        cache.put("/eren", "{}", self._page("a"))
+        cache.put("/mikasa", "{}", self._page("b"))
+        cache.get("/eren", "{}")
+        cache.put("/armin", "{}", self._page("c"))
+
+        self.assertIsNone(cache.get("/mikasa", "{}"))
+        self.assertIsNotNone(cache.get("/eren", "{}"))
+        self.assertIsNotNone(cache.get("/armin", "{}"))
+        self.assertEqual(2 * page_size, cache.size)
+
+    def test_pages_without_validators_are_not_cached(self):
+        cache = self.cache_module.FetchCache()
+        cache.put("/titans", "{}", self._page("div", etag=None))
+        cache.put("/scouts", "{}", self.cache_module.CachedPage({}, last_modified="today"))
+        self.assertIsNone(cache.get("/titans", "{}"))
+        self.assertIsNotNone(cache.get("/scouts", "{}"))
+
+    def test_replaced_page(self):
+        cache = self.cache_module.FetchCache()
+        cache.put("/titans", "{}", self._page("div"))
+        cache.put("/titans", "{}", self._page("section", etag='"v2"'))
+        self.assertEqual('"v2"', cache.get("/titans", "{}").etag)
+        self.assertEqual(self._page("section").size, cache.size)
+
+
+class TestBatchEndpoint(ServerTestCase):
+    def test_results_in_input_order(self):
+        items = [
+            {"url": f"{self.upstream.url}/scouts"},
+            {"html": '<div class="card"><p>Levi</p></div>'},
+            {"url": f"{self.upstream.url}/missing"},
+            {"url": f"{self.upstream.url}/titans"},
+        ]
+        response = self.client.post("/api/v1/batch", json={"items": items})
+        self.assertEqual(200, response.status_code)
+        results = response.json()["results"]
+
+        self.assertEqual(
+            [
+                "html>body>ul>li{Mikasa}+li{Armin}",
+                "div.card>p{Levi}",
+                None,
+                "html>body>div.card>a[href=/eren]{Eren}",
+            ],
+            [result["emmet"]["result"] if "emmet" in result else None for result in results],
+        )
+        self.assertEqual(400, results[2]["error"]["status_code"])
+        self.assertTrue(results[2]["error"]["detail"].startswith("Could not fetch URL"))
+
+    def test_shared_config(self):
+        items = [{"html": PAGES["/titans"]}, {"html": PAGES["/scouts"]}]
+        response = self.client.post("/api/v1/batch", json={"items": items, "compact": True})
+        results = response.json()["results"]
+        self.assertEqual(
+            [
+                self.client.post("/api/v1/html", json={**item, "compact": True}).json()
+                for item in items
+            ],
+            results,
+        )
+
+    def test_invalid_batches(self):
+        too_many = [{"html": "<p>Eren</p>"}] * (self.main.MAX_BATCH_ITEMS + 1)
+        for items in [[], too_many, [{}], [{"html": "<p>Eren</p>", "url": self.upstream.url}]]:
+            with self.subTest(items=items[:2]):
+                response = self.client.post("/api/v1/batch", json={"items": items})
+                self.assertEqual(422, response.status_code)
+
+    def test_busy_server(self):
+        pool = self.client.app.state.pool
+        pool.in_flight = pool.workers + pool.max_queue_depth
+        self.addCleanup(setattr, pool, "in_flight", 0)
+
+        response = self.client.post("/api/v1/batch", json={"items": [{"html": "<p>Eren</p>"}]})
+        self.assertEqual(503, response.status_code)
+        self.assertIn("Retry-After", response.headers)
+
+
+class TestStreamEndpoints(ServerTestCase):
+    def test_html_chunks(self):
+        from emmetify import Emmetifier
+
+        response = self.client.post(
+            "/api/v1/html/stream", json={"html": LONG_PAGE, "max_tokens": 40}
+        )
+        self.assertEqual(200, response.status_code)
+        self.assertEqual("application/x-ndjson", response.headers["content-type"])
+        chunks = [json.loads(line) for line in response.text.splitlines()]
+
+        expected = Emmetifier().emmetify_chunks(LONG_PAGE, max_tokens=40)
+        self.assertGreater(len(expected), 1)
+        self.assertEqual(
+            [(chunk.path, chunk.result, chunk.token_count) for chunk in expected],
+            [(chunk["path"], chunk["result"], chunk["token_count"]) for chunk in chunks],
+        )
+
+    def test_stream_metrics(self):
+        def read_metrics() -> dict[str, float]:
+            return parse_metrics(self.client.get("/metrics").text)
+
+        before = read_metrics()
+        response = self.client.post(
+            "/api/v1/html/stream", json={"html": LONG_PAGE, "max_tokens": 40}
+        )
+        chunks = [json.loads(line) for line in response.text.splitlines()]
+        after = read_metrics()
+
+        for stage in ["parse", "build", "optimize", "convert"]:
+            with self.subTest(stage=stage):
+                name = f'emmetify_stage_duration_seconds_count{{stage="{stage}"}}'
+                self.assertEqual(1, after[name] - before.get(name, 0))
+        self.assertEqual(
+            len(LONG_PAGE),
+            after["emmetify_input_bytes_sum"] - before.get("emmetify_input_bytes_sum", 0),
+        )
+        self.assertEqual(
+            sum(len(chunk["result"]) for chunk in chunks),
+            after["emmetify_output_bytes_sum"] - before.get("emmetify_output_bytes_sum", 0),
+        )
+        # Timings are reported only when the request's config enables them
+        self.assertNotIn("timings", chunks[0])
+
+    def test_chunks_with_references_and_timings(self):
+        links = "".join(f'<a href="/titans/{i}">Titan {i}</a>' for i in range(3))
+        config = {"html": {"node_references": "interactive", "report_timings": True}}
+        response = self.client.post(
+            "/api/v1/html/stream", json={"html": f"<nav>{links}</nav>", "config": config}
+        )
+        chunks = [json.loads(line) for line in response.text.splitlines()]
+
+        references = {name: ref for chunk in chunks for name, ref in chunk["references"].items()}
+        self.assertEqual(["r1", "r2", "r3"], sorted(references))
+        self.assertEqual("/nav/a[2]", references["r2"]["xpath"])
+        for chunk in chunks:
+            for name in chunk["references"]:
+                self.assertIn(f"#{name}[", chunk["result"])
+        self.assertIn("convert", chunks[0]["timings"])
+
+    def test_server_sent_events(self):
+        response = self.client.post(
+            "/api/v1/html/stream",
+            json={"html": PAGES["/scouts"]},
+            headers={"Accept": "text/event-stream"},
+        )
+        self.assertTrue(response.headers["content-type"].startswith("text/event-stream"))
+        events = response.text.split("\n\n")
+        self.assertEqual("", events.pop())
+        self.assertTrue(all(event.startswith("data: ") for event in events))
+        chunk = json.loads(events[0].removeprefix("data: "))
+        self.assertEqual("html>body>ul>li{Mikasa}+li{Armin}", chunk["result"])
+
+    def test_batch_results(self):
+        items = [
+            {"url": f"{self.upstream.url}/scouts"},
+            {"url": f"{self.upstream.url}/missing"},
+            {"html": PAGES["/titans"]},
+        ]
+        response = self.client.post("/api/v1/batch/stream", json={"items": items})
+        self.assertEqual(200, response.status_code)
+        results = {item["index"]: item for item in map(json.loads, response.text.splitlines())}
+
+        self.assertEqual({0, 1, 2}, set(results))
+        self.assertEqual("html>body>ul>li{Mikasa}+li{Armin}", results[0]["emmet"]["result"])
+        self.assertEqual(400, results[1]["error"]["status_code"])
+        self.assertEqual("html>body>div.card>a[href=/eren]{Eren}", results[2]["emmet"]["result"])
+
+    def test_busy_server(self):
+        pool = self.client.app.state.pool
+        pool.in_flight = pool.workers + pool.max_queue_depth
+        self.addCleanup(setattr, pool, "in_flight", 0)
+
+        for path, payload in [
+            ("/api/v1/html/stream", {"html": PAGES["/scouts"]}),
+            ("/api/v1/batch/stream", {"items": [{"html": PAGES["/scouts"]}]}),
+        ]:
+            with self.subTest(path=path):
+                response = self.client.post(path, json=payload)
+                self.assertEqual(503, response.status_code)
+                self.assertIn("Retry-After", response.headers)
+
+
+def parse_metrics(text: str) -> dict[str, float]:
+    """Samples of Prometheus text format by name with labels."""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+class TestMetricsEndpoint(ServerTestCase):
+    def _metrics(self) -> dict[str, float]:
+        response = self.client.get("/metrics")
+        self.assertEqual(200, response.status_code)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain; version=0.0.4"))
+        return parse_metrics(response.text)
+
+    def test_requests_stages_and_sizes(self):
+        before = self._metrics()
+        for _ in range(2):
+            self.client.post("/api/v1/url", json={"url": f"{self.upstream.url}/titans"})
+        self.client.post("/api/v1/html", json={"html": PAGES["/scouts"]})
+        self.client.post("/api/v1/url", json={"url": f"{self.upstream.url}/missing"})
+        after = self._metrics()
+
+        def added(name: str) -> float:
+            return after.get(name, 0) - before.get(name, 0)
+
+        self.assertEqual(2, added('emmetify_requests_total{endpoint="/api/v1/url",status="200"}'))
+        self.assertEqual(1, added('emmetify_requests_total{endpoint="/api/v1/url",status="400"}'))
+        self.assertEqual(1, added('emmetify_requests_total{endpoint="/api/v1/html",status="200"}'))
+        self.assertEqual(
+            3, added('emmetify_request_duration_seconds_count{endpoint="/api/v1/url"}')
+        )
+        self.assertEqual(2, added('emmetify_stage_duration_seconds_count{stage="fetch"}'))
+        # The second fetch of the page was not modified and not converted again
+        for stage in ["parse", "build", "optimize", "convert"]:
+            with self.subTest(stage=stage):
+                self.assertEqual(
+                    2, added(f'emmetify_stage_duration_seconds_count{{stage="{stage}"}}')
+                )
+        self.assertEqual(2, added("emmetify_input_bytes_count"))
+        self.assertEqual(
+            len(PAGES["/titans"]) + len(PAGES["/scouts"]), added("emmetify_input_bytes_sum")
+        )
+        self.assertEqual(1, added('emmetify_cache_lookups_total{result="hit"}'))
+        self.assertEqual(1, added('emmetify_cache_lookups_total{result="miss"}'))
+
+    def test_pool_metrics(self):
+        pool = self.client.app.state.pool
+        pool.in_flight = pool.workers + pool.max_queue_depth
+        self.addCleanup(setattr, pool, "in_flight", 0)
+        before = self._metrics()
+        self.client.post("/api/v1/html", json={"html": PAGES["/scouts"]})
+        after = self._metrics()
+
+        self.assertEqual(pool.workers, after["emmetify_pool_workers"])
+        self.assertEqual(pool.max_queue_depth, after["emmetify_pool_queue_depth"])
+        self.assertEqual(pool.in_flight, after["emmetify_pool_in_flight"])
+        self.assertEqual(
+            1, after["emmetify_pool_rejected_total"] - before["emmetify_pool_rejected_total"]
+        )
+
+
+@unittest.skipUnless(HAS_SERVER_DEPENDENCIES, "web server dependencies are not installed")
+class TestMetricsFormat(unittest.TestCase):
+    def setUp(self):
+        self.metrics_module = load_server_module("metrics")
+
+    def test_counter_and_gauge(self):
+        registry = self.metrics_module.MetricsRegistry()
+        counter = registry.add(self.metrics_module.Counter("hits_total", "Hits", ("path",)))
+        gauge = registry.add(self.metrics_module.Gauge("depth", "Depth"))
+        counter.inc(path="/titans")
+        counter.inc(2, path='/"eren"')
+        gauge.set(3)
+        self.assertEqual(
+            "# HELP hits_total Hits\n"
+            "# TYPE hits_total counter\n"
+            'hits_total{path="/\\"eren\\""} 2\n'
+            'hits_total{path="/titans"} 1\n'
+            "# HELP depth Depth\n"
+            "# TYPE depth gauge\n"
+            "depth 3\n",
+            registry.render(),
+        )
+
+    def test_histogram(self):
+        histogram = self.metrics_module.Histogram("size", "Size", buckets=(1, 10))
+        for value in [0.5, 1, 5, 20]:
+            histogram.observe(value)
+        self.assertEqual(
+            [
+                "# HELP size Size",
+                "# TYPE size histogram",
+                'size_bucket{le="1"} 2',
+                'size_bucket{le="10"} 3',
+                'size_bucket{le="+Inf"} 4',
+                "size_sum 26.5",
+                "size_count 4",
+            ],
+            list(histogram.render()),
+        )
+        self.assertEqual(4, histogram.count())
+
+
+class TestGzipBodies(ServerTestCase):
+    pages = None
+
+    def _post_gzip(self, path: str, body: bytes, encoding: str = "gzip"):
+        headers = {"Content-Encoding": encoding, "Content-Type": "application/json"}
+        return self.client.post(path, content=body, headers=headers)
+
+    def test_gzip_request_body(self):
+        plain = self.client.post("/api/v1/html", json={"html": LONG_PAGE})
+        for encoding in ["gzip", "x-gzip", "GZIP, identity"]:
+            with self.subTest(encoding=encoding):
+                body = gzip.compress(json.dumps({"html": LONG_PAGE}).encode())
+                response = self._post_gzip("/api/v1/html", body, encoding)
+                self.assertEqual(200, response.status_code)
+                self.assertEqual(plain.json(), response.json())
+
+    def test_gzip_requests_in_metrics(self):
+        name = 'emmetify_requests_total{endpoint="/api/v1/html",status="200"}'
+        before = parse_metrics(self.client.get("/metrics").text)
+        body = gzip.compress(json.dumps({"html": LONG_PAGE}).encode())
+        self._post_gzip("/api/v1/html", body)
+        after = parse_metrics(self.client.get("/metrics").text)
+        self.assertEqual(1, after[name] - before.get(name, 0))
+
+    def test_invalid_request_bodies(self):
+        body = gzip.compress(json.dumps({"html": LONG_PAGE}).encode())
+        for name, invalid_body in [
+            ("not gzip", json.dumps({"html": LONG_PAGE}).encode()),
+            ("truncated", body[: len(body) // 2]),
+            ("trailing data", body + b"{}"),
+        ]:
+            with self.subTest(name):
+                response = self._post_gzip("/api/v1/html", invalid_body)
+                self.assertEqual(400, response.status_code)
+                self.assertEqual("Invalid gzip request body", response.json()["detail"])
+
+    def test_unsupported_encodings(self):
+        for encoding in ["br", "gzip, gzip"]:
+            with self.subTest(encoding=encoding):
+                response = self._post_gzip("/api/v1/html", b"{}", encoding)
+                self.assertEqual(415, response.status_code)
+                self.assertEqual("gzip", response.headers["accept-encoding"])
+
+    def test_compressed_responses(self):
+        response = self.client.post(
+            "/api/v1/html", json={"html": LONG_PAGE}, headers={"Accept-Encoding": "gzip"}
+        )
+        self.assertEqual("gzip", response.headers["content-encoding"])
+        self.assertIn("Accept-Encoding", response.headers["vary"])
+        self.assertIn("html>body>ul", response.json()["emmet"]["result"])
+
+        for payload in [{"html": LONG_PAGE}, {"html": PAGES["/scouts"]}]:
+            with self.subTest(accept_encoding="identity", size=len(payload["html"])):
+                response = self.client.post(
+                    "/api/v1/html", json=payload, headers={"Accept-Encoding": "identity"}
+                )
+                self.assertNotIn("content-encoding", response.headers)
+        # Small responses aren't worth compressing
+        response = self.client.post(
+            "/api/v1/html", json={"html": PAGES["/scouts"]}, headers={"Accept-Encoding": "gzip"}
+        )
+        self.assertNotIn("content-encoding", response.headers)
+
+    def test_compressed_stream(self):
+        with self.client.stream(
+            "POST",
+            "/api/v1/html/stream",
+            json={"html": LONG_PAGE, "max_tokens": 60},
+            headers={"Accept-Encoding": "gzip"},
+        ) as response:
+            self.assertEqual("gzip", response.headers["content-encoding"])
+            chunks = [json.loads(line) for line in response.iter_lines() if line]
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all("result" in chunk for chunk in chunks))
+
+
+@unittest.skipUnless(HAS_SERVER_DEPENDENCIES, "web server dependencies are not installed")
+class TestGzipBodyReader(unittest.TestCase):
+    def setUp(self):
+        self.compression = load_server_module("compression")
+
+    def _read(self, body: bytes, message_size: int, max_body_bytes: int) -> list[bytes]:
+        messages = [
+            {
+                "type": "http.request",
+                "body": body[slice(start, start + message_size)],
+                "more_body": start + message_size < len(body),
+            }
+            for start in range(0, len(body), message_size)
+        ]
+
+        async def receive() -> dict:
+            return messages.pop(0)
+
+        async def read_all() -> list[bytes]:
+            reader = self.compression.GzipBodyReader(receive, max_body_bytes)
+            bodies = []
+            more_body = True
+            while more_body:
+                message = await reader()
+                bodies.append(message["body"])
+                more_body = message["more_body"]
+            return bodies
+
+        return asyncio.run(read_all())
+
+    def test_decompressed_as_received(self):
+        html = LONG_PAGE.encode() * 100
+        bodies = self._read(gzip.compress(html), 256, len(html))
+        self.assertEqual(html, b"".join(bodies))
+        self.assertGreater(len(bodies), 1)
+        self.assertLess(max(map(len, bodies)), len(html))
+
+    def test_body_size_limit(self):
+        from fastapi import HTTPException
+
+        # Compresses to a few kilobytes
+        body = gzip.compress(b"a" * 10_000_000)
+        with self.assertRaises(HTTPException) as raised:
+            self._read(body, len(body), 1_000_000)
+        self.assertEqual(413, raised.exception.status_code)
+
+
+@unittest.skipUnless(HAS_SERVER_DEPENDENCIES, "web server dependencies are not installed")
+class TestPageFetcher(unittest.TestCase):
+    def test_per_host_connection_limit(self):
+        fetcher_module = load_server_module("fetcher")
+
+        async def fetch_all(url: str) -> list[str]:
+            async with fetcher_module.PageFetcher(max_connections_per_host=2) as fetcher:
+                return await asyncio.gather(*(fetcher.fetch(url) for _ in range(6)))
+
+        with UpstreamServer(PAGES, delay=0.05) as upstream:
+            pages = asyncio.run(fetch_all(f"{upstream.url}/scouts"))
+        self.assertEqual([PAGES["/scouts"]] * 6, pages)
+        self.assertEqual(2, upstream.max_concurrency)
+
+    def test_conditional_fetch(self):
+        fetcher_module = load_server_module("fetcher")
+
+        async def fetch_twice(url: str, **validators) -> tuple:
+            async with fetcher_module.PageFetcher() as fetcher:
+                page = await fetcher.fetch_page(url)
+                kwargs = {name: getattr(page, name) for name in validators}
+                return page, await fetcher.fetch_page(url, **kwargs)
+
+        with UpstreamServer(PAGES) as upstream:
+            for validator in ("etag", "last_modified"):
+                with self.subTest(validator=validator):
+                    page, revalidated = asyncio.run(
+                        fetch_twice(f"{upstream.url}/titans", **{validator: True})
+                    )
+                    self.assertEqual(PAGES["/titans"], page.html)
+                    self.assertIsNone(revalidated.html)
+                    self.assertEqual(getattr(page, validator), getattr(revalidated, validator))
+
+    def test_timeout(self):
+        fetcher_module = load_server_module("fetcher")
+
+        async def fetch(url: str) -> str:
+            async with fetcher_module.PageFetcher(timeout=0.05) as fetcher:
+                return await fetcher.fetch(url)
+
+        with UpstreamServer(PAGES, delay=0.5) as upstream:
+            with self.assertRaises(fetcher_module.FetchError):
+                asyncio.run(fetch(f"{upstream.url}/titans"))
+
+    def _fetch(self, pages: dict[str, str], upstream_options: dict, **fetcher_options) -> str:
+        fetcher_module = load_server_module("fetcher")
+
+        async def fetch(url: str) -> str:
+            async with fetcher_module.PageFetcher(**fetcher_options) as fetcher:
+                return await fetcher.fetch(url)
+
+        with UpstreamServer(pages, **upstream_options) as upstream:
+            return asyncio.run(fetch(f"{upstream.url}/titans"))
+
+    def test_slowly_trickled_page(self):
+        FetchError = load_server_module("fetcher").FetchError
+        # Every chunk comes in time, the whole page doesn't
+        trickle = {"chunk_size": 8, "chunk_delay": 0.05}
+        with self.assertRaisesRegex(FetchError, "not downloaded in 0.2s"):
+            self._fetch(PAGES, trickle, timeout=0.2)
+
+    def test_page_size_limit(self):
+        FetchError = load_server_module("fetcher").FetchError
+        size = len(PAGES["/titans"])
+        for upstream_options in [{}, {"chunk_size": 16}]:
+            with self.subTest(upstream_options=upstream_options):
+                self.assertEqual(
+                    PAGES["/titans"], self._fetch(PAGES, upstream_options, max_page_bytes=size)
+                )
+                with self.assertRaisesRegex(FetchError, f"larger than {size - 1} bytes"):
+                    self._fetch(PAGES, upstream_options, max_page_bytes=size - 1)
+
+    def test_content_types(self):
+        FetchError = load_server_module("fetcher").FetchError
+        for content_type in ["application/xhtml+xml", "TEXT/HTML"]:
+            with self.subTest(content_type=content_type):
+                self.assertEqual(
+                    PAGES["/titans"], self._fetch(PAGES, {"content_type": content_type})
+                )
+        for content_type in ["application/pdf", "image/png", "application/json"]:
+            with self.subTest(content_type=content_type):
+                with self.assertRaisesRegex(FetchError, "Unsupported content type"):
+                    self._fetch(PAGES, {"content_type": content_type})
+
+    def test_incremental_decoding(self):
+        pages = {"/titans": "<p>Ymir Fritz, Éldia, Łódź</p>"}
+        for charset in ["utf-8", "iso-8859-2"]:
+            with self.subTest(charset=charset):
+                upstream_options = {
+                    "content_type": f"text/html; charset={charset}",
+                    # Multibyte characters are split between chunks
+                    "chunk_size": 1,
+                }
+                self.assertEqual(pages["/titans"], self._fetch(pages, upstream_options))
+
+
+@unittest.skipUnless(HAS_SERVER_DEPENDENCIES, "web server dependencies are not installed")
+class TestConversionPool(unittest.TestCase):
+    def setUp(self):
+        self.workers_module = load_server_module("workers")
+        self.config_key = self.workers_module.get_config_key(compact=False)
+
+    def test_convert_in_workers(self):
+        async def convert_all(pool) -> list[dict]:
+            return await asyncio.gather(
+                *(pool.convert(html, self.config_key) for html in PAGES.values())
+            )
+
+        with self.workers_module.ConversionPool(workers=2) as pool:
+            pool.start()
+            results = asyncio.run(convert_all(pool))
+            self.assertEqual(0, pool.in_flight)
+        self.assertEqual(
+            [self.workers_module.convert_html(html, self.config_key) for html in PAGES.values()],
+            results,
+        )
+
+    def test_admission_by_queue_depth(self):
+        async def convert_all(pool) -> list:
+            conversions = (pool.convert(PAGES["/titans"], self.config_key) for _ in range(4))
+            return await asyncio.gather(*conversions, return_exceptions=True)
+
+        with self.workers_module.ConversionPool(workers=1, max_queue_depth=1) as pool:
+            results = asyncio.run(convert_all(pool))
+        # One conversion runs, one waits in the queue, the rest are turned away
+        self.assertEqual(2, sum(isinstance(result, dict) for result in results))
+        rejected = [r for r in results if isinstance(r, self.workers_module.PoolSaturatedError)]
+        self.assertEqual(2, len(rejected))
+        self.assertTrue(all(error.retry_after >= 1 for error in rejected))
+
+    def test_stream_stopped_by_consumer(self):
+        async def first_chunk_then_convert(pool) -> tuple[dict, dict]:
+            chunks = pool.stream(LONG_PAGE, self.config_key, 10)
+            chunk = await chunks.__anext__()
+            await chunks.aclose()
+            self.assertEqual(0, pool.in_flight)
+            # The only worker is free again
+            return chunk, await asyncio.wait_for(pool.convert(PAGES["/scouts"], self.config_key), 5)
+
+        with self.workers_module.ConversionPool(workers=1) as pool:
+            chunk, result = asyncio.run(first_chunk_then_convert(pool))
+        self.assertEqual("html>body>ul", chunk["path"])
+        self.assertEqual("html>body>ul>li{Mikasa}+li{Armin}", result["result"])
+
+    def test_stream_to_slow_consumer_releases_worker(self):
+        async def read_slowly(pool) -> tuple[dict, list[dict]]:
+            chunks = pool.stream(LONG_PAGE, self.config_key, 10)
+            first_chunk = await chunks.__anext__()
+            # The only worker gives up on the full buffer and converts again
+            await asyncio.sleep(0.5)
+            result = await asyncio.wait_for(pool.convert(PAGES["/scouts"], self.config_key), 5)
+            buffered_chunks = []
+            with self.assertRaises(self.workers_module.StreamStalledError):
+                async for chunk in chunks:
+                    buffered_chunks.append(chunk)
+            self.assertEqual(0, pool.in_flight)
+            return result, [first_chunk, *buffered_chunks]
+
+        with self.workers_module.ConversionPool(
+            workers=1, stream_buffer_chunks=1, stream_send_timeout=0.2
+        ) as pool:
+            result, chunks = asyncio.run(read_slowly(pool))
+        self.assertEqual("html>body>ul>li{Mikasa}+li{Armin}", result["result"])
+        self.assertEqual(2, len(chunks))
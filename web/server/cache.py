@@ -0,0 +1,74 @@
+import json
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
+
+# Seconds a converted page is kept, it is revalidated with its upstream on every use
+CACHE_TTL = float(os.environ.get("EMMETIFY_CACHE_TTL", "3600"))
+# Total size of cached results, least recently used pages are evicted beyond it
+CACHE_MAX_BYTES = int(os.environ.get("EMMETIFY_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+@dataclass
+class CachedPage:
+    # Converted page, as returned by the endpoints
+    result: dict
+    # Validators of the fetched page, sent back in conditional requests
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    stored_at: float = field(default_factory=time.monotonic)
+    size: int = 0
+
+    def __post_init__(self):
+        if not self.size:
+            self.size = len(json.dumps(self.result))
+
+
+class FetchCache:
+    """Converted pages by url and config key, bounded by age and total size."""
+
+    def __init__(self, ttl: float = CACHE_TTL, max_bytes: int = CACHE_MAX_BYTES):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.size = 0
+        # Pages served from the cache, after their upstream answered 304 Not Modified
+        self.hits = 0
+        self.misses = 0
+        self._pages: OrderedDict[tuple[str, str], CachedPage] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    def get(self, url: str, config_key: str) -> Optional[CachedPage]:
+        """Cached page to revalidate, None if missing or expired."""
+        key = (url, config_key)
+        page = self._pages.get(key)
+        if page is None:
+            return None
+        if time.monotonic() - page.stored_at > self.ttl:
+            self._remove(key)
+            return None
+        self._pages.move_to_end(key)
+        return page
+
+    def put(self, url: str, config_key: str, page: CachedPage) -> None:
+        """Store page, if it has validators and fits in the cache."""
+        key = (url, config_key)
+        if key in self._pages:
+            self._remove(key)
+        if page.etag is None and page.last_modified is None or page.size > self.max_bytes:
+            return
+
+        self._pages[key] = page
+        self.size += page.size
+        while self.size > self.max_bytes:
+            self._remove(next(iter(self._pages)))
+
+    def _remove(self, key: tuple[str, str]) -> None:
+        self.size -= self._pages.pop(key).size
+
+    def clear(self) -> None:
+        self._pages.clear()
+        self.size = 0
@@ -0,0 +1,93 @@
+import os
+import zlib
+
+from fastapi import HTTPException
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Size of a decompressed request body, larger bodies are refused with 413
+MAX_BODY_BYTES = int(os.environ.get("EMMETIFY_MAX_BODY_BYTES", str(64 * 1024 * 1024)))
+# Responses are compressed from this size on, for clients accepting gzip
+COMPRESS_MIN_SIZE = int(os.environ.get("EMMETIFY_COMPRESS_MIN_SIZE", "1024"))
+# Level 6 compresses html and json almost as well as 9, in a fraction of the time
+COMPRESS_LEVEL = int(os.environ.get("EMMETIFY_COMPRESS_LEVEL", "6"))
+
+GZIP_ENCODINGS = ("gzip", "x-gzip")
+
+
+class GzipBodyReader:
+    """Receive of a request with gzip body, decompressing its messages as they arrive."""
+
+    def __init__(self, receive: Receive, max_body_bytes: int = MAX_BODY_BYTES):
+        self.receive = receive
+        self.remaining = max_body_bytes
+        self.decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    async def __call__(self) -> Message:
+        message = await self.receive()
+        if message["type"] != "http.request":
+            return message
+
+        try:
+            # At most one byte over the limit, so a small compressed body can't fill the memory
+            body = self.decompressor.decompress(message.get("body", b""), self.remaining + 1)
+        except zlib.error:
+            raise HTTPException(status_code=400, detail="Invalid gzip request body")
+        if len(body) > self.remaining:
+            raise HTTPException(status_code=413, detail="Request body is too large")
+        self.remaining -= len(body)
+
+        more_body = message.get("more_body", False)
+        if not more_body and (not self.decompressor.eof or self.decompressor.unused_data):
+            raise HTTPException(status_code=400, detail="Invalid gzip request body")
+        return {"type": "http.request", "body": body, "more_body": more_body}
+
+
+class GzipRequestMiddleware:
+    """
+    Accepts request bodies with Content-Encoding: gzip, the app receives them decompressed.
+    Errors are raised when the body is read, so they are answered as any HTTPException.
+    """
+
+    def __init__(self, app: ASGIApp, max_body_bytes: int = MAX_BODY_BYTES):
+        self.app = app
+        self.max_body_bytes = max_body_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encodings = [
+            encoding.strip().lower()
+            for name, value in scope["headers"]
+            if name == b"content-encoding"
+            for encoding in value.decode("latin-1").split(",")
+            if encoding.strip().lower() not in ("", "identity")
+        ]
+        if not encodings:
+            await self.app(scope, receive, send)
+            return
+
+        if len(encodings) == 1 and encodings[0] in GZIP_ENCODINGS:
+            receive = GzipBodyReader(receive, self.max_body_bytes)
+        else:
+            receive = _unsupported_encoding(", ".join(encodings))
+        # Length and encoding of the body the app receives are not the sent ones. The scope
+        # is changed in place, so outer middlewares see what the app sets in it, e.g. the route
+        scope["headers"] = [
+            (name, value)
+            for name, value in scope["headers"]
+            if name not in (b"content-encoding", b"content-length")
+        ]
+        await self.app(scope, receive, send)
+
+
+def _unsupported_encoding(encoding: str) -> Receive:
+    async def receive() -> Message:
+        raise HTTPException(
+            status_code=415,
+            detail=f"Unsupported Content-Encoding: {encoding}",
+            headers={"Accept-Encoding": "gzip"},
+        )
+
+    return receive
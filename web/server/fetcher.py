@@ -0,0 +1,145 @@
+import asyncio
+import codecs
+import os
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+# Whole download timeout, so slowly trickling pages can't hold a connection forever,
+# and a shorter one for establishing the connection
+FETCH_TIMEOUT = float(os.environ.get("EMMETIFY_FETCH_TIMEOUT", "15"))
+CONNECT_TIMEOUT = float(os.environ.get("EMMETIFY_CONNECT_TIMEOUT", "5"))
+# Connections are pooled and kept alive between requests of all clients
+MAX_CONNECTIONS = int(os.environ.get("EMMETIFY_MAX_CONNECTIONS", "100"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("EMMETIFY_MAX_KEEPALIVE_CONNECTIONS", "20"))
+# Concurrent requests to a single host, so one slow site can't take the whole pool
+MAX_CONNECTIONS_PER_HOST = int(os.environ.get("EMMETIFY_MAX_CONNECTIONS_PER_HOST", "10"))
+# Pages over this size are not downloaded further
+MAX_PAGE_BYTES = int(os.environ.get("EMMETIFY_MAX_PAGE_BYTES", str(16 * 1024 * 1024)))
+
+# Content types of fetched pages, the download stops on any other
+HTML_CONTENT_TYPES = {"text/html", "application/xhtml+xml"}
+
+USER_AGENT = "Mozilla/5.0 (compatible; Emmetify/1.0)"
+
+
+class FetchError(Exception):
+    """Raised when a page can not be fetched"""
+
+
+@dataclass
+class FetchedPage:
+    # None when the page was not modified since the validators of the request
+    html: Optional[str]
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+def _get_decoder(encoding: Optional[str]) -> codecs.IncrementalDecoder:
+    try:
+        return codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+    except LookupError:
+        return codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+
+class PageFetcher:
+    """Fetches pages over a shared pool of keep-alive connections, with per-host limits."""
+
+    def __init__(
+        self,
+        timeout: float = FETCH_TIMEOUT,
+        connect_timeout: float = CONNECT_TIMEOUT,
+        max_connections: int = MAX_CONNECTIONS,
+        max_keepalive_connections: int = MAX_KEEPALIVE_CONNECTIONS,
+        max_connections_per_host: int = MAX_CONNECTIONS_PER_HOST,
+        max_page_bytes: int = MAX_PAGE_BYTES,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+            ),
+            headers={"User-Agent": USER_AGENT},
+            follow_redirects=True,
+            transport=transport,
+        )
+        self.timeout = timeout
+        self.max_connections_per_host = max_connections_per_host
+        self.max_page_bytes = max_page_bytes
+        self._host_slots: dict[str, asyncio.Semaphore] = {}
+
+    def _host_slot(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc.lower()
+        slot = self._host_slots.get(host)
+        if slot is None:
+            slot = self._host_slots[host] = asyncio.Semaphore(self.max_connections_per_host)
+        return slot
+
+    async def fetch(self, url: str) -> str:
+        """Fetch page html, raising FetchError for invalid urls, network and http errors."""
+        return (await self.fetch_page(url)).html
+
+    async def fetch_page(
+        self, url: str, etag: Optional[str] = None, last_modified: Optional[str] = None
+    ) -> FetchedPage:
+        """
+        Fetch page with its validators, conditionally if validators of a previous fetch
+        are given. Raises FetchError for invalid urls, network and http errors, pages that
+        are not html, over the size limit or not downloaded in time.
+        """
+        headers = {}
+        if etag is not None:
+            headers["If-None-Match"] = etag
+        if last_modified is not None:
+            headers["If-Modified-Since"] = last_modified
+
+        async with self._host_slot(url):
+            try:
+                return await asyncio.wait_for(self._download(url, headers), self.timeout)
+            except asyncio.TimeoutError as e:
+                raise FetchError(f"Page not downloaded in {self.timeout:g}s") from e
+            except (httpx.HTTPError, httpx.InvalidURL) as e:
+                raise FetchError(str(e) or type(e).__name__) from e
+
+    async def _download(self, url: str, headers: dict[str, str]) -> FetchedPage:
+        """Stream the page, checking its headers before and its size while downloading."""
+        async with self.client.stream("GET", url, headers=headers) as response:
+            etag = response.headers.get("ETag", headers.get("If-None-Match"))
+            last_modified = response.headers.get("Last-Modified", headers.get("If-Modified-Since"))
+            if response.status_code == 304 and headers:
+                # Read the empty body, so the connection goes back to the pool
+                await response.aread()
+                return FetchedPage(None, etag, last_modified)
+            response.raise_for_status()
+
+            content_type = response.headers.get("Content-Type", "text/html")
+            if content_type.split(";")[0].strip().lower() not in HTML_CONTENT_TYPES:
+                raise FetchError(f"Unsupported content type {content_type}")
+            content_length = response.headers.get("Content-Length", "")
+            if content_length.isdigit() and int(content_length) > self.max_page_bytes:
+                raise FetchError(f"Page is larger than {self.max_page_bytes} bytes")
+
+            # Decoded as bytes arrive, so only the text of the page is held in memory
+            decoder = _get_decoder(response.encoding)
+            texts = []
+            size = 0
+            async for data in response.aiter_bytes():
+                size += len(data)
+                if size > self.max_page_bytes:
+                    raise FetchError(f"Page is larger than {self.max_page_bytes} bytes")
+                texts.append(decoder.decode(data))
+            texts.append(decoder.decode(b"", final=True))
+        return FetchedPage("".join(texts), etag, last_modified)
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+    async def __aenter__(self) -> "PageFetcher":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
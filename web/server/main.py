@@ -1,13 +1,51 @@
+import asyncio
+import json
+import os
+import time
+from contextlib import asynccontextmanager, nullcontext
+from typing import Any, AsyncIterator, Optional
+
 import emmet
-import requests
 from bs4 import BeautifulSoup
-from fastapi import FastAPI, HTTPException
+from cache import CachedPage, FetchCache
+from compression import COMPRESS_LEVEL, COMPRESS_MIN_SIZE, GzipRequestMiddleware
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fetcher import FetchError, PageFetcher
+from metrics import ServerMetrics
+from pydantic import BaseModel, Field, PrivateAttr, ValidationError, model_validator
+from workers import (
+    ConversionPool,
+    PoolSaturatedError,
+    StreamStalledError,
+    get_config_key,
+    validate_config,
+)
+
+# Documents accepted in a single batch request
+MAX_BATCH_ITEMS = int(os.environ.get("EMMETIFY_MAX_BATCH_ITEMS", "100"))
+# Default token budget of chunks of streamed conversions
+STREAM_CHUNK_TOKENS = int(os.environ.get("EMMETIFY_STREAM_CHUNK_TOKENS", "2000"))
+
+metrics = ServerMetrics()
 
-from emmetify import Emmetifier, emmetify_compact_html
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled client for the whole server, so connections are reused between requests
+    async with PageFetcher() as fetcher:
+        app.state.fetcher = fetcher
+        app.state.cache = FetchCache()
+        # Conversion is CPU-bound, it runs in worker processes to use all cores
+        with ConversionPool(on_converted=metrics.observe_conversion) as pool:
+            pool.start()
+            app.state.pool = pool
+            yield
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -17,51 +55,242 @@ app.add_middleware(
     allow_methods=["*"],  # Allows all methods
     allow_headers=["*"],  # Allows all headers
 )
+# Html payloads and Emmet results are large and compress well, both directions are gzipped
+app.add_middleware(GZipMiddleware, minimum_size=COMPRESS_MIN_SIZE, compresslevel=COMPRESS_LEVEL)
+app.add_middleware(GzipRequestMiddleware)
 
-emmetifier = Emmetifier()
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    # Path of the matched route, so urls with parameters don't make new series
+    route = request.scope.get("route")
+    endpoint = route.path if route is not None else "unmatched"
+    metrics.requests.inc(endpoint=endpoint, status=str(response.status_code))
+    metrics.request_seconds.observe(time.perf_counter() - start, endpoint=endpoint)
+    return response
 
-class UrlPayload(BaseModel):
-    url: str
+
+class ConversionOptions(BaseModel):
     compact: bool = False
+    # Emmetifier config over the compact or default one, e.g. {"html": {"skip_tags": true}}
+    config: Optional[dict[str, Any]] = None
+    _config_key: str = PrivateAttr("")
 
+    @model_validator(mode="after")
+    def check_config(self) -> "ConversionOptions":
+        self._config_key = get_config_key(self.compact, self.config)
+        try:
+            # Cached by config key, equal configs are validated once
+            validate_config(self._config_key)
+        except ValidationError as e:
+            errors = "; ".join(
+                f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors()
+            )
+            raise ValueError(f"Invalid config: {errors}")
+        return self
 
-class HtmlPayload(BaseModel):
+    @property
+    def config_key(self) -> str:
+        return self._config_key
+
+
+class UrlPayload(ConversionOptions):
+    url: str
+
+
+class HtmlPayload(ConversionOptions):
     html: str
-    compact: bool = False
+
+
+class HtmlStreamPayload(HtmlPayload):
+    max_tokens: int = Field(STREAM_CHUNK_TOKENS, gt=0)
 
 
 class EmmetPayload(BaseModel):
     emmet: str
 
 
-@app.post("/api/v1/url")
-def emmetify_url(payload: UrlPayload):
+class BatchItem(BaseModel):
+    html: Optional[str] = None
+    url: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_source(self) -> "BatchItem":
+        if (self.html is None) == (self.url is None):
+            raise ValueError("Exactly one of html or url is required")
+        return self
+
+
+class BatchPayload(ConversionOptions):
+    # Options are shared by all items of the batch
+    items: list[BatchItem] = Field(min_length=1, max_length=MAX_BATCH_ITEMS)
+
+
+def busy_error(retry_after: int) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Server is busy, try again later",
+        headers={"Retry-After": str(retry_after)},
+    )
+
+
+def error_to_json(error: HTTPException) -> dict:
+    return {"error": {"status_code": error.status_code, "detail": error.detail}}
+
+
+def admit(request: Request) -> ConversionPool:
+    """Conversion pool of the app, raising 503 if its queue is already full."""
+    pool: ConversionPool = request.app.state.pool
     try:
-        response = requests.get(payload.url)
-        response.raise_for_status()  # Raise an exception for bad status codes
-        html = response.text
-        if payload.compact:
-            emmet_string = emmetify_compact_html(html)
-        else:
-            emmet_string = emmetifier.emmetify(html)
-        return {"emmet": emmet_string}
-    except requests.exceptions.RequestException as e:
-        raise HTTPException(status_code=400, detail=f"Could not fetch URL: {e}")
+        pool.check_admission()
+    except PoolSaturatedError as e:
+        raise busy_error(e.retry_after)
+    return pool
+
+
+def stream_response(request: Request, items: AsyncIterator[dict]) -> StreamingResponse:
+    """
+    Stream items as NDJSON, or as server-sent events for clients accepting them.
+    Errors after the response started are sent as the last item.
+    """
+    event_stream = "text/event-stream" in request.headers.get("accept", "")
+    line_format = "data: {}\n\n" if event_stream else "{}\n"
+
+    async def lines() -> AsyncIterator[str]:
+        try:
+            async for item in items:
+                yield line_format.format(json.dumps(item))
+        except HTTPException as e:
+            yield line_format.format(json.dumps(error_to_json(e)))
+
+    media_type = "text/event-stream" if event_stream else "application/x-ndjson"
+    return StreamingResponse(lines(), media_type=media_type)
+
+
+async def convert_html(request: Request, html: str, config_key: str) -> dict:
+    pool: ConversionPool = request.app.state.pool
+    try:
+        return await pool.convert(html, config_key)
+    except PoolSaturatedError as e:
+        raise busy_error(e.retry_after)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/api/v1/html")
-def emmetify_html(payload: HtmlPayload):
+async def convert_url(
+    request: Request, url: str, config_key: str, slots: Optional[asyncio.Semaphore] = None
+) -> dict:
+    """
+    Fetch and convert page, revalidating the cached result of a previous fetch.
+    The cached result is returned without converting again if the page wasn't modified.
+    """
+    fetcher: PageFetcher = request.app.state.fetcher
+    cache: FetchCache = request.app.state.cache
+    cached = cache.get(url, config_key)
+    start = time.perf_counter()
     try:
-        if payload.compact:
-            emmet_string = emmetify_compact_html(payload.html)
+        if cached is None:
+            page = await fetcher.fetch_page(url)
         else:
-            emmet_string = emmetifier.emmetify(payload.html)
-        return {"emmet": emmet_string}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+            page = await fetcher.fetch_page(url, cached.etag, cached.last_modified)
+    except FetchError as e:
+        raise HTTPException(status_code=400, detail=f"Could not fetch URL: {e}")
+    metrics.stage_seconds.observe(time.perf_counter() - start, stage="fetch")
+
+    if page.html is None:
+        cache.hits += 1
+        return cached.result
+
+    cache.misses += 1
+    async with slots or nullcontext():
+        result = await convert_html(request, page.html, config_key)
+    cache.put(url, config_key, CachedPage(result, page.etag, page.last_modified))
+    return result
+
+
+@app.post("/api/v1/url")
+async def emmetify_url(payload: UrlPayload, request: Request):
+    emmet_result = await convert_url(request, payload.url, payload.config_key)
+    return {"emmet": emmet_result}
+
+
+@app.post("/api/v1/html")
+async def emmetify_html(payload: HtmlPayload, request: Request):
+    emmet_result = await convert_html(request, payload.html, payload.config_key)
+    return {"emmet": emmet_result}
+
+
+@app.post("/api/v1/html/stream")
+async def emmetify_html_stream(payload: HtmlStreamPayload, request: Request):
+    pool = admit(request)
+
+    async def chunks() -> AsyncIterator[dict]:
+        try:
+            async for chunk in pool.stream(payload.html, payload.config_key, payload.max_tokens):
+                yield chunk
+        except PoolSaturatedError as e:
+            raise busy_error(e.retry_after)
+        except StreamStalledError as e:
+            raise HTTPException(status_code=408, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    # Chunks are sent as soon as they are converted, in document order
+    return stream_response(request, chunks())
+
+
+async def emmetify_batch_item(
+    request: Request, item: BatchItem, config_key: str, slots: asyncio.Semaphore
+) -> dict:
+    """Result of a batch item, or its error, so failed items don't fail the batch."""
+    try:
+        if item.url is not None:
+            return {"emmet": await convert_url(request, item.url, config_key, slots)}
+        async with slots:
+            return {"emmet": await convert_html(request, item.html, config_key)}
+    except HTTPException as e:
+        return error_to_json(e)
+
+
+@app.post("/api/v1/batch")
+async def emmetify_batch(payload: BatchPayload, request: Request):
+    pool = admit(request)
+    # Items are converted a few at a time, so one batch doesn't fill the whole queue
+    slots = asyncio.Semaphore(pool.workers)
+    results = await asyncio.gather(
+        *(emmetify_batch_item(request, item, payload.config_key, slots) for item in payload.items)
+    )
+    # Results are in the order of items
+    return {"results": results}
+
+
+@app.post("/api/v1/batch/stream")
+async def emmetify_batch_stream(payload: BatchPayload, request: Request):
+    pool = admit(request)
+    slots = asyncio.Semaphore(pool.workers)
+
+    async def indexed_result(index: int, item: BatchItem) -> dict:
+        return {
+            "index": index,
+            **await emmetify_batch_item(request, item, payload.config_key, slots),
+        }
+
+    async def results() -> AsyncIterator[dict]:
+        tasks = [
+            asyncio.create_task(indexed_result(i, item)) for i, item in enumerate(payload.items)
+        ]
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield await next_result
+        finally:
+            # Client went away, stop fetching and converting the rest
+            for task in tasks:
+                task.cancel()
+
+    # Results are sent as soon as they are ready, with index of their item
+    return stream_response(request, results())
 
 
 @app.post("/api/v1/emmet")
@@ -81,6 +310,12 @@ def htmlify_emmet(payload: EmmetPayload):
         raise HTTPException(status_code=400, detail=f"Invalid Emmet abbreviation: {e}")
 
 
+@app.get("/metrics")
+def read_metrics(request: Request):
+    metrics.collect(request.app.state.cache, request.app.state.pool)
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/")
 def read_root():
     return {"message": "Emmetify API is running"}
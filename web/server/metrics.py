@@ -0,0 +1,190 @@
+from bisect import bisect_left
+from typing import Iterator, TypeVar
+
+from cache import FetchCache
+from workers import ConversionPool, ConversionStats
+
+# Upper bounds of histogram buckets, for seconds and for sizes from 1 KiB to 16 MiB
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BYTES_BUCKETS = tuple(1024 * 4**power for power in range(8))
+
+LabelValues = tuple[str, ...]
+M = TypeVar("M", bound="Metric")
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _format_labels(names: tuple[str, ...], values: LabelValues) -> str:
+    if not names:
+        return ""
+    pairs = (f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + ",".join(pairs) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metric:
+    """Metric with values by label values, rendered in Prometheus text format"""
+
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: dict[LabelValues, float] = {}
+
+    def _key(self, labels: dict[str, str]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def get(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def set(self, value: float, **labels: str) -> None:
+        self._values[self._key(labels)] = value
+
+    def _samples(self) -> Iterator[str]:
+        for values, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labels, values)} {_format_value(value)}"
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.type}"
+        yield from self._samples()
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, help, labels)
+        self.buckets = (*buckets, float("inf"))
+        # Observation counts per bucket (not cumulative), sums and counts by label values
+        self._bucket_counts: dict[LabelValues, list[int]] = {}
+        self._sums: dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        counts = self._bucket_counts.get(key)
+        if counts is None:
+            counts = self._bucket_counts[key] = [0] * len(self.buckets)
+        counts[bisect_left(self.buckets, value)] += 1
+        self._sums[key] = self._sums.get(key, 0.0) + value
+
+    def count(self, **labels: str) -> int:
+        return sum(self._bucket_counts.get(self._key(labels), []))
+
+    def _samples(self) -> Iterator[str]:
+        for values, counts in sorted(self._bucket_counts.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = _format_labels((*self.labels, "le"), (*values, _format_value(bound)))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labels, values)
+            yield f"{self.name}_sum{labels} {_format_value(self._sums[values])}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class MetricsRegistry:
+    """Metrics of the server, rendered together for the /metrics endpoint"""
+
+    def __init__(self):
+        self.metrics: list[Metric] = []
+
+    def add(self, metric: M) -> M:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "".join(f"{line}\n" for metric in self.metrics for line in metric.render())
+
+
+class ServerMetrics(MetricsRegistry):
+    """Request, conversion stage, cache and worker pool metrics of the web server"""
+
+    def __init__(self):
+        super().__init__()
+        self.requests = self.add(
+            Counter("emmetify_requests_total", "HTTP requests", ("endpoint", "status"))
+        )
+        self.request_seconds = self.add(
+            Histogram(
+                "emmetify_request_duration_seconds",
+                "Seconds until response headers, streamed bodies may take longer",
+                ("endpoint",),
+            )
+        )
+        self.stage_seconds = self.add(
+            Histogram(
+                "emmetify_stage_duration_seconds",
+                "Seconds spent in stages: fetch, parse, build, optimize and convert",
+                ("stage",),
+            )
+        )
+        self.input_bytes = self.add(
+            Histogram("emmetify_input_bytes", "Size of converted html", buckets=BYTES_BUCKETS)
+        )
+        self.output_bytes = self.add(
+            Histogram("emmetify_output_bytes", "Size of Emmet results", buckets=BYTES_BUCKETS)
+        )
+        self.cache_lookups = self.add(
+            Counter(
+                "emmetify_cache_lookups_total",
+                "Url conversions by cache result, hit when upstream answered 304 Not Modified",
+                ("result",),
+            )
+        )
+        self.cache_entries = self.add(Gauge("emmetify_cache_entries", "Cached pages"))
+        self.cache_bytes = self.add(Gauge("emmetify_cache_bytes", "Size of cached results"))
+        self.pool_workers = self.add(Gauge("emmetify_pool_workers", "Conversion workers"))
+        self.pool_in_flight = self.add(
+            Gauge("emmetify_pool_in_flight", "Conversions running or waiting for a worker")
+        )
+        self.pool_queue_depth = self.add(
+            Gauge("emmetify_pool_queue_depth", "Conversions waiting for a worker")
+        )
+        self.pool_rejected = self.add(
+            Counter("emmetify_pool_rejected_total", "Conversions turned away with 503")
+        )
+
+    def observe_conversion(self, stats: ConversionStats) -> None:
+        for stage, seconds in stats.timings.items():
+            self.stage_seconds.observe(seconds, stage=stage)
+        self.input_bytes.observe(stats.input_bytes)
+        self.output_bytes.observe(stats.output_bytes)
+
+    def collect(self, cache: FetchCache, pool: ConversionPool) -> None:
+        """Update metrics kept by the cache and the pool, before rendering."""
+        self.cache_lookups.set(cache.hits, result="hit")
+        self.cache_lookups.set(cache.misses, result="miss")
+        self.cache_entries.set(len(cache))
+        self.cache_bytes.set(cache.size)
+        self.pool_workers.set(pool.workers)
+        self.pool_in_flight.set(pool.in_flight)
+        self.pool_queue_depth.set(pool.queue_depth)
+        self.pool_rejected.set(pool.rejected)
@@ -0,0 +1,319 @@
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import queue
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Any, AsyncIterator, Callable, Optional
+
+from emmetify import COMPACT_HTML_CONFIG, Emmetifier
+from emmetify.config import EmmetifierConfig
+from emmetify.converters.html_converter import HtmlConverterResult
+from emmetify.optimizers.html_chunker import HtmlChunk
+
+# Worker processes converting html, one per core by default
+CONVERT_WORKERS = int(os.environ.get("EMMETIFY_CONVERT_WORKERS", str(os.cpu_count() or 1)))
+# Conversions allowed to wait for a free worker, requests beyond it are turned away
+MAX_QUEUE_DEPTH = int(os.environ.get("EMMETIFY_MAX_QUEUE_DEPTH", str(4 * CONVERT_WORKERS)))
+
+# Converted chunks waiting to be sent, a worker streaming to a slow client waits beyond it
+STREAM_BUFFER_CHUNKS = int(os.environ.get("EMMETIFY_STREAM_BUFFER_CHUNKS", "16"))
+# Seconds a worker waits for room in a full buffer, before it gives up the stream
+STREAM_SEND_TIMEOUT = float(os.environ.get("EMMETIFY_STREAM_SEND_TIMEOUT", "10"))
+# Seconds between polls of a stream buffer, growing while it stays empty
+STREAM_POLL_MIN_INTERVAL = 0.005
+STREAM_POLL_MAX_INTERVAL = 0.1
+
+# Prepared Emmetifiers kept by every process, for the most recently used configs
+EMMETIFIER_CACHE_SIZE = int(os.environ.get("EMMETIFY_EMMETIFIER_CACHE_SIZE", "64"))
+
+WARM_UP_HTML = '<html><body><div class="card"><a href="/">Home</a></div></body></html>'
+
+
+def _merge_config(base: dict[str, Any], overrides: dict[str, Any]) -> dict[str, Any]:
+    merged = dict(base)
+    for name, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(name), dict):
+            value = _merge_config(merged[name], value)
+        merged[name] = value
+    return merged
+
+
+def get_config_key(compact: bool, config: Optional[dict[str, Any]] = None) -> str:
+    """
+    Fingerprint of the Emmetifier config of a request, the compact or default config
+    with the given options over it. Equal configs have equal keys.
+    """
+    merged = _merge_config(COMPACT_HTML_CONFIG if compact else {}, config or {})
+    return json.dumps(merged, sort_keys=True, separators=(",", ":"))
+
+
+@lru_cache(maxsize=EMMETIFIER_CACHE_SIZE)
+def validate_config(config_key: str) -> EmmetifierConfig:
+    """Validate config of the key, raising pydantic ValidationError if invalid."""
+    return EmmetifierConfig.model_validate(json.loads(config_key))
+
+
+@lru_cache(maxsize=EMMETIFIER_CACHE_SIZE)
+def get_emmetifier(config_key: str) -> Emmetifier:
+    config = validate_config(config_key).model_copy(deep=True)
+    # Stage timings feed the server metrics
+    config.html.report_timings = True
+    return Emmetifier(config=config)
+
+
+@dataclass
+class ConversionStats:
+    # Seconds of the whole conversion, and of its stages
+    duration: float
+    timings: dict[str, float]
+    input_bytes: int
+    output_bytes: int
+
+
+def result_to_json(result: HtmlConverterResult, report_timings: bool = False) -> dict:
+    """
+    Serialize conversion result, without the node pool it was converted from.
+    Timings are always recorded for metrics, they are included only when reported.
+    """
+    result_json = {
+        "result": result.result,
+        "maps": asdict(result.maps),
+        "token_count": result.token_count,
+        "pruned": [asdict(subtree) for subtree in result.pruned],
+        "tokens": asdict(result.tokens) if result.tokens else None,
+        "costs": [asdict(cost) for cost in result.costs],
+        "references": {name: asdict(ref) for name, ref in result.references.items()},
+        "source_map": (
+            [asdict(entry) for entry in result.source_map.lookup_range(0, len(result.result))]
+            if result.source_map is not None
+            else None
+        ),
+    }
+    if report_timings:
+        result_json["timings"] = result.timings
+    return result_json
+
+
+def chunk_to_json(chunk: HtmlChunk, report_timings: bool = False) -> dict:
+    chunk_json = {
+        "result": chunk.result,
+        "maps": asdict(chunk.maps),
+        "path": chunk.path,
+        "token_count": chunk.token_count,
+        "references": {name: asdict(ref) for name, ref in chunk.references.items()},
+    }
+    if report_timings:
+        chunk_json["timings"] = chunk.timings
+    return chunk_json
+
+
+def warm_up() -> None:
+    """Prepare the worker's Emmetifiers, converting a small page to load lazy imports and caches."""
+    for compact in (False, True):
+        get_emmetifier(get_config_key(compact)).emmetify(WARM_UP_HTML)
+
+
+def convert_html(html: str, config_key: str) -> dict:
+    return _convert_html_with_stats(html, config_key)[0]
+
+
+def _convert_html_with_stats(html: str, config_key: str) -> tuple[dict, ConversionStats]:
+    start = time.perf_counter()
+    result = get_emmetifier(config_key).emmetify(html)
+    result_json = result_to_json(result, validate_config(config_key).html.report_timings)
+    stats = ConversionStats(
+        duration=time.perf_counter() - start,
+        timings=result.timings,
+        input_bytes=len(html.encode()),
+        output_bytes=len(result.result.encode()),
+    )
+    return result_json, stats
+
+
+class StreamStalledError(Exception):
+    """Raised in a worker when streamed chunks aren't read in time"""
+
+
+def _put_until_stopped(
+    chunks_queue: queue.Queue, stop, item: Optional[dict], timeout: float
+) -> bool:
+    """
+    Put item to the bounded queue, waiting for room while the consumer hasn't stopped.
+    Raises StreamStalledError if there is no room for timeout seconds.
+    """
+    deadline = time.monotonic() + timeout
+    while not stop.is_set():
+        try:
+            chunks_queue.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            if time.monotonic() >= deadline:
+                raise StreamStalledError(f"Streamed chunks were not read in {timeout:g}s")
+    return False
+
+
+def _stream_chunks(
+    chunks_queue: queue.Queue,
+    stop,
+    html: str,
+    config_key: str,
+    max_tokens: int,
+    send_timeout: float,
+) -> Optional[ConversionStats]:
+    """
+    Put chunks to the queue as they are converted, then None, until the consumer stops.
+    Returns stats of the conversion, None if the consumer stopped before its end.
+    """
+    report_timings = validate_config(config_key).html.report_timings
+    stats = ConversionStats(
+        duration=0.0, timings={}, input_bytes=len(html.encode()), output_bytes=0
+    )
+    for chunk in get_emmetifier(config_key).iter_chunks(html, max_tokens):
+        for stage, seconds in chunk.timings.items():
+            stats.timings[stage] = stats.timings.get(stage, 0.0) + seconds
+        stats.output_bytes += len(chunk.result.encode())
+        chunk_json = chunk_to_json(chunk, report_timings)
+        if not _put_until_stopped(chunks_queue, stop, chunk_json, send_timeout):
+            return None
+    # Time spent converting, without waiting for the consumer
+    stats.duration = sum(stats.timings.values())
+    _put_until_stopped(chunks_queue, stop, None, send_timeout)
+    return stats
+
+
+async def _get_chunk(chunks_queue: queue.Queue, future: Future) -> Optional[dict]:
+    """
+    Next chunk of a streaming conversion, None when it ended or its worker failed.
+    The queue is polled, so waiting streams don't hold threads.
+    """
+    interval = STREAM_POLL_MIN_INTERVAL
+    while True:
+        # Checked first, chunks put by a finished worker are all in the queue
+        is_done = future.done()
+        try:
+            return chunks_queue.get_nowait()
+        except queue.Empty:
+            if is_done:
+                return None
+        await asyncio.sleep(interval)
+        interval = min(2 * interval, STREAM_POLL_MAX_INTERVAL)
+
+
+class PoolSaturatedError(Exception):
+    """Raised when the conversion queue is full"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Conversion queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class ConversionPool:
+    """Converts html in pre-warmed worker processes, admitting requests by queue depth."""
+
+    def __init__(
+        self,
+        workers: int = CONVERT_WORKERS,
+        max_queue_depth: int = MAX_QUEUE_DEPTH,
+        on_converted: Optional[Callable[[ConversionStats], None]] = None,
+        stream_buffer_chunks: int = STREAM_BUFFER_CHUNKS,
+        stream_send_timeout: float = STREAM_SEND_TIMEOUT,
+    ):
+        self.workers = workers
+        self.max_queue_depth = max_queue_depth
+        self.stream_buffer_chunks = stream_buffer_chunks
+        self.stream_send_timeout = stream_send_timeout
+        # Called with stats of every conversion, e.g. to record metrics
+        self.on_converted = on_converted
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=warm_up)
+        # Conversions submitted and not finished yet, running or queued
+        self.in_flight = 0
+        self.rejected = 0
+        # Moving average of conversion time in the workers, for estimating Retry-After
+        self.average_duration = 0.1
+        # Serves queues of streaming conversions, started with the first one
+        self._manager = None
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self.in_flight - self.workers)
+
+    def start(self) -> None:
+        """Start and warm up all workers, instead of on the first requests."""
+        futures = [
+            self.executor.submit(_convert_html_with_stats, WARM_UP_HTML, get_config_key(False))
+            for _ in range(self.workers)
+        ]
+        wait(futures)
+
+    def retry_after(self) -> int:
+        """Estimated seconds until the queue has room again."""
+        return max(1, math.ceil((self.queue_depth + 1) * self.average_duration / self.workers))
+
+    def check_admission(self) -> None:
+        """Raise PoolSaturatedError if the queue is full."""
+        if self.queue_depth >= self.max_queue_depth:
+            self.rejected += 1
+            raise PoolSaturatedError(self.retry_after())
+
+    async def convert(self, html: str, config_key: str) -> dict:
+        """Convert html in a worker, raising PoolSaturatedError if the queue is full."""
+        self.check_admission()
+        self.in_flight += 1
+        try:
+            future = self.executor.submit(_convert_html_with_stats, html, config_key)
+            result, stats = await asyncio.wrap_future(future)
+        finally:
+            self.in_flight -= 1
+        self.average_duration += 0.2 * (stats.duration - self.average_duration)
+        if self.on_converted is not None:
+            self.on_converted(stats)
+        return result
+
+    async def stream(self, html: str, config_key: str, max_tokens: int) -> AsyncIterator[dict]:
+        """
+        Convert html to chunks of at most max_tokens in a worker, yielding them as soon as
+        they are converted. Raises PoolSaturatedError if the queue is full, and
+        StreamStalledError if chunks are consumed too slowly, so the worker is released.
+        """
+        self.check_admission()
+        if self._manager is None:
+            self._manager = multiprocessing.Manager()
+        chunks_queue = self._manager.Queue(self.stream_buffer_chunks)
+        stop = self._manager.Event()
+
+        self.in_flight += 1
+        try:
+            future = self.executor.submit(
+                _stream_chunks,
+                chunks_queue,
+                stop,
+                html,
+                config_key,
+                max_tokens,
+                self.stream_send_timeout,
+            )
+            while chunk := await _get_chunk(chunks_queue, future):
+                yield chunk
+            # Raise errors of the worker
+            stats = await asyncio.wrap_future(future)
+        finally:
+            stop.set()
+            self.in_flight -= 1
+        if stats is not None and self.on_converted is not None:
+            self.on_converted(stats)
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        if self._manager is not None:
+            self._manager.shutdown()
+
+    def __enter__(self) -> "ConversionPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()